@@ -0,0 +1,147 @@
+"""
+Crawl State Store
+Watermark (bài mới nhất đã thấy) cho từng (nguồn, mã cổ phiếu) để crawl tăng dần
+
+Danh sách bài trên các nguồn xếp mới nhất trước: khi crawler gặp lại một link
+trong watermark thì phần còn lại đã được crawl ở lần chạy trước -> dừng scroll /
+phân trang. `--full-recrawl` (hoặc CRAWL_FULL_RECRAWL=1) bỏ qua watermark.
+
+Usage:
+    from crawl.crawl_state import crawl_state
+
+    if crawl_state.reached("fireant", "FPT", links):
+        break  # Phần còn lại đã crawl
+    ...
+    inserted, stored = insert_articles_to_database(db_manager, table_name, articles, return_links=True)
+    stored |= set(links) - set(new_links)  # Link đã có trong DB từ trước (không extract lại)
+    crawl_state.update("fireant", "FPT", links, newest_stored_date(articles, stored), stored=stored)
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+# File lưu watermark ("" = chỉ giữ trong bộ nhớ)
+CRAWL_STATE_PATH = os.getenv(
+    "CRAWL_STATE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "crawl_state.json")
+)
+# Số link đầu danh sách được giữ làm watermark (dư ra cho bài ghim / bài bị gỡ)
+WATERMARK_LINKS = int(os.getenv("WATERMARK_LINKS", 30))
+CRAWL_FULL_RECRAWL = os.getenv("CRAWL_FULL_RECRAWL", "0") == "1"
+
+
+class CrawlStateStore:
+    """
+    Watermark của từng (source, key), lưu thành một file JSON
+
+    {"fireant|FPT": {"links": [...], "newest_date": "...", "updated_at": "..."}}
+    """
+
+    def __init__(self, path: Optional[str] = CRAWL_STATE_PATH, full_recrawl: bool = CRAWL_FULL_RECRAWL,
+                 max_links: int = WATERMARK_LINKS):
+        self.path = path
+        self.full_recrawl = full_recrawl
+        self.max_links = max_links
+        self._state: Dict[str, Dict] = self._load()
+        self._seen: Dict[str, set] = {}
+        # Crawler chạy song song (CrawlerController --crawl-workers)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(source: str, key: str) -> str:
+        return f"{source}|{key}"
+
+    def get(self, source: str, key: str) -> Dict:
+        """Watermark hiện tại ({} nếu chưa crawl lần nào)"""
+        with self._lock:
+            return dict(self._state.get(self._key(source, key), {}))
+
+    def reached(self, source: str, key: str, links: Iterable[str]) -> bool:
+        """True nếu danh sách đã chạm tới bài crawl ở lần trước (luôn False khi full recrawl)"""
+        if self.full_recrawl:
+            return False
+        with self._lock:
+            state_key = self._key(source, key)
+            if state_key not in self._seen:
+                self._seen[state_key] = set(self._state.get(state_key, {}).get("links", []))
+            seen = self._seen[state_key]
+        return any(link in seen for link in links)
+
+    def update(self, source: str, key: str, links: List[str], newest_date: Optional[str] = None,
+               stored: Optional[Set[str]] = None):
+        """
+        Ghi watermark sau khi crawl + insert
+
+        Args:
+            source: Tên nguồn (fireant, cafef, chungta, ...)
+            key: Mã cổ phiếu / chuyên mục
+            links: Link theo thứ tự danh sách (mới nhất trước) của lần crawl này
+            newest_date: Ngày của bài mới nhất (nếu có)
+            stored: Link không cần crawl lại: đã nằm trong DB (vừa insert hoặc đã có) hoặc bị
+                validation loại (lần sau cũng bị loại). Khi truyền vào, chỉ phần cuối danh sách
+                nằm sau bài lỗi cuối cùng được ghi - bài extract/tải/insert lỗi không bao giờ bị
+                watermark che ở lần chạy sau
+        """
+        if stored is not None:
+            links = stored_tail(links, stored)
+        if not links:
+            return
+
+        with self._lock:
+            state_key = self._key(source, key)
+            previous = self._state.get(state_key, {})
+            merged = list(dict.fromkeys(list(links) + previous.get("links", [])))[:self.max_links]
+            self._state[state_key] = {
+                "links": merged,
+                "newest_date": newest_date or previous.get("newest_date"),
+                "updated_at": datetime.now().isoformat(timespec="seconds")
+            }
+            self._seen.pop(state_key, None)
+        self.save()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Bỏ qua crawl state không đọc được {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Ghi file (atomic)"""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with self._lock:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._state, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"❌ Lỗi lưu crawl state {self.path}: {e}")
+
+
+def stored_tail(links: List[str], stored: Set[str]) -> List[str]:
+    """Đoạn cuối của danh sách (mới nhất trước) chỉ gồm link đã lưu: mọi bài cũ hơn nó đều đã có trong DB"""
+    tail = []
+    for link in reversed(links):
+        if link not in stored:
+            break
+        tail.append(link)
+    return tail[::-1]
+
+
+
+def newest_stored_date(articles: List[Dict], stored: Set[str]) -> Optional[str]:
+    """Ngày của bài mới nhất đã lưu (articles theo thứ tự danh sách)"""
+    return next((a.get("date") for a in articles if a.get("link") in stored), None)
+
+
+# Store dùng chung cho cả process
+crawl_state = CrawlStateStore()
@@ -5,7 +5,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 import pandas as pd
 from datetime import datetime
 import sys
@@ -15,11 +15,18 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from database import SupabaseManager, DatabaseConfig
+from crawl.driver_pool import driver_pool, create_driver
+from crawl.snapshot_store import snapshot_store
+from bs4 import BeautifulSoup
+
+ROW_SELECTOR = "tr.simplize-table-row-level-0"
+# Thời gian chờ tối đa (giây) để một dòng render sau khi scroll tới (virtual DOM)
+ROW_RENDER_TIMEOUT = float(os.getenv("SIMPLIZE_ROW_RENDER_TIMEOUT", 2))
 
 # Helper functions
 def get_database_manager():
     """Get database manager instance"""
-    return SupabaseManager()
+    return SupabaseManager.shared()
 
 # 🔹 Chuyển đổi định dạng ngày cho Supabase
 def convert_date_for_supabase(date_str):
@@ -151,31 +158,51 @@ def upsert_stock_data(db_manager, table_name, row):
         print(f"   Dữ liệu: {row}")
 
 def setup_driver():
-    """Setup Chrome driver với các options tối ưu cho VPS"""
-    options = Options()
-    # VPS-optimized Chrome options
-    options.add_argument("--headless")  # Chạy ẩn browser
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-features=VizDisplayCompositor")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-plugins")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--user-agent=Mozilla/5.0 (Linux; x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    # Memory optimization
-    options.add_argument("--memory-pressure-off")
-    options.add_argument("--max_old_space_size=4096")
-    
+    """Chrome riêng ngoài pool (giữ để tương thích) - crawler dùng driver_pool.lease("crawler")"""
+    return create_driver("crawler")
+
+def get_price_table_html(driver):
+    """outerHTML của bảng giá (parse_price_rows đọc được), cả trang nếu không tìm thấy bảng"""
+    return driver.execute_script(
+        "var row = document.querySelector(arguments[0]);"
+        "var table = row && row.closest('table');"
+        "return table ? table.outerHTML : document.documentElement.outerHTML;", ROW_SELECTOR)
+
+def wait_row_rendered(driver, row, timeout=ROW_RENDER_TIMEOUT):
+    """Chờ ô ngày của dòng có text (virtual DOM render xong) thay vì sleep cố định; False nếu hết giờ"""
     try:
-        return webdriver.Chrome(options=options)
-    except Exception as e:
-        print(f"❌ Lỗi tạo Chrome driver: {e}")
-        print("💡 Đảm bảo ChromeDriver đã được cài đặt:")
-        print("   sudo apt install google-chrome-stable")
-        print("   sudo apt install chromium-chromedriver")
-        raise
+        WebDriverWait(driver, timeout, poll_frequency=0.05).until(
+            lambda d: row.find_element(By.TAG_NAME, "h6").text.strip())
+        return True
+    except TimeoutException:
+        return False
+
+def get_first_row_text(driver):
+    """Text dòng đầu tiên của bảng giá ("" khi bảng đang render lại)"""
+    try:
+        rows = driver.find_elements(By.CSS_SELECTOR, ROW_SELECTOR)
+        return rows[0].text if rows else ""
+    except StaleElementReferenceException:
+        return ""
+
+PRICE_COLUMNS = ["open_price", "high_price", "low_price", "close_price", "change", "change_pct", "volume"]
+
+def parse_price_rows(html):
+    """Parse bảng lịch sử giá từ HTML đã render (dùng khi replay snapshot)"""
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    for tr in soup.select(ROW_SELECTOR):
+        cols = tr.select("td")
+        if len(cols) < 8:
+            continue
+        texts = []
+        for col in cols[:8]:
+            h6 = col.find("h6")
+            texts.append(h6.get_text(strip=True) if h6 else "-")
+        if texts[0] == "-":
+            continue  # Dòng chưa render (virtual DOM)
+        rows.append({"date": texts[0], **dict(zip(PRICE_COLUMNS, texts[1:]))})
+    return rows
 
 # 🔹 Crawl từng trang và lưu ngay vào Supabase
 def crawl_and_save_stock(stock_code, max_pages=5):
@@ -184,95 +211,98 @@ def crawl_and_save_stock(stock_code, max_pages=5):
     """
     print(f"🚀 Bắt đầu crawl {stock_code} với {max_pages} trang...")
     
-    driver = setup_driver()
     db_manager = get_database_manager()
-
     url = f"https://simplize.vn/co-phieu/{stock_code}/lich-su-gia"
-    driver.get(url)
-    wait = WebDriverWait(driver, 10)
-    time.sleep(2)
-
     table_name = f"{stock_code}_Stock"
 
     try:
-        for page in range(1, max_pages + 1):
-            print(f"🔍 Crawling {stock_code} - Trang {page}...")
-            time.sleep(2)
+        with driver_pool.lease("crawler") as driver:
+            driver.get(url)
+            wait = WebDriverWait(driver, 10)
+
+            for page in range(1, max_pages + 1):
+                print(f"🔍 Crawling {stock_code} - Trang {page}...")
 
-            # 🔧 FIX: Sử dụng logic từ fix_simplize_crawl.py để khắc phục virtual DOM
-            try:
-                # Đợi table load
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "tr.simplize-table-row-level-0")))
+                # 🔧 FIX: Sử dụng logic từ fix_simplize_crawl.py để khắc phục virtual DOM
+                try:
+                    # Đợi table load (thay cho sleep cố định)
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ROW_SELECTOR)))
                 
-                # Lấy tất cả rows sử dụng CSS selector chính xác từ fix
-                rows = driver.find_elements(By.CSS_SELECTOR, "tr.simplize-table-row-level-0")
+                    # Lấy tất cả rows sử dụng CSS selector chính xác từ fix
+                    rows = driver.find_elements(By.CSS_SELECTOR, ROW_SELECTOR)
+                    previous_first_row = get_first_row_text(driver)
                 
-                for row in rows:
-                    try:
-                        # 🔧 FIX: Scroll từng dòng để đảm bảo dòng nằm trong viewport
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", row)
-                        time.sleep(0.1)  # Cho DOM kịp render
+                    for row in rows:
+                        try:
+                            # 🔧 FIX: Scroll từng dòng để đảm bảo dòng nằm trong viewport
+                            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", row)
+                            wait_row_rendered(driver, row)
 
-                        # Lấy dữ liệu từ dòng hiện tại
-                        cols = row.find_elements(By.CSS_SELECTOR, "td")
-                        if len(cols) >= 8:
-                            # 🔧 FIX: Lấy text từ h6 element như trong fix_simplize_crawl.py
-                            date = cols[0].find_element(By.TAG_NAME, "h6").text.strip()
-                            values = []
+                            # Lấy dữ liệu từ dòng hiện tại
+                            cols = row.find_elements(By.CSS_SELECTOR, "td")
+                            if len(cols) >= 8:
+                                # 🔧 FIX: Lấy text từ h6 element như trong fix_simplize_crawl.py
+                                date = cols[0].find_element(By.TAG_NAME, "h6").text.strip()
+                                values = []
                             
-                            for i in range(1, 8):
-                                try:
-                                    val = cols[i].find_element(By.TAG_NAME, "h6").text.strip()
-                                except:
-                                    val = "-"
-                                values.append(val)
+                                for i in range(1, 8):
+                                    try:
+                                        val = cols[i].find_element(By.TAG_NAME, "h6").text.strip()
+                                    except:
+                                        val = "-"
+                                    values.append(val)
 
-                            data_row = {
-                                "date": date,               # Ngày
-                                "open_price": values[0],    # Giá mở cửa
-                                "high_price": values[1],    # Giá cao nhất
-                                "low_price": values[2],     # Giá thấp nhất
-                                "close_price": values[3],   # Giá đóng cửa
-                                "change": values[4],        # Thay đổi giá
-                                "change_pct": values[5],    # % Thay đổi
-                                "volume": values[6]         # Khối lượng
-                            }
+                                data_row = {
+                                    "date": date,               # Ngày
+                                    "open_price": values[0],    # Giá mở cửa
+                                    "high_price": values[1],    # Giá cao nhất
+                                    "low_price": values[2],     # Giá thấp nhất
+                                    "close_price": values[3],   # Giá đóng cửa
+                                    "change": values[4],        # Thay đổi giá
+                                    "change_pct": values[5],    # % Thay đổi
+                                    "volume": values[6]         # Khối lượng
+                                }
 
-                            upsert_stock_data(db_manager, table_name, data_row)
+                                upsert_stock_data(db_manager, table_name, data_row)
                             
-                    except Exception as e:
-                        print(f"❌ Lỗi dòng: {e}")
-                        continue
+                        except Exception as e:
+                            print(f"❌ Lỗi dòng: {e}")
+                            continue
 
-            except Exception as e:
-                print(f"❌ Không lấy được dữ liệu trang {page} cho mã {stock_code}: {e}")
-                break
+                    # Bảng đã render hết sau khi scroll từng dòng -> lưu snapshot để replay
+                    # (chỉ <table> chứa bảng giá, không lưu cả trang)
+                    if snapshot_store.enabled:
+                        snapshot_store.save(f"{url}#page={page}", get_price_table_html(driver), "simplize_table",
+                                            table_name=table_name, stock_code=stock_code)
 
-            # Sang trang tiếp theo - 🔧 FIX: Sử dụng xpath như trong fix_simplize_crawl.py
-            if page < max_pages:
-                try:
-                    next_btn = driver.find_element(By.XPATH, f'//a[text()="{page + 1}"]')
-                    driver.execute_script("arguments[0].click();", next_btn)
-                    time.sleep(2)
                 except Exception as e:
-                    print(f"⚠️ Không thể click sang trang {page+1}: {e}")
+                    print(f"❌ Không lấy được dữ liệu trang {page} cho mã {stock_code}: {e}")
                     break
 
+                # Sang trang tiếp theo - 🔧 FIX: Sử dụng xpath như trong fix_simplize_crawl.py
+                if page < max_pages:
+                    try:
+                        next_btn = driver.find_element(By.XPATH, f'//a[text()="{page + 1}"]')
+                        driver.execute_script("arguments[0].click();", next_btn)
+                        # Chờ bảng đổi sang trang mới (dòng đầu tiên khác trang trước)
+                        wait.until(lambda d: get_first_row_text(d) not in ("", previous_first_row))
+                    except Exception as e:
+                        print(f"⚠️ Không thể click sang trang {page+1}: {e}")
+                        break
+
     except Exception as e:
         print(f"❌ Lỗi trong quá trình crawl: {e}")
     finally:
-        driver.quit()
         db_manager.close_connections()
         print(f"✅ Hoàn tất lưu dữ liệu cho {stock_code}")
 
+STOCK_CODES = ["FPT","GAS","VCB","IMP"]
+
 def main_stock_simplize():
     """Hàm chính để crawl nhiều mã cổ phiếu"""
-    stock_codes = ["FPT","GAS","VCB","IMP"]  # ✅ Test với 1 mã trước
-
-    for code in stock_codes:
+    for code in STOCK_CODES:
         try:
             crawl_and_save_stock(code, max_pages=1)
-            time.sleep(5)  # Nghỉ giữa các mã cổ phiếu
         except Exception as e:
             print(f"❌ Lỗi khi crawl {code}: {e}")
             continue
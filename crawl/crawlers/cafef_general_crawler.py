@@ -14,15 +14,21 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from database import SupabaseManager, DatabaseConfig, format_datetime_for_db
+from database import SupabaseManager, DatabaseConfig, format_datetime_for_db, insert_articles_to_database
+from crawl.driver_pool import driver_pool, create_driver, wait_for_element
+from crawl.http_fetcher import fetch_all, fetch_mode
+from crawl.snapshot_store import snapshot_store
 
 # Constants
 STOCK_CODES = ["FPT", "GAS", "IMP", "VCB"]
 
+# "http": trang bài viết tải song song bằng HTTP, Chrome chỉ cho danh sách (nút Xem thêm) và bài lỗi
+CAFEF_FETCH_MODE = fetch_mode("cafef")
+
 # Helper functions
 def get_database_manager():
     """Get database manager instance"""
-    return SupabaseManager()
+    return SupabaseManager.shared()
 
 def get_table_name(stock_code=None, is_general=False):
     """Get table name using new config"""
@@ -53,39 +59,25 @@ def convert_date(date_str):
     return None
 
 def insert_to_supabase(db_manager, table_name, data):
-    """Wrapper function để tương thích với code cũ - sử dụng hàm chung"""
+    """Wrapper function để tương thích với code cũ - sử dụng hàm chung
+    
+    data có thể là một bài viết (dict) hoặc cả danh sách bài viết (list -> bulk insert)
+    """
+    if isinstance(data, list):
+        return insert_articles_to_database(db_manager, table_name, data, convert_date)
     return insert_article_to_database(db_manager, table_name, data, convert_date)
 
 def setup_driver():
-    options = Options()
-    # VPS-optimized Chrome options
-    options.add_argument("--headless")  # Tắt hiển thị Chrome
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-features=VizDisplayCompositor")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-plugins")
-    options.add_argument("--disable-images")  # Tải nhanh hơn
-    options.add_argument("--disable-javascript")  # Không cần JS cho content tĩnh
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--user-agent=Mozilla/5.0 (Linux; x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    # Memory optimization
-    options.add_argument("--memory-pressure-off")
-    options.add_argument("--max_old_space_size=4096")
-    
-    try:
-        return webdriver.Chrome(options=options)
-    except Exception as e:
-        print(f"❌ Lỗi tạo Chrome driver: {e}")
-        print("💡 Đảm bảo ChromeDriver đã được cài đặt:")
-        print("   sudo apt install google-chrome-stable")
-        print("   sudo apt install chromium-chromedriver")
-        raise
+    """Chrome riêng ngoài pool (giữ để tương thích) - crawler dùng driver_pool.lease("static")"""
+    return create_driver("static")
 
 def extract_article_data(driver):
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    html = driver.page_source
+    snapshot_store.save(driver.current_url, html, "cafef_article", table_name="General_News")
+    return parse_article_html(html, driver.current_url)
+
+def parse_article_html(html, link):
+    soup = BeautifulSoup(html, "lxml")
     title = soup.select_one("h1.title")
     date_tag = soup.select_one("span.pdate[data-role='publishdate']")
     content_tag = soup.select_one("div.detail-content.afcbc-body")
@@ -98,7 +90,7 @@ def extract_article_data(driver):
         "title": title.get_text(strip=True),
         "date": date_tag.get_text(strip=True),
         "content": content,
-        "link": driver.current_url,
+        "link": link,
         "ai_summary": None
     }
 
@@ -120,34 +112,44 @@ def click_view_more(driver, max_clicks=5):
             break
 
 def crawl_cafef_chung(max_clicks=5):
-    driver = setup_driver()
-    driver.get("https://cafef.vn/thi-truong-chung-khoan.chn")
-    time.sleep(3)
-
-    click_view_more(driver, max_clicks=max_clicks)
-
-    links = driver.find_elements(By.CSS_SELECTOR, "div.tlitem.box-category-item h3 a")
-    print(f"📄 Đã tìm thấy {len(links)} bài viết")
-
-    all_data = []
-    for i, link_el in enumerate(links):
-        url = link_el.get_attribute("href")
-        if not url: continue
-        print(f"🔗 {url}")
-        driver.execute_script("window.open(arguments[0]);", url)
-        driver.switch_to.window(driver.window_handles[-1])
-        time.sleep(1)
-        data = extract_article_data(driver)
-        if data: all_data.append(data)
-        driver.close()
-        driver.switch_to.window(driver.window_handles[0])
-        time.sleep(1)
-
-    driver.quit()
-
     db_manager = get_database_manager()
-    for data in all_data:
-        insert_to_supabase(db_manager, "General_News", data)
+    db_manager.warm_link_index("General_News")
+
+    with driver_pool.lease("static") as driver:
+        driver.get("https://cafef.vn/thi-truong-chung-khoan.chn")
+        wait_for_element(driver, "div.tlitem.box-category-item h3 a")
+
+        click_view_more(driver, max_clicks=max_clicks)
+
+        links = driver.find_elements(By.CSS_SELECTOR, "div.tlitem.box-category-item h3 a")
+        print(f"📄 Đã tìm thấy {len(links)} bài viết")
+
+        # Bỏ qua bài đã có trong DB - không cần mở trang chi tiết
+        urls = [url for url in (link_el.get_attribute("href") for link_el in links) if url]
+        urls = db_manager.filter_new_links("General_News", urls)
+
+        all_data = []
+        if CAFEF_FETCH_MODE == "http":
+            # Trang bài viết server-rendered -> tải song song, chỉ bài tải lỗi mới mở bằng Chrome
+            failed = []
+            for url, html in fetch_all(urls).items():
+                if html is None:
+                    failed.append(url)
+                    continue
+                snapshot_store.save(url, html, "cafef_article", table_name="General_News")
+                data = parse_article_html(html, url)
+                if data: all_data.append(data)
+            urls = failed
+
+        # Mở thẳng từng bài trên cùng tab (driver.get được pool đếm để recycle)
+        for i, url in enumerate(urls):
+            print(f"🔗 {url}")
+            driver.get(url)
+            wait_for_element(driver, "h1.title", timeout=10)
+            data = extract_article_data(driver)
+            if data: all_data.append(data)
+
+    insert_to_supabase(db_manager, "General_News", all_data)
     db_manager.close_connections()
     print("🎉 Hoàn tất lưu vào Supabase!")
 
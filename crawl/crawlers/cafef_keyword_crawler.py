@@ -7,22 +7,32 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 from datetime import datetime
-import time
+from urllib.parse import urljoin
 
 # Import centralized database system
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from database import SupabaseManager, DatabaseConfig, format_datetime_for_db
+from database import SupabaseManager, DatabaseConfig, format_datetime_for_db, insert_articles_to_database
+from crawl.driver_pool import driver_pool, create_driver, wait_for_element
+from crawl.http_fetcher import fetch_all, fetch_mode
+from crawl.crawl_state import crawl_state, newest_stored_date
+from crawl.snapshot_store import snapshot_store
 
 # Constants
 STOCK_CODES = ["FPT", "GAS", "IMP", "VCB"]
 
+# "http": trang tìm kiếm + bài viết tải bằng HTTP (server-rendered), Chrome chỉ làm fallback
+# "selenium": click từng bài trên Chrome như cũ
+CAFEF_FETCH_MODE = fetch_mode("cafef")
+# Link bài trên trang kết quả tìm kiếm
+LISTING_LINK_SELECTOR = "div.item h3.titlehidden a"
+
 # Helper functions
 def get_database_manager():
     """Get database manager instance"""
-    return SupabaseManager()
+    return SupabaseManager.shared()
 
 def get_table_name(stock_code=None, is_general=False):
     """Get table name using new config"""
@@ -65,41 +75,29 @@ def convert_date(date_str):
     return None
 
 # ================== HÀM INSERT CHỐNG TRÙNG ==================
-def insert_to_supabase(db_manager, table_name, data):
-    """Wrapper function để tương thích với code cũ - sử dụng hàm chung"""
+def insert_to_supabase(db_manager, table_name, data, return_links=False):
+    """Wrapper function để tương thích với code cũ - sử dụng hàm chung
+    
+    data có thể là một bài viết (dict) hoặc cả danh sách bài viết (list -> bulk insert,
+    return_links=True trả thêm các link đã lưu để ghi watermark)
+    """
+    if isinstance(data, list):
+        return insert_articles_to_database(db_manager, table_name, data, convert_date, return_links)
     return insert_article_to_database(db_manager, table_name, data, convert_date)
 
 # ================== HÀM SETUP SELENIUM ==================
 def setup_driver():
-    options = Options()
-    # VPS-optimized Chrome options
-    options.add_argument("--headless")  # Tắt hiển thị Chrome
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-features=VizDisplayCompositor")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-plugins")
-    options.add_argument("--disable-images")  # Tải nhanh hơn
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--user-agent=Mozilla/5.0 (Linux; x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    # Memory optimization
-    options.add_argument("--memory-pressure-off")
-    options.add_argument("--max_old_space_size=4096")
-    
-    try:
-        return webdriver.Chrome(options=options)
-    except Exception as e:
-        print(f"❌ Lỗi tạo Chrome driver: {e}")
-        print("💡 Đảm bảo ChromeDriver đã được cài đặt:")
-        print("   sudo apt install google-chrome-stable")
-        print("   sudo apt install chromium-chromedriver")
-        raise
+    """Chrome riêng ngoài pool (giữ để tương thích) - crawler dùng driver_pool.lease("crawler")"""
+    return create_driver("crawler")
 
 # ================== TRÍCH XUẤT DỮ LIỆU BÀI VIẾT ==================
-def extract_article_data(driver):
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+def extract_article_data(driver, table_name=None):
+    html = driver.page_source
+    snapshot_store.save(driver.current_url, html, "cafef_article", table_name=table_name)
+    return parse_article_html(html, driver.current_url)
+
+def parse_article_html(html, link):
+    soup = BeautifulSoup(html, "lxml")
     try:
         title_tag = soup.select_one("h1.title")
         date_tag = soup.select_one("span.pdate[data-role='publishdate']")
@@ -114,71 +112,178 @@ def extract_article_data(driver):
             "title": title_tag.get_text(strip=True),
             "date": date_tag.get_text(strip=True),
             "content": content,
-            "link": driver.current_url,
+            "link": link,
             "ai_summary": None  # Chưa có AI summary
         }
     except:
         return None
 
 # ================== CRAWL THEO TỪ KHÓA ==================
-def crawl_articles_sequentially(keyword="FPT", max_pages=1):
-    driver = setup_driver()
-    wait = WebDriverWait(driver, 10)
-    results = []
+def get_search_url(keyword, page):
+    return f"https://cafef.vn/tim-kiem/trang-{page}.chn?keywords={keyword.replace(' ', '%20')}"
+
+def parse_search_results(html):
+    """Link bài viết trên trang kết quả tìm kiếm"""
+    soup = BeautifulSoup(html, "lxml")
+    links = [urljoin("https://cafef.vn", a.get("href")) for a in soup.select(LISTING_LINK_SELECTOR) if a.get("href")]
+    return list(dict.fromkeys(links))
 
+def crawl_articles(keyword="FPT", max_pages=1, db_manager=None, table_name=None):
+    """
+    Crawl theo CAFEF_FETCH_MODE, tự chuyển sang Selenium nếu HTTP không đọc được trang tìm kiếm
+
+    Returns:
+        tuple: (bài viết, link trên các trang tìm kiếm đã đọc - dùng làm watermark)
+    """
+    if CAFEF_FETCH_MODE == "http":
+        crawled = crawl_articles_http(keyword, max_pages, db_manager, table_name)
+        if crawled is not None:
+            return crawled
+        print("⚠️ HTTP không lấy được kết quả tìm kiếm, chuyển sang Selenium")
+    results = crawl_articles_sequentially(keyword, max_pages, db_manager, table_name)
+    return results, [data["link"] for data in results]
+
+def crawl_articles_http(keyword="FPT", max_pages=1, db_manager=None, table_name=None):
+    """
+    Parse trang tìm kiếm rồi tải song song các bài mới qua HTTP
+
+    Dừng phân trang khi gặp bài đã crawl ở lần trước (watermark).
+
+    Returns:
+        tuple: (bài viết, link trên các trang tìm kiếm), hoặc None nếu trang tìm kiếm
+        không tải/parse được (cần fallback Selenium)
+    """
+    links = []
     for page in range(1, max_pages + 1):
-        search_url = f"https://cafef.vn/tim-kiem/trang-{page}.chn?keywords={keyword.replace(' ', '%20')}"
-        print(f"\n🔎 Trang {page}: {search_url}")
-        driver.get(search_url)
-        time.sleep(2)
+        search_url = get_search_url(keyword, page)
+        html = fetch_all([search_url]).get(search_url)
+        page_links = parse_search_results(html) if html else []
+        print(f"\n🔎 {search_url}\n  👉 Tìm thấy {len(page_links)} bài viết")
+        links.extend(page_links)
+        if crawl_state.reached("cafef", keyword, page_links):
+            print("⏹️ Gặp bài đã crawl lần trước, dừng phân trang")
+            break
+    links = list(dict.fromkeys(links))
 
-        article_links = driver.find_elements(By.CSS_SELECTOR, "div.item h3.titlehidden a")
-        print(f"  👉 Tìm thấy {len(article_links)} bài viết")
+    if not links:
+        return None
+    listing = links
 
-        for index in range(len(article_links)):
-            try:
-                article_links = driver.find_elements(By.CSS_SELECTOR, "div.item h3.titlehidden a")
-                link_el = article_links[index]
-                driver.execute_script("arguments[0].scrollIntoView();", link_el)
-                time.sleep(1)
-                driver.execute_script("arguments[0].click();", link_el)
-                time.sleep(2)
+    # Bỏ qua bài đã có trong DB - không cần tải trang chi tiết
+    if db_manager and table_name:
+        links = db_manager.filter_new_links(table_name, links)
+
+    results, failed = [], []
+    for link, html in fetch_all(links).items():
+        if html is None:
+            failed.append(link)
+            continue
+        snapshot_store.save(link, html, "cafef_article", table_name=table_name)
+        data = parse_article_html(html, link)
+        if data:
+            results.append(data)
+            print(f"✅ Lấy bài: {data['title'][:50]}...")
 
+    # Bài tải HTTP lỗi -> thử lại bằng Chrome
+    if failed:
+        print(f"⚠️ {len(failed)} bài tải HTTP lỗi, thử lại bằng Selenium")
+        results.extend(crawl_links_with_selenium(failed, table_name))
+    return results, listing
+
+def crawl_links_with_selenium(links, table_name=None):
+    """Mở thẳng từng link bài viết trên Chrome (fallback của chế độ HTTP)"""
+    results = []
+    with driver_pool.lease("crawler") as driver:
+        wait = WebDriverWait(driver, 10)
+        for link in links:
+            try:
+                driver.get(link)
                 wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.title")))
-                data = extract_article_data(driver)
+                data = extract_article_data(driver, table_name)
                 if data:
                     results.append(data)
                     print(f"✅ Lấy bài: {data['title'][:50]}...")
+            except Exception as e:
+                print(f"❌ Lỗi tại bài {link}: {e}")
+    return results
 
-                driver.get(search_url)
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.item")))
-                time.sleep(1)
+def crawl_articles_sequentially(keyword="FPT", max_pages=1, db_manager=None, table_name=None):
+    with driver_pool.lease("crawler") as driver:
+        wait = WebDriverWait(driver, 10)
+        results = []
 
-            except Exception as e:
-                print(f"❌ Lỗi tại bài {index+1}: {e}")
-                driver.get(search_url)
-                time.sleep(2)
+        for page in range(1, max_pages + 1):
+            search_url = get_search_url(keyword, page)
+            print(f"\n🔎 Trang {page}: {search_url}")
+            driver.get(search_url)
+            wait_for_element(driver, LISTING_LINK_SELECTOR, timeout=10)
+
+            article_links = driver.find_elements(By.CSS_SELECTOR, LISTING_LINK_SELECTOR)
+            print(f"  👉 Tìm thấy {len(article_links)} bài viết")
+
+            # Bỏ qua bài đã có trong DB - không cần click vào trang chi tiết
+            hrefs = [h for h in (el.get_attribute("href") for el in article_links) if h]
+            new_links = None
+            if db_manager and table_name:
+                new_links = set(db_manager.filter_new_links(table_name, hrefs))
+
+            for index in range(len(article_links)):
+                try:
+                    article_links = driver.find_elements(By.CSS_SELECTOR, LISTING_LINK_SELECTOR)
+                    link_el = article_links[index]
+                    if new_links is not None and link_el.get_attribute("href") not in new_links:
+                        continue
+                    driver.execute_script("arguments[0].click();", link_el)
+                    # Chờ rời trang tìm kiếm rồi chờ tiêu đề bài, không sleep cố định
+                    wait.until(EC.staleness_of(link_el))
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.title")))
+                    data = extract_article_data(driver, table_name)
+                    if data:
+                        results.append(data)
+                        print(f"✅ Lấy bài: {data['title'][:50]}...")
+
+                    driver.get(search_url)
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, LISTING_LINK_SELECTOR)))
+
+                except Exception as e:
+                    print(f"❌ Lỗi tại bài {index+1}: {e}")
+                    driver.get(search_url)
+                    wait_for_element(driver, LISTING_LINK_SELECTOR, timeout=10)
+
+            if crawl_state.reached("cafef", keyword, hrefs):
+                print("⏹️ Gặp bài đã crawl lần trước, dừng phân trang")
+                break
 
-    driver.quit()
     return results
 
 # ================== MAIN ==================
+# Keyword -> bảng lưu tin
+KEYWORD_TABLE_MAP = {
+    "FPT": "FPT_News",
+    "GAS": "GAS_News", 
+    "IMP": "IMP_News",
+    "VCB": "VCB_News",
+}
+
+def crawl_cafef_keyword(keyword, table_name=None, db_manager=None):
+    """Crawl một keyword và lưu vào bảng tương ứng (một task độc lập cho CrawlerController)"""
+    db_manager = db_manager or get_database_manager()
+    table_name = table_name or KEYWORD_TABLE_MAP.get(keyword, get_table_name(keyword))
+
+    print(f"\n🚀 Đang crawl keyword: {keyword} -> Lưu vào {table_name}")
+    db_manager.warm_link_index(table_name)
+    articles, listing = crawl_articles(keyword=keyword, max_pages=1, db_manager=db_manager, table_name=table_name)
+    _, stored = insert_to_supabase(db_manager, table_name, articles, return_links=True)
+    stored |= {link for link in listing if db_manager.is_known_link(table_name, link)}  # Đã có trong DB từ trước
+    crawl_state.update("cafef", keyword, listing, newest_stored_date(articles, stored), stored=stored)
+    return articles
+
 def main_cafef():
     db_manager = get_database_manager()
 
     # Crawl theo keyword như cũ
-    keyword_table_map = {
-        "FPT": "FPT_News",
-        "GAS": "GAS_News", 
-        "IMP": "IMP_News",
-        "VCB": "VCB_News",
-    }
-    
-    for kw, table_name in keyword_table_map.items():
-        print(f"\n🚀 Đang crawl keyword: {kw} -> Lưu vào {table_name}")
-        articles = crawl_articles_sequentially(keyword=kw, max_pages=1)
-        for article in articles:
-            insert_to_supabase(db_manager, table_name, article)
+    for kw, table_name in KEYWORD_TABLE_MAP.items():
+        crawl_cafef_keyword(kw, table_name, db_manager)
 
     db_manager.close_connections()
     print("🎉 Hoàn tất lưu vào Supabase!")
@@ -7,7 +7,6 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import time
-import requests
 import re
 from datetime import datetime
 
@@ -16,7 +15,11 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from database import SupabaseManager, DatabaseConfig, format_datetime_for_db
+from database import SupabaseManager, DatabaseConfig, format_datetime_for_db, insert_articles_to_database
+from crawl.driver_pool import driver_pool
+from crawl.http_fetcher import fetch_all
+from crawl.crawl_state import crawl_state, newest_stored_date
+from crawl.snapshot_store import snapshot_store
 
 # Constants
 STOCK_CODES = ["FPT", "GAS", "IMP", "VCB"]
@@ -24,7 +27,7 @@ STOCK_CODES = ["FPT", "GAS", "IMP", "VCB"]
 # Helper functions
 def get_database_manager():
     """Get database manager instance"""
-    return SupabaseManager()
+    return SupabaseManager.shared()
 
 def get_table_name(stock_code=None, is_general=False):
     """Get table name using new config"""
@@ -68,104 +71,114 @@ def normalize_date_only(raw_text):
         pass
     return None
 
-# 🔹 Crawl dữ liệu từ Chungta.vn
-def crawl_chungta(url):
-    options = Options()
-    # VPS-optimized Chrome options
-    options.add_argument("--headless")  # Tắt hiển thị Chrome
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-features=VizDisplayCompositor")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-plugins")
-    options.add_argument("--disable-images")  # Tải nhanh hơn
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--user-agent=Mozilla/5.0 (Linux; x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    # Memory optimization
-    options.add_argument("--memory-pressure-off")
-    options.add_argument("--max_old_space_size=4096")
-    
-    try:
-        driver = webdriver.Chrome(options=options)
-    except Exception as e:
-        print(f"❌ Lỗi tạo Chrome driver: {e}")
-        print("💡 Đảm bảo ChromeDriver đã được cài đặt:")
-        print("   sudo apt install google-chrome-stable")
-        print("   sudo apt install chromium-chromedriver")
-        raise
+# 🔹 Parse trang chi tiết bài viết Chungta.vn
+def parse_chungta_article(html, link, title_preview=""):
+    article_soup = BeautifulSoup(html, "html.parser")
 
-    driver.get(url)
-    wait = WebDriverWait(driver, 10)
+    title = article_soup.select_one("h1.title-detail")
+    title = title.get_text(strip=True) if title else title_preview
 
-    MAX_PAGE = 2
+    date = article_soup.select_one("span.time")
+    date = date.get_text(strip=True) if date else "Không rõ ngày"
 
-    for _ in range(MAX_PAGE):
-        try:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            button = wait.until(EC.element_to_be_clickable((By.ID, "load_more_redesign")))
-            button.click()
-            time.sleep(4)
-        except:
-            print("⚠️ Không thể click hoặc hết bài.")
-            break
+    content = article_soup.select_one("article.fck_detail.width_common")
+    content = content.get_text(separator="\n", strip=True) if content else ""
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
+    return {
+        "title": title,
+        "date": date,
+        "link": link,
+        "content": content,
+        "ai_summary": "" 
+    }
+
+# 🔹 Crawl dữ liệu từ Chungta.vn
+def crawl_chungta(url, db_manager=None, table_name=None):
+    """
+    Returns:
+        tuple: (bài viết mới, link trên trang chuyên mục - dùng làm watermark)
+    """
+    with driver_pool.lease("crawler") as driver:
+        driver.get(url)
+        wait = WebDriverWait(driver, 10)
+
+        MAX_PAGE = 2
+
+        section = url.rstrip("/").rsplit("/", 1)[-1]
+        for _ in range(MAX_PAGE):
+            # Đã hiện bài crawl ở lần trước -> không cần "Xem thêm"
+            loaded_links = [a.get_attribute("href") for a in driver.find_elements(By.CSS_SELECTOR, "h3.title-news a")]
+            if crawl_state.reached("chungta", section, loaded_links):
+                print("⏹️ Gặp bài đã crawl lần trước, dừng tải thêm")
+                break
+            try:
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                button = wait.until(EC.element_to_be_clickable((By.ID, "load_more_redesign")))
+                loaded = len(driver.find_elements(By.CSS_SELECTOR, "h3.title-news a"))
+                button.click()
+                # Chờ bài mới được thêm vào danh sách (thay cho sleep cố định)
+                wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "h3.title-news a")) > loaded)
+            except:
+                print("⚠️ Không thể click hoặc hết bài.")
+                break
+
+        soup = BeautifulSoup(driver.page_source, "html.parser")
 
     articles = soup.select("h3.title-news a")
     print(f"Tìm thấy {len(articles)} bài viết.")
+    listing = ["https://chungta.vn" + a.get("href") for a in articles]
 
-    results = []
-    headers = {"User-Agent": "Mozilla/5.0"}
+    # Bỏ qua bài đã có trong DB - không cần tải trang chi tiết
+    if db_manager and table_name:
+        new_links = set(db_manager.filter_new_links(
+            table_name, ["https://chungta.vn" + a.get("href") for a in articles]
+        ))
+        articles = [a for a in articles if "https://chungta.vn" + a.get("href") in new_links]
 
-    for a in articles:
-        title_preview = a.get_text(strip=True)
-        link = "https://chungta.vn" + a.get("href")
+    # Tải song song các trang bài viết qua HTTP (không cần Chrome)
+    links = {"https://chungta.vn" + a.get("href"): a.get_text(strip=True) for a in articles}
+    pages = fetch_all(links)
 
-        try:
-            res = requests.get(link, headers=headers, timeout=10)
-            article_soup = BeautifulSoup(res.text, "html.parser")
-
-            title = article_soup.select_one("h1.title-detail")
-            title = title.get_text(strip=True) if title else title_preview
-
-            date = article_soup.select_one("span.time")
-            date = date.get_text(strip=True) if date else "Không rõ ngày"
+    results = []
+    for link, html in pages.items():
+        if html is None:
+            continue  # Đã log lỗi trong fetcher
 
-            content = article_soup.select_one("article.fck_detail.width_common")
-            content = content.get_text(separator="\n", strip=True) if content else ""
+        snapshot_store.save(link, html, "chungta_article", table_name=table_name, title_preview=links[link])
+        try:
+            article = parse_chungta_article(html, link, links[link])
+            results.append(article)
+            print(f"✅ Crawled: {article['title']}")
+        except Exception as e:
+            print(f"❌ Lỗi lấy bài {link}: {e}")
 
-            results.append({
-                "title": title,
-                "date": date,
-                "link": link,
-                "content": content,
-                "ai_summary": "" 
-            })
+    return results, listing
 
-            print(f"✅ Crawled: {title}")
+CHUNGTA_URLS = [
+    "https://chungta.vn/kinh-doanh",
+    "https://chungta.vn/cong-nghe"
+]
+CHUNGTA_TABLE = "FPT_News"  # Chung Ta lưu vào FPT_News vì có nhiều tin về FPT
 
-        except Exception as e:
-            print(f"❌ Lỗi lấy bài {link}: {e}")
+def crawl_chungta_section(url, db_manager=None, table_name=CHUNGTA_TABLE):
+    """Crawl một chuyên mục Chung Ta và lưu vào bảng (một task độc lập cho CrawlerController)"""
+    db_manager = db_manager or get_database_manager()
+    db_manager.warm_link_index(table_name)
 
-    return results
+    articles, listing = crawl_chungta(url, db_manager, table_name) 
+    # Sử dụng hàm chung từ database_config - insert cả danh sách một lần
+    _, stored = insert_articles_to_database(db_manager, table_name, articles, normalize_date_only, return_links=True)
+    stored |= {link for link in listing if db_manager.is_known_link(table_name, link)}  # Đã có trong DB từ trước
+    crawl_state.update("chungta", url.rstrip("/").rsplit("/", 1)[-1], listing,
+                       newest_stored_date(articles, stored), stored=stored)
+    print(f"🎉 Hoàn tất lưu vào {table_name} từ {url}")
+    return articles
 
 def main_chungta():
-    urls = [
-        "https://chungta.vn/kinh-doanh",
-        "https://chungta.vn/cong-nghe"
-    ]
-    table_name = "FPT_News"  # Chung Ta lưu vào FPT_News vì có nhiều tin về FPT
     db_manager = get_database_manager()
 
-    for url in urls:
-        articles = crawl_chungta(url) 
-        for article in articles:
-            # Sử dụng hàm chung từ database_config
-            insert_article_to_database(db_manager, table_name, article, normalize_date_only)
-        print(f"🎉 Hoàn tất lưu vào {table_name} từ {url}")
+    for url in CHUNGTA_URLS:
+        crawl_chungta_section(url, db_manager)
 
     db_manager.close_connections()
 
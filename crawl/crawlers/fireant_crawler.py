@@ -16,18 +16,23 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from database import SupabaseManager, DatabaseConfig, format_datetime_for_db
+from database import SupabaseManager, DatabaseConfig, format_datetime_for_db, insert_articles_to_database
+from crawl.driver_pool import driver_pool, create_driver, wait_for_element, wait_after_scroll
+from crawl.crawl_state import crawl_state, newest_stored_date
+from crawl.snapshot_store import snapshot_store
 
 # Constants from old config
 FIREANT_BASE_URL = "https://fireant.vn"
 FIREANT_STOCK_URL = "https://fireant.vn/ma-chung-khoan"
 FIREANT_ARTICLE_URL = "https://fireant.vn/bai-viet"
 STOCK_CODES = ["FPT", "GAS", "IMP", "VCB"]
+STOCK_ARTICLE_SELECTOR = "div.flex.flex-row.h-full.border-b-1 a[href^='/bai-viet/']"
+GENERAL_ARTICLE_SELECTOR = "a[href^='/bai-viet/']"
 
 # Helper functions to replace old config functions
 def get_database_manager():
     """Get database manager instance"""
-    return SupabaseManager()
+    return SupabaseManager.shared()
 
 def get_table_name(stock_code=None, is_general=False):
     """Get table name using new config"""
@@ -53,10 +58,14 @@ def insert_article_to_database(db_manager, table_name, article_data, date_parser
 
 # Configuration constants
 MAX_SCROLLS = 5  # Số lần scroll 
+AI_SUMMARY_TIMEOUT = 15  # Thời gian chờ tối đa (giây) cho tóm tắt AI của FireAnt
+AI_SUMMARY_SELECTOR = "div.italic:not(.font-bold)"
 
-def parse_fuzzy_datetime(raw_text, current_year):
+def parse_fuzzy_datetime(raw_text, current_year, now=None):
+    """Thời gian tương đối ("hôm nay", "20 phút") tính từ `now` (mặc định: lúc gọi)"""
     if not raw_text:
         return None
+    now = now or datetime.now()
         
     raw_text = raw_text.strip()
     original_text = raw_text
@@ -66,20 +75,19 @@ def parse_fuzzy_datetime(raw_text, current_year):
         if "hôm nay" in raw_text:
             time_part = raw_text.replace("hôm nay", "").strip()
             dt = datetime.strptime(time_part, "%H:%M")
-            today = datetime.now()
-            return today.replace(hour=dt.hour, minute=dt.minute, second=0, microsecond=0)
+            return now.replace(hour=dt.hour, minute=dt.minute, second=0, microsecond=0)
 
         if "hôm qua" in raw_text:
             time_part = raw_text.replace("hôm qua", "").strip()
             dt = datetime.strptime(time_part, "%H:%M")
-            yesterday = datetime.now() - timedelta(days=1)
+            yesterday = now - timedelta(days=1)
             return yesterday.replace(hour=dt.hour, minute=dt.minute, second=0, microsecond=0)
 
         # Xử lý "20 phút", "22 phút", "30 phút" trước
         match = re.match(r"(\d+)\s*phút", raw_text)
         if match:
             minutes_ago = int(match.group(1))
-            return datetime.now() - timedelta(minutes=minutes_ago)
+            return now - timedelta(minutes=minutes_ago)
 
         elif "khoảng" in raw_text or "trước" in raw_text:
             return None 
@@ -129,49 +137,25 @@ def fireant_date_parser(raw_text, current_year=2025):
 
 
 def setup_driver():
-    options = Options()
-    # VPS-optimized Chrome options
-    options.add_argument("--headless")  # Tắt hiển thị Chrome
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-features=VizDisplayCompositor")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-plugins")
-    options.add_argument("--disable-notifications")
-    options.add_argument("--disable-infobars")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--user-agent=Mozilla/5.0 (Linux; x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    options.add_argument("--log-level=3")
-    
-    # Memory optimization
-    options.add_argument("--memory-pressure-off")
-    options.add_argument("--max_old_space_size=4096")
-    
-    try:
-        return webdriver.Chrome(options=options)
-    except Exception as e:
-        print(f"❌ Lỗi tạo Chrome driver: {e}")
-        print("💡 Đảm bảo ChromeDriver đã được cài đặt:")
-        print("   sudo apt install google-chrome-stable")
-        print("   sudo apt install chromium-chromedriver")
-        raise
+    """Chrome riêng ngoài pool (giữ để tương thích) - crawler dùng driver_pool.lease("crawler")"""
+    return create_driver("crawler")
 
 def scroll_and_collect_links(driver, stock_code="FPT", scroll_step=600):
     url = get_stock_url(stock_code)
     driver.get(url)
-    time.sleep(5)
+    wait_for_element(driver, STOCK_ARTICLE_SELECTOR)
 
     links = []
     scroll_position = 0
+    articles = []
 
     for i in range(MAX_SCROLLS):
         print(f"🔽 Scroll {i+1}/{MAX_SCROLLS}")
         scroll_position += scroll_step
         driver.execute_script(f"window.scrollTo(0, {scroll_position});")
-        time.sleep(4)
+        wait_after_scroll(driver, STOCK_ARTICLE_SELECTOR, len(articles))
 
-        articles = driver.find_elements(By.CSS_SELECTOR, "div.flex.flex-row.h-full.border-b-1 a[href^='/bai-viet/']")
+        articles = driver.find_elements(By.CSS_SELECTOR, STOCK_ARTICLE_SELECTOR)
         for article in articles:
             try:
                 href = article.get_attribute("href")
@@ -182,115 +166,156 @@ def scroll_and_collect_links(driver, stock_code="FPT", scroll_step=600):
             except:
                 continue
 
+        # Đã tới bài crawl ở lần trước -> phần còn lại không cần scroll
+        if crawl_state.reached("fireant", stock_code, links):
+            print("⏹️ Gặp bài đã crawl lần trước, dừng scroll")
+            break
+
         if scroll_position >= driver.execute_script("return document.body.scrollHeight"):
             break
 
     print(f"✅ Đã thu thập {len(links)} bài viết theo thứ tự từ trên xuống.")
     return links
 
-def extract_article(driver, url):
+def read_ai_summary(driver):
+    """Text của tóm tắt AI khi đủ dài, False nếu chưa có (dùng làm điều kiện cho WebDriverWait)"""
+    for tag in driver.find_elements(By.CSS_SELECTOR, AI_SUMMARY_SELECTOR):
+        text = tag.text.strip()
+        if len(text) >= DatabaseConfig.MIN_UPSTREAM_SUMMARY_LENGTH:
+            return text
+    return False
+
+def parse_fireant_article(html, url):
+    """Parse trang bài viết FireAnt (dùng chung cho crawl live và replay snapshot)"""
+    soup = BeautifulSoup(html, "html.parser")
+
+    title_tag = soup.select_one("div.mt-3.mb-5.text-3xl.font-semibold.leading-10")
+    title = title_tag.get_text(strip=True) if title_tag else ""
+
+    fuzzy_time = ""
+    published_iso = None
+
+    time_tag = soup.select_one("time[datetime]")
+    if time_tag:
+        fuzzy_time = time_tag.get_text(strip=True)
+        published_iso = time_tag.get("datetime") or time_tag.get("title")
+
+    if not published_iso:
+        fuzzy_tags = soup.select("span.text-gray-500")
+        if fuzzy_tags:
+            for tag in fuzzy_tags:
+                parts = tag.get_text(strip=True).split("|")
+                if len(parts) >= 1:
+                    fuzzy_time = parts[-1].strip()  # Lấy phần cuối (thời gian)
+
+    content_div = soup.find("div", id="post_content")
+    content = ""
+    if content_div:
+        paragraphs = content_div.find_all("p")
+        content = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
+
+    # Tóm tắt AI đã hiện trên trang (snapshot được lưu sau khi bấm nút)
+    ai_summary = ""
+    for tag in soup.select(AI_SUMMARY_SELECTOR):
+        text = tag.get_text("\n", strip=True)
+        if len(text) >= DatabaseConfig.MIN_UPSTREAM_SUMMARY_LENGTH:
+            ai_summary = text
+            break
+
+    return {
+        "title": title,
+        "content": content,
+        "link": url,
+        "ai_summary": ai_summary,
+        "summary_source": "fireant" if ai_summary else None,
+        "fuzzy_time": fuzzy_time,
+        "published_iso": published_iso,
+    }
+
+def extract_article(driver, url, table_name=None):
     try:
         driver.get(url)
-        time.sleep(3)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-
-        title_tag = soup.select_one("div.mt-3.mb-5.text-3xl.font-semibold.leading-10")
-        title = title_tag.get_text(strip=True) if title_tag else ""
-
-        fuzzy_time = ""
-        dt = None
-
-        time_tag = soup.select_one("time[datetime]")
-        if time_tag:
-            fuzzy_time = time_tag.get_text(strip=True)
-            try:
-                raw_iso = time_tag.get("datetime") or time_tag.get("title")
-                if raw_iso:
-                    dt = parser.parse(raw_iso)
-            except Exception as e:
-                print(f"⚠️ Lỗi parse ISO datetime: {e}")
-
-        if not dt:
-            fuzzy_tags = soup.select("span.text-gray-500")
-            if fuzzy_tags:
-                for tag in fuzzy_tags:
-                    parts = tag.get_text(strip=True).split("|")
-                    if len(parts) >= 1:
-                        fuzzy_time = parts[-1].strip()  # Lấy phần cuối (thời gian)
-
-        content_div = soup.find("div", id="post_content")
-        content = ""
-        if content_div:
-            paragraphs = content_div.find_all("p")
-            content = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
+        wait_for_element(driver, "div#post_content")
 
         try:
             ai_button = WebDriverWait(driver, 5).until(
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Tóm tắt tin tức bằng AI')]"))
             )
             ai_button.click()
-            time.sleep(10)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            ai_summary_tag = soup.select_one("div.italic:not(.font-bold)")
-            ai_summary = ai_summary_tag.get_text(strip=True) if ai_summary_tag else ""
+            # Chờ đến khi tóm tắt hiện ra (không sleep cố định)
+            ai_summary = WebDriverWait(driver, AI_SUMMARY_TIMEOUT).until(read_ai_summary)
         except Exception as e:
             print(f"⚠️ AI summary lỗi: {e}")
             ai_summary = ""
 
-        return {
-            "title": title,
-            "content": content,
-            "link": url,
-            "ai_summary": ai_summary,
-            "fuzzy_time": fuzzy_time,
-        }
+        html = driver.page_source
+        snapshot_store.save(url, html, "fireant_article", table_name=table_name)
+        data = parse_fireant_article(html, url)
+        if ai_summary:
+            # Text đã render của Chrome (giữ xuống dòng) thay cho bản parse từ HTML
+            data["ai_summary"] = ai_summary
+            data["summary_source"] = "fireant"
+        return data
     except Exception as e:
         print(f"❌ Lỗi khi crawl bài viết: {url} ({e})")
         return {}
 
-def insert_to_supabase(db_manager, table_name, data):
-    """Wrapper function để tương thích với code cũ - sử dụng hàm chung"""
+def insert_to_supabase(db_manager, table_name, data, return_links=False):
+    """Wrapper function để tương thích với code cũ - sử dụng hàm chung
+    
+    data có thể là một bài viết (dict) hoặc cả danh sách bài viết (list -> bulk insert,
+    return_links=True trả thêm các link đã lưu để ghi watermark)
+    """
     # Tạo date parser function cho FireAnt
     def fireant_date_parser_wrapper(date_str):
         dt = parse_fuzzy_datetime(date_str, 2025)
         return format_datetime_for_db(dt) if dt else None
     
+    if isinstance(data, list):
+        return insert_articles_to_database(db_manager, table_name, data, fireant_date_parser_wrapper, return_links)
     return insert_article_to_database(db_manager, table_name, data, fireant_date_parser_wrapper)
 
 def crawl_fireant(stock_code="FPT", table_name="FPT_News"):
     db_manager = get_database_manager()
+    db_manager.warm_link_index(table_name)
 
-    driver = setup_driver()
-    article_links = scroll_and_collect_links(driver, stock_code=stock_code)
+    with driver_pool.lease("crawler") as driver:
+        listing = scroll_and_collect_links(driver, stock_code=stock_code)
+        # Bỏ qua bài đã có trong DB - không cần mở trang chi tiết
+        article_links = db_manager.filter_new_links(table_name, listing)
 
-    current_year = 2025
-    base_day_month = None
-    for idx, link in enumerate(article_links):
-        print(f"📄 ({idx+1}/{len(article_links)}) {link}")
-        raw_data = extract_article(driver, link)
+        current_year = 2025
+        base_day_month = None
+        articles = []
+        for idx, link in enumerate(article_links):
+            print(f"📄 ({idx+1}/{len(article_links)}) {link}")
+            raw_data = extract_article(driver, link, table_name)
 
-        dt = parse_fuzzy_datetime(raw_data.get("fuzzy_time", ""), current_year)
-        raw_data["date"] = format_datetime_obj(dt) if dt else ""
+            dt = parse_fuzzy_datetime(raw_data.get("fuzzy_time", ""), current_year)
+            raw_data["date"] = format_datetime_obj(dt) if dt else ""
 
-        insert_to_supabase(db_manager, table_name, raw_data)
+            articles.append(raw_data)
     
-    driver.quit()
+    _, stored = insert_to_supabase(db_manager, table_name, articles, return_links=True)
+    stored |= set(listing) - set(article_links)  # Đã có trong DB từ trước
+    crawl_state.update("fireant", stock_code, listing, newest_stored_date(articles, stored), stored=stored)
     db_manager.close_connections()
 
 def scroll_and_collect_general_articles(driver):
     url = FIREANT_ARTICLE_URL
     driver.get(url)
-    time.sleep(5)
+    wait_for_element(driver, GENERAL_ARTICLE_SELECTOR)
 
     links = []
     last_height = driver.execute_script("return document.body.scrollHeight")
+    articles = []
 
     for i in range(MAX_SCROLLS):
         print(f"🔽 Scroll {i+1}/{MAX_SCROLLS}")
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(5)
+        wait_after_scroll(driver, GENERAL_ARTICLE_SELECTOR, len(articles))
 
-        articles = driver.find_elements(By.CSS_SELECTOR, "a[href^='/bai-viet/']")
+        articles = driver.find_elements(By.CSS_SELECTOR, GENERAL_ARTICLE_SELECTOR)
         for article in articles:
             try:
                 href = article.get_attribute("href")
@@ -301,6 +326,10 @@ def scroll_and_collect_general_articles(driver):
             except:
                 continue
 
+        if crawl_state.reached("fireant", "general", links):
+            print("⏹️ Gặp bài đã crawl lần trước, dừng scroll")
+            break
+
         new_height = driver.execute_script("return document.body.scrollHeight")
         if new_height == last_height:
             break
@@ -309,38 +338,43 @@ def scroll_and_collect_general_articles(driver):
     print(f"✅ Thu thập {len(links)} bài viết từ {FIREANT_ARTICLE_URL}")
     return links
 
-def crawl_fireant_general(table_name="General_News"):
-    db_manager = get_database_manager()
-    
-    driver = setup_driver()
-    article_links = scroll_and_collect_general_articles(driver)
+def general_article_date(raw_data, current_year, now=None):
+    """Ngày của bài tin chung: fuzzy time, rồi ISO datetime của thẻ <time>, cuối cùng là ngày của `now`"""
+    now = now or datetime.now()
+    # Ưu tiên parse fuzzy time
+    dt = parse_fuzzy_datetime(raw_data.get("fuzzy_time", ""), current_year, now)
 
-    current_year = datetime.now().year
+    # Nếu vẫn không có dt, thử parse trực tiếp từ raw_iso (nếu extract_article lấy được)
+    if not dt and raw_data.get("published_iso"):
+        try:
+            dt = parser.parse(raw_data["published_iso"])
+        except:
+            dt = None
 
-    for idx, link in enumerate(article_links):
-        print(f"📄 ({idx+1}/{len(article_links)}) {link}")
-        raw_data = extract_article(driver, link)
+    return format_datetime_obj(dt) if dt else now.strftime("%Y-%m-%d")
 
-        # Ưu tiên parse fuzzy time
-        dt = parse_fuzzy_datetime(raw_data.get("fuzzy_time", ""), current_year)
+def crawl_fireant_general(table_name="General_News"):
+    db_manager = get_database_manager()
+    db_manager.warm_link_index(table_name)
+    
+    with driver_pool.lease("crawler") as driver:
+        listing = scroll_and_collect_general_articles(driver)
+        # Bỏ qua bài đã có trong DB - không cần mở trang chi tiết
+        article_links = db_manager.filter_new_links(table_name, listing)
 
-        # Nếu vẫn không có dt, thử parse trực tiếp từ raw_iso (nếu extract_article lấy được)
-        if not dt:
-            try:
-                soup = BeautifulSoup(driver.page_source, "html.parser")
-                time_tag = soup.select_one("time[datetime]")
-                if time_tag:
-                    raw_iso = time_tag.get("datetime") or time_tag.get("title")
-                    if raw_iso:
-                        dt = parser.parse(raw_iso)
-            except:
-                dt = None
+        current_year = datetime.now().year
+        articles = []
 
-        raw_data["date"] = format_datetime_obj(dt) if dt else datetime.now().strftime("%Y-%m-%d")
+        for idx, link in enumerate(article_links):
+            print(f"📄 ({idx+1}/{len(article_links)}) {link}")
+            raw_data = extract_article(driver, link, table_name)
+            raw_data["date"] = general_article_date(raw_data, current_year)
 
-        insert_to_supabase(db_manager, table_name, raw_data)
+            articles.append(raw_data)
 
-    driver.quit()
+    _, stored = insert_to_supabase(db_manager, table_name, articles, return_links=True)
+    stored |= set(listing) - set(article_links)  # Đã có trong DB từ trước
+    crawl_state.update("fireant", "general", listing, newest_stored_date(articles, stored), stored=stored)
     db_manager.close_connections()
 
 def main_fireant():
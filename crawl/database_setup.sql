@@ -159,3 +159,84 @@ COMMENT ON TABLE public.FPT_Stock IS 'Bảng lưu lịch sử giá cổ phiếu
 COMMENT ON TABLE public.GAS_Stock IS 'Bảng lưu lịch sử giá cổ phiếu GAS';
 COMMENT ON TABLE public.IMP_Stock IS 'Bảng lưu lịch sử giá cổ phiếu IMP';
 COMMENT ON TABLE public.VCB_Stock IS 'Bảng lưu lịch sử giá cổ phiếu VCB';
+
+-- 6. Cột bổ sung (chạy trước các RPC ở mục 7 vì news_table_stats dùng duplicate_of)
+-- 6a. Nguồn của ai_summary: 'model' (summarizer của hệ thống) hoặc site upstream (vd. 'fireant')
+-- Bước summarization bỏ qua các dòng có summary upstream được chấp nhận (DatabaseConfig.SUMMARY_SOURCE_POLICY)
+ALTER TABLE public.General_News ADD COLUMN IF NOT EXISTS summary_source text;
+ALTER TABLE public.FPT_News ADD COLUMN IF NOT EXISTS summary_source text;
+ALTER TABLE public.GAS_News ADD COLUMN IF NOT EXISTS summary_source text;
+ALTER TABLE public.IMP_News ADD COLUMN IF NOT EXISTS summary_source text;
+ALTER TABLE public.VCB_News ADD COLUMN IF NOT EXISTS summary_source text;
+
+-- 6b. Near-duplicate (bài đăng lại với link khác): duplicate_of = id của bài đại diện trong cùng bảng
+-- Summarization / sentiment / industry chỉ xử lý bài đại diện (duplicate_of IS NULL)
+ALTER TABLE public.General_News ADD COLUMN IF NOT EXISTS duplicate_of bigint;
+ALTER TABLE public.FPT_News ADD COLUMN IF NOT EXISTS duplicate_of bigint;
+ALTER TABLE public.GAS_News ADD COLUMN IF NOT EXISTS duplicate_of bigint;
+ALTER TABLE public.IMP_News ADD COLUMN IF NOT EXISTS duplicate_of bigint;
+ALTER TABLE public.VCB_News ADD COLUMN IF NOT EXISTS duplicate_of bigint;
+
+-- 7. RPC functions cho bulk operations
+-- Cập nhật một hoặc nhiều cột text cho nhiều dòng trong một câu UPDATE
+-- (vd. ai_summary + summary_source cùng lúc: không bao giờ ghi được cột này mà thiếu cột kia)
+-- p_rows: jsonb array dạng [{"key": "...", "values": {"<cột>": "...", ...}}], trả về các key đã được cập nhật
+CREATE OR REPLACE FUNCTION public.bulk_update_columns(
+    p_table text,
+    p_key_column text,
+    p_value_columns text[],
+    p_rows jsonb
+)
+RETURNS SETOF text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    set_list text;
+BEGIN
+    SELECT string_agg(format('%I = r."values"->>%L', c, c), ', ')
+      INTO set_list
+      FROM unnest(p_value_columns) AS c;
+
+    RETURN QUERY EXECUTE format(
+        'UPDATE public.%I AS t SET %s
+           FROM jsonb_to_recordset($1) AS r(key text, "values" jsonb)
+          WHERE t.%I::text = r.key
+          RETURNING t.%I::text',
+        p_table, set_list, p_key_column, p_key_column
+    ) USING p_rows;
+END;
+$$;
+
+-- Thống kê total / summarized / classified cho nhiều bảng tin trong một lần gọi
+-- (thay cho 3 query count="exact" mỗi bảng); classified = 0 nếu bảng không có cột industry
+-- Cả 3 số đều bỏ qua near-duplicate (duplicate_of IS NOT NULL) để tỷ lệ hoàn thành không vượt 100%
+CREATE OR REPLACE FUNCTION public.news_table_stats(p_tables text[])
+RETURNS TABLE(news_table text, total bigint, summarized bigint, classified bigint)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    t text;
+    classified_expr text;
+BEGIN
+    FOREACH t IN ARRAY p_tables LOOP
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns c
+             WHERE c.table_schema = 'public' AND c.table_name = t AND c.column_name = 'industry'
+        ) THEN
+            classified_expr := 'count(*) FILTER (WHERE industry <> '''' AND ai_summary <> '''' AND duplicate_of IS NULL)';
+        ELSE
+            classified_expr := '0::bigint';
+        END IF;
+
+        RETURN QUERY EXECUTE format(
+            'SELECT %L::text,
+                    count(*) FILTER (WHERE content <> '''' AND duplicate_of IS NULL),
+                    count(*) FILTER (WHERE ai_summary <> '''' AND content <> '''' AND duplicate_of IS NULL),
+                    %s
+               FROM public.%I',
+            t, classified_expr, t
+        );
+    END LOOP;
+END;
+$$;
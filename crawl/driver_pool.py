@@ -0,0 +1,350 @@
+"""
+Chrome WebDriver Pool
+Dùng chung headless Chrome giữa các crawler thay vì mở/đóng Chrome cho mỗi lần crawl
+
+Usage:
+    from crawl.driver_pool import driver_pool
+
+    with driver_pool.lease() as driver:           # Chrome đầy đủ (JS)
+        driver.get(url)
+    with driver_pool.lease("static") as driver:   # Trang tĩnh: không ảnh, chặn quảng cáo
+        ...
+
+Thay vì time.sleep cố định, chờ theo điều kiện:
+    wait_for_element(driver, "div#post_content")
+    wait_after_scroll(driver, "a[href^='/bai-viet/']", previous_count)
+"""
+
+import os
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException, TimeoutException
+
+# Số Chrome tối đa chạy cùng lúc (tất cả profile)
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", 2))
+# Khởi động lại Chrome sau N trang để giới hạn bộ nhớ
+DRIVER_MAX_PAGES = int(os.getenv("DRIVER_MAX_PAGES", 200))
+
+USER_AGENT = "Mozilla/5.0 (Linux; x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Chặn request qua CDP cho profile crawl (tắt bằng CRAWLER_BLOCK_REQUESTS=0 khi debug)
+CRAWLER_BLOCK_REQUESTS = os.getenv("CRAWLER_BLOCK_REQUESTS", "1") == "1"
+# Thời gian chờ tối đa (giây) cho phần tử chính của trang / nội dung mới sau khi scroll
+PAGE_READY_TIMEOUT = int(os.getenv("PAGE_READY_TIMEOUT", 15))
+SCROLL_WAIT_TIMEOUT = int(os.getenv("SCROLL_WAIT_TIMEOUT", 5))
+
+# Ảnh, media, font: crawler chỉ đọc text
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+]
+# Quảng cáo, analytics, widget mạng xã hội (domain bên thứ ba)
+BLOCKED_THIRD_PARTY_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*",
+    "*doubleclick.net*", "*adservice.google.*", "*googleadservices.com*",
+    "*facebook.net*", "*facebook.com/tr*", "*connect.facebook.*",
+    "*hotjar.com*", "*clarity.ms*", "*tiktok.com*", "*zalo.me*",
+    "*admicro.vn*", "*vcmedia.vn/ads*", "*eclick.vn*", "*adtimaserver.vn*",
+]
+
+# Chrome options không đổi được sau khi khởi động -> mỗi profile một nhóm driver riêng
+#   page_load_strategy "eager": driver.get trả về sau DOMContentLoaded, không chờ ảnh/iframe/quảng cáo
+#   block_requests: chặn BLOCKED_*_PATTERNS bằng CDP Network.setBlockedURLs
+DRIVER_PROFILES = {
+    "default": {"arguments": []},
+    "no_images": {"arguments": ["--blink-settings=imagesEnabled=false"]},
+    # CafeF chung: content tĩnh nhưng nút "Xem thêm" cần JS -> không tắt JS
+    "static": {"arguments": ["--blink-settings=imagesEnabled=false"],
+               "page_load_strategy": "eager", "block_requests": True},
+    "crawler": {"arguments": ["--blink-settings=imagesEnabled=false"],
+                "page_load_strategy": "eager", "block_requests": True},  # FireAnt, Simplize, CafeF, ChungTa
+}
+
+
+def create_driver(profile="default"):
+    """Tạo một Chrome headless mới với options tối ưu cho VPS"""
+    options = Options()
+    options.add_argument("--headless")  # Tắt hiển thị Chrome
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-features=VizDisplayCompositor")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-plugins")
+    options.add_argument("--disable-notifications")
+    options.add_argument("--disable-infobars")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    options.add_argument("--log-level=3")
+
+    # Memory optimization
+    options.add_argument("--memory-pressure-off")
+    options.add_argument("--max_old_space_size=4096")
+
+    settings = DRIVER_PROFILES[profile]
+    for argument in settings["arguments"]:
+        options.add_argument(argument)
+    options.page_load_strategy = settings.get("page_load_strategy", "normal")
+
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        print(f"❌ Lỗi tạo Chrome driver: {e}")
+        print("💡 Đảm bảo ChromeDriver đã được cài đặt:")
+        print("   sudo apt install google-chrome-stable")
+        print("   sudo apt install chromium-chromedriver")
+        raise
+
+    if settings.get("block_requests") and CRAWLER_BLOCK_REQUESTS:
+        block_requests(driver)
+    return driver
+
+
+def block_requests(driver, patterns=None):
+    """Chặn ảnh/media/font và domain quảng cáo/analytics qua Chrome DevTools Protocol"""
+    patterns = patterns or BLOCKED_RESOURCE_PATTERNS + BLOCKED_THIRD_PARTY_PATTERNS
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        print(f"⚠️ Không bật được chặn request qua CDP: {e}")
+
+
+# ============ EXPLICIT WAITS ============
+
+def wait_for_element(driver, css_selector, timeout=PAGE_READY_TIMEOUT):
+    """Chờ phần tử xuất hiện thay vì sleep cố định; False nếu hết thời gian"""
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, css_selector)))
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_after_scroll(driver, css_selector, previous_count, timeout=SCROLL_WAIT_TIMEOUT):
+    """
+    Chờ sau khi scroll: xong ngay nếu đã có thêm phần tử khớp css_selector hoặc
+    vẫn còn nội dung bên dưới viewport (chưa chạm đáy -> chưa cần lazy-load)
+
+    Returns:
+        bool: False nếu hết thời gian mà không có nội dung mới (thường là hết bài)
+    """
+    def ready(d):
+        if len(d.find_elements(By.CSS_SELECTOR, css_selector)) > previous_count:
+            return True
+        return d.execute_script(
+            "return window.scrollY + window.innerHeight < document.body.scrollHeight - 100;")
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(ready)
+        return True
+    except TimeoutException:
+        return False
+
+
+class _PooledDriver:
+    """Driver + số trang đã tải (driver.get được bọc để đếm và đo thời gian tải)"""
+
+    def __init__(self, profile, on_page_load=None):
+        self.profile = profile
+        self.pages = 0
+        self.driver = create_driver(profile)
+        self._get = self.driver.get
+
+        def counting_get(url):
+            self.pages += 1
+            start = time.time()
+            try:
+                return self._get(url)
+            finally:
+                if on_page_load:
+                    on_page_load(profile, time.time() - start)
+
+        self.driver.get = counting_get
+
+    def is_healthy(self):
+        try:
+            self.driver.window_handles  # Ping chromedriver / Chrome
+            return True
+        except Exception:
+            return False
+
+    def reset(self):
+        """Đóng tab phụ và giải phóng trang hiện tại trước khi trả về pool"""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self._get("about:blank")
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class DriverPool:
+    """
+    Pool Chrome WebDriver dùng chung, thread-safe
+
+    - Tối đa `size` Chrome sống cùng lúc; lease() chờ nếu pool đã đầy
+    - Health check khi lấy driver ra, driver hỏng được thay bằng driver mới
+    - Driver được khởi động lại sau `max_pages` lần driver.get()
+    - Thời gian tải trang (driver.get) được thống kê theo profile: page_load_stats()
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self._idle = {profile: [] for profile in DRIVER_PROFILES}
+        self._live = 0
+        self._cond = threading.Condition()
+        self._load_times = {}  # profile -> [số trang, tổng giây, chậm nhất]
+        self._stats_lock = threading.Lock()
+        self._held = threading.local()  # Lease đang mở của thread hiện tại: profile -> pooled
+
+    def resize(self, size):
+        """Đổi số Chrome tối đa (vd. theo số crawler chạy song song)"""
+        with self._cond:
+            self.size = max(1, size)
+            self._cond.notify_all()
+
+    @contextmanager
+    def lease(self, profile="default"):
+        """
+        Mượn một driver trong khối with, tự trả về pool khi xong
+
+        Driver lỗi WebDriverException trong khối with bị đóng thay vì trả về pool.
+        Lease lồng nhau trong cùng thread với cùng profile dùng lại driver đang mượn;
+        lease lồng với profile khác mà pool đã đầy thì raise RuntimeError thay vì
+        chờ mãi (thread đang giữ chính chỗ trống nó cần).
+        """
+        if profile not in DRIVER_PROFILES:
+            raise ValueError(f"Unknown driver profile: {profile} (choose from {list(DRIVER_PROFILES)})")
+
+        held = self._held.__dict__.setdefault("leases", {})
+        if profile in held:
+            yield held[profile].driver
+            return
+
+        pooled = self._acquire(profile, block=not held)
+        held[profile] = pooled
+        broken = False
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            del held[profile]
+            self._release(pooled, broken)
+
+    def _acquire(self, profile, block=True):
+        evicted = None
+        with self._cond:
+            while True:
+                if self._idle[profile]:
+                    pooled = self._idle[profile].pop()
+                    break
+                if self._live < self.size:
+                    self._live += 1
+                    pooled = None
+                    break
+                # Pool đầy: nhường chỗ của một driver rảnh thuộc profile khác
+                evicted = next((idle.pop() for idle in self._idle.values() if idle), None)
+                if evicted:
+                    pooled = None
+                    break
+                if not block:
+                    raise RuntimeError(
+                        f"Driver pool full ({self.size}) while this thread already holds a lease; "
+                        f"nested lease('{profile}') would deadlock - increase DRIVER_POOL_SIZE")
+                self._cond.wait()
+
+        if evicted:
+            evicted.quit()
+        if pooled and not pooled.is_healthy():
+            print(f"⚠️ Chrome ({profile}) không phản hồi, khởi động lại")
+            pooled.quit()
+            pooled = None
+
+        if pooled is None:
+            try:
+                pooled = _PooledDriver(profile, self._record_page_load)
+            except Exception:
+                with self._cond:
+                    self._live -= 1
+                    self._cond.notify()
+                raise
+        return pooled
+
+    def _release(self, pooled, broken=False):
+        recycle = broken or pooled.pages >= self.max_pages
+        if not recycle:
+            try:
+                pooled.reset()
+            except Exception:
+                recycle = True
+
+        if recycle:
+            if not broken:
+                print(f"♻️ Khởi động lại Chrome ({pooled.profile}) sau {pooled.pages} trang")
+            pooled.quit()
+
+        with self._cond:
+            if recycle:
+                self._live -= 1
+            else:
+                self._idle[pooled.profile].append(pooled)
+            self._cond.notify()
+
+    def _record_page_load(self, profile, seconds):
+        with self._stats_lock:
+            stats = self._load_times.setdefault(profile, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def page_load_stats(self):
+        """
+        Thống kê thời gian driver.get() từ đầu process
+
+        Returns:
+            dict: {profile: {"pages", "avg_seconds", "max_seconds", "total_seconds"}}
+        """
+        with self._stats_lock:
+            return {
+                profile: {
+                    "pages": pages,
+                    "avg_seconds": round(total / pages, 2) if pages else 0.0,
+                    "max_seconds": round(slowest, 2),
+                    "total_seconds": round(total, 1)
+                }
+                for profile, (pages, total, slowest) in self._load_times.items()
+            }
+
+    def close_all(self):
+        """Đóng tất cả driver đang rảnh (gọi khi kết thúc phiên crawl)"""
+        with self._cond:
+            idle = [pooled for drivers in self._idle.values() for pooled in drivers]
+            for drivers in self._idle.values():
+                drivers.clear()
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            pooled.quit()
+
+
+# Pool dùng chung cho cả process
+driver_pool = DriverPool()
+atexit.register(driver_pool.close_all)
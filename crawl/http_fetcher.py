@@ -0,0 +1,252 @@
+"""
+Async HTTP Fetcher
+Tải song song các trang HTML tĩnh (không cần Chrome) với một connection pool dùng chung
+
+- Mỗi thread (worker của CrawlerController) giữ một event loop + httpx.AsyncClient
+  suốt phiên crawl: keep-alive được dùng lại giữa các lần gọi fetch_all
+- Khoảng cách giữa các request tới cùng host do một rate limiter chung cho cả
+  process quyết định, nên nhiều worker cùng crawl một site vẫn giữ đúng nhịp
+
+Usage:
+    from crawl.http_fetcher import fetch_all
+
+    pages = fetch_all(links)               # {url: html hoặc None nếu lỗi}
+    for url, html in pages.items():
+        ...
+
+    # Trong code async:
+    async with AsyncFetcher(concurrency=4) as fetcher:
+        html = await fetcher.fetch(url)
+"""
+
+import os
+import time
+import random
+import atexit
+import asyncio
+import threading
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# Số request đồng thời tối đa (tất cả host)
+HTTP_CONCURRENCY = int(os.getenv("HTTP_CONCURRENCY", 8))
+# Khoảng cách tối thiểu (giây) giữa 2 request tới cùng một host
+HTTP_PER_HOST_DELAY = float(os.getenv("HTTP_PER_HOST_DELAY", 0.3))
+# Số lần thử lại khi lỗi mạng / timeout / 429 / 5xx
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+# Backoff cơ sở (giây), nhân đôi mỗi lần thử lại + jitter
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 1.0))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 15))
+
+USER_AGENT = "Mozilla/5.0 (Linux; x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """
+    Giãn cách request theo host, dùng chung cho mọi thread và event loop
+
+    Mỗi request giữ trước một slot (now hoặc slot kế tiếp của host) dưới threading.Lock,
+    rồi ngủ tới slot đó - không giữ lock khi ngủ.
+    """
+
+    def __init__(self, per_host_delay: float = HTTP_PER_HOST_DELAY):
+        self.per_host_delay = per_host_delay
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str, delay: Optional[float] = None) -> float:
+        """Giữ slot kế tiếp của host, trả về số giây cần chờ"""
+        delay = self.per_host_delay if delay is None else delay
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0))
+            self._next_slot[host] = slot + delay
+        return slot - now
+
+    async def wait(self, host: str, delay: Optional[float] = None):
+        wait_seconds = self.reserve(host, delay)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+
+# Rate limiter chung cho cả process
+host_rate_limiter = HostRateLimiter()
+
+
+class AsyncFetcher:
+    """
+    Client HTTP async dùng chung cho các nguồn HTML tĩnh
+
+    - Một httpx.AsyncClient (keep-alive) cho mọi request trong phiên
+    - Tối đa `concurrency` request đồng thời
+    - Request tới cùng host cách nhau ít nhất `per_host_delay` giây, tính chung với
+      mọi fetcher khác trong process (host_rate_limiter)
+    - Lỗi mạng, timeout, 429 và 5xx được thử lại với exponential backoff + jitter
+    """
+
+    def __init__(self, concurrency: int = HTTP_CONCURRENCY, per_host_delay: float = HTTP_PER_HOST_DELAY,
+                 retries: int = HTTP_RETRIES, backoff: float = HTTP_BACKOFF, timeout: float = HTTP_TIMEOUT,
+                 headers: Optional[Dict[str, str]] = None, rate_limiter: HostRateLimiter = None):
+        self.concurrency = max(1, concurrency)
+        self.per_host_delay = per_host_delay
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.rate_limiter = rate_limiter or host_rate_limiter
+        self.client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_connections=self.concurrency,
+                                max_keepalive_connections=self.concurrency),
+            follow_redirects=True
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    async def _wait_turn(self, host: str):
+        """Giãn cách các request tới cùng host (politeness, chung cho mọi worker)"""
+        await self.rate_limiter.wait(host, self.per_host_delay)
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """
+        Tải một trang
+
+        Returns:
+            str: HTML, hoặc None nếu vẫn lỗi sau khi thử lại (hoặc lỗi 4xx)
+        """
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            error = None
+            async with self._semaphore:
+                await self._wait_turn(host)
+                try:
+                    response = await self.client.get(url)
+                    if response.status_code not in RETRY_STATUS:
+                        response.raise_for_status()
+                        return response.text
+                    error = f"HTTP {response.status_code}"
+                except httpx.HTTPStatusError as e:
+                    print(f"❌ Lỗi tải {url}: HTTP {e.response.status_code}")
+                    return None
+                except httpx.HTTPError as e:  # Timeout, connection reset, ...
+                    error = f"{type(e).__name__}: {e}"
+
+            if attempt < self.retries:
+                # Ngủ ngoài semaphore để không giữ chỗ của request khác
+                await asyncio.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+        print(f"❌ Lỗi tải {url} sau {self.retries + 1} lần thử: {error}")
+        return None
+
+    async def fetch_all(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Tải song song nhiều trang, giữ thứ tự đầu vào"""
+        urls = list(dict.fromkeys(urls))
+        pages = await asyncio.gather(*(self.fetch(url) for url in urls))
+        return dict(zip(urls, pages))
+
+
+class _ThreadFetcher:
+    """Event loop + AsyncFetcher đã mở của một thread, dùng lại qua các lần gọi fetch_all"""
+
+    def __init__(self, fetcher_options: Dict):
+        self.options = fetcher_options
+        self.closed = False
+        self.loop = asyncio.new_event_loop()
+        self.fetcher = self.loop.run_until_complete(AsyncFetcher(**fetcher_options).__aenter__())
+
+    def fetch_all(self, urls):
+        return self.loop.run_until_complete(self.fetcher.fetch_all(urls))
+
+    def close(self):
+        self.closed = True
+        try:
+            self.loop.run_until_complete(self.fetcher.__aexit__(None, None, None))
+        finally:
+            self.loop.close()
+
+
+_thread_fetchers = threading.local()
+_open_fetchers = []  # Mọi _ThreadFetcher đang mở (đóng trong close_all)
+_open_fetchers_lock = threading.Lock()
+
+
+def fetch_all(urls: Iterable[str], **fetcher_options) -> Dict[str, Optional[str]]:
+    """
+    Entry point đồng bộ cho crawler: tải song song danh sách URL
+
+    Mỗi thread dùng lại event loop và client của mình (connection pool giữ qua các
+    lần gọi), nên an toàn khi gọi từ worker thread của CrawlerController.
+
+    Args:
+        urls: Danh sách URL
+        **fetcher_options: Tham số cho AsyncFetcher (concurrency, per_host_delay, ...);
+            client của thread được tạo lại khi tham số khác lần trước
+
+    Returns:
+        Dict[str, Optional[str]]: {url: html hoặc None}
+    """
+    urls = list(urls)
+    if not urls:
+        return {}
+
+    thread_fetcher = getattr(_thread_fetchers, "current", None)
+    if thread_fetcher is not None and (thread_fetcher.closed or thread_fetcher.options != fetcher_options):
+        _close_fetcher(thread_fetcher)
+        thread_fetcher = None
+    if thread_fetcher is None:
+        thread_fetcher = _ThreadFetcher(fetcher_options)
+        _thread_fetchers.current = thread_fetcher
+        with _open_fetchers_lock:
+            _open_fetchers.append(thread_fetcher)
+
+    return thread_fetcher.fetch_all(urls)
+
+
+def _close_fetcher(thread_fetcher: _ThreadFetcher):
+    with _open_fetchers_lock:
+        if thread_fetcher not in _open_fetchers:
+            return
+        _open_fetchers.remove(thread_fetcher)
+    try:
+        thread_fetcher.close()
+    except Exception as e:
+        print(f"⚠️ Lỗi đóng HTTP client: {e}")
+
+
+def close_all():
+    """Đóng client/event loop của mọi thread (cuối phiên crawl, gọi khi không còn fetch_all nào chạy)"""
+    with _open_fetchers_lock:
+        fetchers = list(_open_fetchers)
+    for thread_fetcher in fetchers:
+        _close_fetcher(thread_fetcher)
+
+
+FETCH_MODES = ("http", "selenium")
+
+
+def fetch_mode(source: str, default: str = "http") -> str:
+    """
+    Chế độ tải của một nguồn: "http" (httpx + parser, Chrome chỉ làm fallback) hoặc "selenium"
+
+    Đổi theo từng nguồn bằng env <SOURCE>_FETCH_MODE, vd. CAFEF_FETCH_MODE=selenium
+    """
+    mode = os.getenv(f"{source.upper()}_FETCH_MODE", default).strip().lower()
+    if mode not in FETCH_MODES:
+        print(f"⚠️ {source.upper()}_FETCH_MODE={mode} không hợp lệ (chọn {FETCH_MODES}), dùng {default}")
+        return default
+    return mode
+
+
+atexit.register(close_all)
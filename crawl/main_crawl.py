@@ -11,14 +11,17 @@ import sys
 import os
 import time
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from typing import List, Dict, Callable
 
 # Import các crawler modules
 from crawlers.fireant_crawler import crawl_fireant, crawl_fireant_general
-from crawlers.cafef_keyword_crawler import main_cafef
+from crawlers.cafef_keyword_crawler import main_cafef, crawl_cafef_keyword, KEYWORD_TABLE_MAP
 from crawlers.cafef_general_crawler import crawl_cafef_chung
-from crawlers.chungta_crawler import main_chungta
+from crawlers.chungta_crawler import main_chungta, crawl_chungta_section, CHUNGTA_URLS
 
 # Import centralized database system
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -27,12 +30,16 @@ from database import SupabaseManager
 # Helper function for compatibility
 def get_database_manager():
     """Get database manager instance"""
-    return SupabaseManager()
+    return SupabaseManager.shared()
 
 # Import stock crawler
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'crawl_stock'))
-from crawl_stock.crawl_stock_price_history import main_stock_simplize
+from crawl_stock.crawl_stock_price_history import main_stock_simplize, crawl_and_save_stock
+from crawl_stock.crawl_stock_price_history import STOCK_CODES as SIMPLIZE_STOCK_CODES
+from crawl.driver_pool import driver_pool
+from crawl.crawl_state import crawl_state
+from crawl.snapshot_store import snapshot_store
 
 # Cấu hình logging với UTF-8 encoding cho Windows
 logging.basicConfig(
@@ -46,47 +53,69 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Số crawler chạy song song (1 = tuần tự như cũ)
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", 1))
+
+# Số crawler tối đa cùng lúc trên mỗi domain (tránh bị chặn / rate limit)
+DOMAIN_CONCURRENCY = {
+    "simplize.vn": int(os.getenv("SIMPLIZE_CONCURRENCY", 1)),
+    "fireant.vn": int(os.getenv("FIREANT_CONCURRENCY", 2)),
+    "cafef.vn": int(os.getenv("CAFEF_CONCURRENCY", 2)),
+    "chungta.vn": int(os.getenv("CHUNGTA_CONCURRENCY", 1)),
+}
+
+STOCK_CODES = ["FPT", "GAS", "IMP", "VCB"]
+
 class CrawlerController:
     """Controller để quản lý và chạy tất cả các crawler"""
     
-    def __init__(self):
+    def __init__(self, workers: int = None, full_recrawl: bool = False):
         self.start_time = None
         self.crawlers_status = {}
+        self.workers = max(1, workers or CRAWL_WORKERS)
+        if full_recrawl:
+            # Bỏ qua watermark: scroll / phân trang hết như chưa crawl lần nào
+            crawl_state.full_recrawl = True
+        # crawlers_status được cập nhật từ nhiều worker thread
+        self._status_lock = threading.Lock()
         
     def log_start(self, crawler_name: str):
         """Ghi log bắt đầu crawler"""
         logger.info(f"[START] Bắt đầu {crawler_name}")
-        self.crawlers_status[crawler_name] = {
-            'start_time': datetime.now(),
-            'status': 'running'
-        }
+        with self._status_lock:
+            self.crawlers_status[crawler_name] = {
+                'start_time': datetime.now(),
+                'status': 'running'
+            }
         
     def log_success(self, crawler_name: str):
         """Ghi log thành công"""
         end_time = datetime.now()
-        start_time = self.crawlers_status[crawler_name]['start_time']
-        duration = end_time - start_time
-        
-        self.crawlers_status[crawler_name].update({
-            'end_time': end_time,
-            'status': 'success',
-            'duration': duration
-        })
+        with self._status_lock:
+            start_time = self.crawlers_status[crawler_name]['start_time']
+            duration = end_time - start_time
+            
+            self.crawlers_status[crawler_name].update({
+                'end_time': end_time,
+                'status': 'success',
+                'duration': duration
+            })
         
         logger.info(f"[SUCCESS] {crawler_name} hoàn thành trong {duration}")
         
     def log_error(self, crawler_name: str, error: Exception):
         """Ghi log lỗi"""
         end_time = datetime.now()
-        start_time = self.crawlers_status[crawler_name]['start_time']
-        duration = end_time - start_time
-        
-        self.crawlers_status[crawler_name].update({
-            'end_time': end_time,
-            'status': 'error',
-            'duration': duration,
-            'error': str(error)
-        })
+        with self._status_lock:
+            start_time = self.crawlers_status[crawler_name]['start_time']
+            duration = end_time - start_time
+            
+            self.crawlers_status[crawler_name].update({
+                'end_time': end_time,
+                'status': 'error',
+                'duration': duration,
+                'error': str(error)
+            })
         
         logger.error(f"[ERROR] {crawler_name} lỗi sau {duration}: {error}")
         
@@ -157,29 +186,99 @@ class CrawlerController:
             "Stock Price Crawler"
         )
         
+    def build_crawl_tasks(self) -> List[tuple]:
+        """
+        Chia crawling session thành các task độc lập (nguồn × mã cổ phiếu)
+        
+        Returns:
+            List[tuple]: (crawler_name, domain, crawler_func, kwargs) theo thứ tự chạy tuần tự
+        """
+        tasks = []
+        for stock_code in SIMPLIZE_STOCK_CODES:
+            tasks.append((f"Stock Price {stock_code}", "simplize.vn", crawl_and_save_stock,
+                          {'stock_code': stock_code, 'max_pages': 1}))
+        for stock_code in STOCK_CODES:
+            tasks.append((f"FireAnt {stock_code} Stock", "fireant.vn", crawl_fireant,
+                          {'stock_code': stock_code, 'table_name': f"{stock_code}_News"}))
+        tasks.append(("FireAnt General News", "fireant.vn", crawl_fireant_general,
+                      {'table_name': "General_News"}))
+        for keyword, table_name in KEYWORD_TABLE_MAP.items():
+            tasks.append((f"CafeF Keyword {keyword}", "cafef.vn", crawl_cafef_keyword,
+                          {'keyword': keyword, 'table_name': table_name}))
+        tasks.append(("CafeF General News", "cafef.vn", crawl_cafef_chung, {'max_clicks': 5}))
+        for url in CHUNGTA_URLS:
+            tasks.append((f"ChungTa {url.rsplit('/', 1)[-1]}", "chungta.vn", crawl_chungta_section,
+                          {'url': url}))
+        return tasks
+        
+    def run_parallel_crawlers(self):
+        """
+        Chạy các task crawl trên pool `self.workers` thread
+        
+        Mỗi domain chạy tối đa DOMAIN_CONCURRENCY[domain] task cùng lúc; task
+        của domain đang đầy chờ trong hàng đợi thay vì chiếm worker.
+        """
+        logger.info(f"=== PARALLEL CRAWLERS ({self.workers} workers) ===")
+        
+        pending = {}
+        for crawler_name, domain, crawler_func, kwargs in self.build_crawl_tasks():
+            pending.setdefault(domain, deque()).append((crawler_name, crawler_func, kwargs))
+        active = {domain: 0 for domain in pending}
+        running = {}
+        
+        # Mỗi worker cần một Chrome riêng
+        driver_pool.resize(max(driver_pool.size, self.workers))
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crawl") as executor:
+            while pending or running:
+                for domain in list(pending):
+                    limit = max(1, DOMAIN_CONCURRENCY.get(domain, 1))
+                    while pending[domain] and active[domain] < limit and len(running) < self.workers:
+                        crawler_name, crawler_func, kwargs = pending[domain].popleft()
+                        future = executor.submit(self.run_crawler, crawler_func, crawler_name, **kwargs)
+                        running[future] = domain
+                        active[domain] += 1
+                    if not pending[domain]:
+                        del pending[domain]
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    active[running.pop(future)] -= 1
+        
     def print_summary(self):
         """In báo cáo tổng kết"""
         logger.info("\n" + "="*60)
         logger.info("TONG KET CRAWLING SESSION")
         logger.info("="*60)
         
+        with self._status_lock:
+            crawlers_status = dict(self.crawlers_status)
+        
         total_duration = datetime.now() - self.start_time
-        successful = sum(1 for status in self.crawlers_status.values() if status['status'] == 'success')
-        failed = sum(1 for status in self.crawlers_status.values() if status['status'] == 'error')
+        successful = sum(1 for status in crawlers_status.values() if status['status'] == 'success')
+        failed = sum(1 for status in crawlers_status.values() if status['status'] == 'error')
         
         logger.info(f"Tong thoi gian: {total_duration}")
         logger.info(f"Thanh cong: {successful}")
         logger.info(f"That bai: {failed}")
-        logger.info(f"Tong crawler: {len(self.crawlers_status)}")
+        logger.info(f"Tong crawler: {len(crawlers_status)}")
         
         logger.info("\nChi tiet tung crawler:")
-        for name, status in self.crawlers_status.items():
+        for name, status in crawlers_status.items():
             status_icon = "[OK]" if status['status'] == 'success' else "[FAIL]"
             duration = status.get('duration', 'N/A')
             logger.info(f"{status_icon} {name}: {duration}")
             
             if status['status'] == 'error':
                 logger.info(f"   Loi: {status.get('error', 'Unknown error')}")
+        
+        # Thời gian tải trang Chrome theo profile (so sánh trước/sau khi chặn request)
+        page_load_stats = driver_pool.page_load_stats()
+        if page_load_stats:
+            logger.info("\nThoi gian tai trang (driver.get):")
+            for profile, stats in page_load_stats.items():
+                logger.info(f"   {profile}: {stats['pages']} trang | TB {stats['avg_seconds']}s | "
+                            f"cham nhat {stats['max_seconds']}s | tong {stats['total_seconds']}s")
                 
     def run_all_crawlers(self):
         """Chạy tất cả các crawler theo luồng"""
@@ -189,8 +288,15 @@ class CrawlerController:
         logger.info("BAT DAU CRAWLING SESSION")
         logger.info("=" * 50)
         logger.info(f"Thoi gian bat dau: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        logger.info(f"Crawl workers: {self.workers}")
+        logger.info(f"Che do: {'full recrawl' if crawl_state.full_recrawl else 'incremental (watermark)'}")
         
         try:
+            if self.workers > 1:
+                # Các crawler độc lập chạy song song, giới hạn theo domain
+                self.run_parallel_crawlers()
+                return
+            
             # 1. Chạy Stock Price crawler đầu tiên
             self.run_stock_crawler()
             time.sleep(2)  # Nghỉ giữa các session
@@ -211,11 +317,12 @@ class CrawlerController:
         except Exception as e:
             logger.error(f"Loi nghiem trong trong crawling session: {e}")
         finally:
+            snapshot_store.prune()
             self.print_summary()
 
-def run_single_crawler(crawler_name: str):
+def run_single_crawler(crawler_name: str, full_recrawl: bool = False):
     """Chạy một crawler đơn lẻ"""
-    controller = CrawlerController()
+    controller = CrawlerController(full_recrawl=full_recrawl)
     
     crawler_map = {
         'fireant_fpt': lambda: crawl_fireant(stock_code="FPT", table_name="FPT_News"),
@@ -246,6 +353,10 @@ def main_crawl():
     parser.add_argument('--single', '-s', help='Chạy một crawler đơn lẻ', 
                        choices=['fireant_fpt', 'fireant_gas', 'fireant_imp', 'fireant_vcb', 'fireant_general', 'cafef_keyword', 'cafef_general', 'chungta', 'stock_price'])
     parser.add_argument('--list', '-l', action='store_true', help='Liệt kê các crawler có sẵn')
+    parser.add_argument('--workers', '-w', type=int, default=CRAWL_WORKERS,
+                       help='Số crawler chạy song song (mặc định: CRAWL_WORKERS hoặc 1)')
+    parser.add_argument('--full-recrawl', action='store_true',
+                       help='Bỏ qua watermark, crawl lại toàn bộ MAX_SCROLLS / số trang')
     
     args = parser.parse_args()
     
@@ -263,10 +374,10 @@ def main_crawl():
         return
         
     if args.single:
-        run_single_crawler(args.single)
+        run_single_crawler(args.single, full_recrawl=args.full_recrawl)
     else:
         # Chạy tất cả crawler
-        controller = CrawlerController()
+        controller = CrawlerController(workers=args.workers, full_recrawl=args.full_recrawl)
         controller.run_all_crawlers()
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Replay Crawler Parsing
+Chạy lại phần parse (và insert nếu muốn) của crawler trên HTML snapshot, không cần mạng
+
+- Benchmark tốc độ parse (trang/giây) theo từng loại trang
+- Kiểm tra regression sau khi sửa selector: --output rồi so sánh 2 file JSON
+- Parse lại lịch sử với selector mới: --insert (bài đã có trong DB vẫn được bỏ qua như khi crawl)
+
+Usage (from project root):
+    python crawl/replay.py                                  # Parse tất cả snapshot, không ghi DB
+    python crawl/replay.py --kind cafef_article --since 2025-08-01 --output parsed.json
+    python crawl/replay.py --kind simplize_table --insert
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+from collections import defaultdict
+from datetime import datetime
+
+# Same import layout as main_crawl.py
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlers import fireant_crawler, cafef_keyword_crawler, chungta_crawler
+from crawl_stock import crawl_stock_price_history
+from crawl.snapshot_store import snapshot_store
+from database import SupabaseManager, insert_articles_to_database
+
+
+def replay_fireant_article(html, snapshot):
+    """Ngày tính như khi crawl; thời gian tương đối ("20 phút", "hôm qua") tính từ lúc tải trang"""
+    data = fireant_crawler.parse_fireant_article(html, snapshot["url"])
+    table_name = snapshot["meta"].get("table_name")
+    fetched_at = datetime.fromisoformat(snapshot["fetched_at"])
+    if table_name == "General_News":
+        data["date"] = fireant_crawler.general_article_date(data, fetched_at.year, fetched_at)
+    else:
+        dt = fireant_crawler.parse_fuzzy_datetime(data.get("fuzzy_time", ""), fetched_at.year, fetched_at)
+        data["date"] = fireant_crawler.format_datetime_obj(dt) if dt else ""
+    return [data]
+
+
+def replay_cafef_article(html, snapshot):
+    data = cafef_keyword_crawler.parse_article_html(html, snapshot["url"])
+    return [data] if data else []
+
+
+def replay_chungta_article(html, snapshot):
+    return [chungta_crawler.parse_chungta_article(html, snapshot["url"],
+                                                  snapshot["meta"].get("title_preview", ""))]
+
+
+def insert_stock_rows(db_manager, table_name, rows):
+    for row in rows:
+        crawl_stock_price_history.upsert_stock_data(db_manager, table_name, row)
+
+
+# kind -> (parse(html, snapshot) -> items, insert(db_manager, table_name, items))
+REPLAYERS = {
+    "fireant_article": (replay_fireant_article, fireant_crawler.insert_to_supabase),
+    "cafef_article": (replay_cafef_article, cafef_keyword_crawler.insert_to_supabase),
+    "chungta_article": (replay_chungta_article,
+                        lambda db, table, items: insert_articles_to_database(
+                            db, table, items, chungta_crawler.normalize_date_only)),
+    "simplize_table": (lambda html, snapshot: crawl_stock_price_history.parse_price_rows(html), insert_stock_rows),
+}
+
+
+def is_empty(item):
+    """Bài không parse được nội dung (selector hỏng?)"""
+    return "content" in item and not item.get("content")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay crawler parsing against local HTML snapshots")
+    parser.add_argument("--kind", choices=list(REPLAYERS), help="Chỉ replay một loại trang")
+    parser.add_argument("--since", help="Chỉ snapshot tải từ thời điểm này (ISO, vd. 2025-08-01)")
+    parser.add_argument("--all-versions", action="store_true", help="Replay mọi lần tải thay vì bản mới nhất của mỗi URL")
+    parser.add_argument("--insert", action="store_true", help="Insert kết quả vào Supabase như khi crawl")
+    parser.add_argument("--output", help="Ghi kết quả parse ra file JSON")
+    args = parser.parse_args()
+
+    snapshots = list(snapshot_store.iter_snapshots(kind=args.kind, since=args.since,
+                                                   latest_only=not args.all_versions))
+    if not snapshots:
+        print(f"⚠️ Không có snapshot trong {snapshot_store.root}")
+        return
+    print(f"📂 {len(snapshots)} snapshot từ {snapshot_store.root}")
+
+    stats = defaultdict(lambda: {"pages": 0, "items": 0, "empty": 0, "errors": 0, "load_s": 0.0, "parse_s": 0.0})
+    pending = defaultdict(list)  # (kind, table_name) -> items
+    output = []
+
+    for snapshot in snapshots:
+        kind = snapshot["kind"]
+        if kind not in REPLAYERS:
+            continue
+        parse, _ = REPLAYERS[kind]
+        kind_stats = stats[kind]
+        kind_stats["pages"] += 1
+
+        start = time.perf_counter()
+        try:
+            html = snapshot_store.load(snapshot["sha256"])
+        except Exception as e:
+            print(f"❌ Không đọc được snapshot {snapshot['url']}: {e}")
+            kind_stats["errors"] += 1
+            continue
+        loaded = time.perf_counter()
+
+        try:
+            items = parse(html, snapshot)
+        except Exception as e:
+            print(f"❌ Lỗi parse {snapshot['url']}: {e}")
+            kind_stats["errors"] += 1
+            continue
+        kind_stats["load_s"] += loaded - start
+        kind_stats["parse_s"] += time.perf_counter() - loaded
+
+        kind_stats["items"] += len(items)
+        kind_stats["empty"] += sum(1 for item in items if is_empty(item))
+        if args.insert:
+            pending[(kind, snapshot["meta"].get("table_name"))].extend(items)
+        if args.output:
+            output.append({"url": snapshot["url"], "fetched_at": snapshot["fetched_at"], "kind": kind, "items": items})
+
+    print("\n" + "=" * 60)
+    for kind, s in stats.items():
+        rate = s["pages"] / s["parse_s"] if s["parse_s"] else 0.0
+        print(f"{kind:<16}: {s['pages']} trang | {s['items']} items ({s['empty']} rỗng, {s['errors']} lỗi) | "
+              f"parse {s['parse_s']:.2f}s ({rate:.1f} trang/s) | đọc đĩa {s['load_s']:.2f}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=1, default=str)
+        print(f"💾 Kết quả parse lưu tại {args.output}")
+
+    if args.insert:
+        db_manager = SupabaseManager.shared()
+        for (kind, table_name), items in pending.items():
+            if not table_name or not items:
+                print(f"⏩ Bỏ qua {len(items)} items {kind} không có table_name")
+                continue
+            if kind != "simplize_table":  # Bảng giá upsert theo ngày, không có link
+                db_manager.warm_link_index(table_name)
+            _, insert = REPLAYERS[kind]
+            insert(db_manager, table_name, items)
+            print(f"✅ Replay {len(items)} items {kind} -> {table_name}")
+        db_manager.close_connections()
+
+
+if __name__ == "__main__":
+    main()
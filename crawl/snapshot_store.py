@@ -0,0 +1,183 @@
+"""
+HTML Snapshot Store
+Lưu HTML đã tải trong lúc crawl (gzip, content-addressed) để parse lại offline
+
+Layout trong CRAWL_SNAPSHOT_DIR:
+    blobs/ab/abcdef....html.gz   # Nội dung HTML, tên file = sha256 của HTML (trùng nội dung chỉ lưu 1 lần)
+    manifest.jsonl               # Mỗi dòng một lần tải: url, fetched_at, kind, sha256, meta
+
+Tắt mặc định (CRAWL_SNAPSHOTS=1 để bật). Snapshot cũ hơn CRAWL_SNAPSHOT_MAX_AGE_DAYS bị xóa
+bởi prune() ở cuối mỗi phiên crawl.
+
+Usage:
+    from crawl.snapshot_store import snapshot_store
+
+    snapshot_store.save(url, html, "cafef_article", table_name="FPT_News")
+    for snapshot in snapshot_store.iter_snapshots(kind="cafef_article"):
+        html = snapshot_store.load(snapshot["sha256"])
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional
+
+# Ghi snapshot khi crawl (CRAWL_SNAPSHOTS=1 để bật)
+CRAWL_SNAPSHOTS = os.getenv("CRAWL_SNAPSHOTS", "0") == "1"
+# Giữ snapshot trong N ngày (0 = giữ mãi)
+CRAWL_SNAPSHOT_MAX_AGE_DAYS = int(os.getenv("CRAWL_SNAPSHOT_MAX_AGE_DAYS", 14))
+CRAWL_SNAPSHOT_DIR = os.getenv(
+    "CRAWL_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "html_snapshots")
+)
+
+
+class SnapshotStore:
+    """Kho HTML snapshot trên đĩa, thread-safe (crawler chạy song song cùng ghi)"""
+
+    def __init__(self, root: str = CRAWL_SNAPSHOT_DIR, enabled: bool = CRAWL_SNAPSHOTS):
+        self.root = root
+        self.enabled = enabled and bool(root)
+        self.manifest_path = os.path.join(root, "manifest.jsonl")
+        self._lock = threading.Lock()
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root, "blobs", sha256[:2], f"{sha256}.html.gz")
+
+    def save(self, url: str, html: str, kind: str, **meta) -> Optional[str]:
+        """
+        Lưu một trang vừa tải
+
+        Args:
+            url: URL của trang (khóa cùng với thời điểm tải)
+            html: Nội dung HTML
+            kind: Loại trang, chọn parser khi replay (vd. fireant_article, simplize_table)
+            **meta: Thông tin cần để insert lại (table_name, stock_code, ...)
+
+        Returns:
+            str: sha256 của nội dung, None nếu tắt snapshot hoặc lỗi ghi
+        """
+        if not self.enabled or not html:
+            return None
+
+        try:
+            data = html.encode("utf-8")
+            sha256 = hashlib.sha256(data).hexdigest()
+            path = self._blob_path(sha256)
+            if os.path.exists(path):
+                os.utime(path)  # Blob vừa được dùng lại -> prune() không xóa
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with gzip.open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+
+            record = {
+                "url": url,
+                "fetched_at": datetime.now().isoformat(timespec="seconds"),
+                "kind": kind,
+                "sha256": sha256,
+                "meta": meta
+            }
+            with self._lock:
+                with open(self.manifest_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return sha256
+        except Exception as e:
+            print(f"⚠️ Không lưu được snapshot {url}: {e}")
+            return None
+
+    def load(self, sha256: str) -> str:
+        """Nội dung HTML của một snapshot"""
+        with gzip.open(self._blob_path(sha256), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def iter_snapshots(self, kind: Optional[str] = None, since: Optional[str] = None,
+                       latest_only: bool = True) -> Iterator[Dict]:
+        """
+        Duyệt manifest theo thứ tự tải
+
+        Args:
+            kind: Chỉ lấy một loại trang
+            since: Chỉ lấy snapshot có fetched_at >= since (ISO, vd. "2025-08-01")
+            latest_only: Mỗi URL chỉ lấy lần tải mới nhất
+        """
+        if not os.path.exists(self.manifest_path):
+            return
+
+        records = []
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Dòng ghi dở khi process bị dừng
+                if kind and record["kind"] != kind:
+                    continue
+                if since and record["fetched_at"] < since:
+                    continue
+                records.append(record)
+
+        if latest_only:
+            latest = {}
+            for record in records:
+                latest[(record["kind"], record["url"])] = record
+            records = sorted(latest.values(), key=lambda r: r["fetched_at"])
+
+        yield from records
+
+    def prune(self, max_age_days: int = CRAWL_SNAPSHOT_MAX_AGE_DAYS) -> int:
+        """
+        Xóa snapshot cũ hơn max_age_days: viết lại manifest, xóa blob không còn dòng nào trỏ tới
+
+        Returns:
+            int: Số blob đã xóa
+        """
+        if not self.enabled or max_age_days <= 0 or not os.path.exists(self.manifest_path):
+            return 0
+
+        cutoff = datetime.now() - timedelta(days=max_age_days)
+        cutoff_iso = cutoff.isoformat(timespec="seconds")
+        removed = 0
+        try:
+            with self._lock:
+                kept_lines, kept_hashes = [], set()
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if record["fetched_at"] >= cutoff_iso:
+                            kept_lines.append(line)
+                            kept_hashes.add(record["sha256"])
+
+                tmp_path = self.manifest_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(kept_lines)
+                os.replace(tmp_path, self.manifest_path)
+
+            # Blob mới ghi (mtime sau cutoff) có thể chưa kịp vào manifest -> giữ lại
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, "blobs")):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    sha256 = filename.split(".", 1)[0]
+                    if sha256 in kept_hashes or os.path.getmtime(path) >= cutoff.timestamp():
+                        continue
+                    os.remove(path)
+                    removed += 1
+        except Exception as e:
+            print(f"⚠️ Không dọn được snapshot trong {self.root}: {e}")
+            return removed
+
+        if removed:
+            print(f"🧹 Đã xóa {removed} snapshot cũ hơn {max_age_days} ngày")
+        return removed
+
+
+# Store dùng chung cho cả process
+snapshot_store = SnapshotStore()
@@ -3,7 +3,9 @@ Database Package
 Centralized database management for SPA VIP system
 """
 
-from .supabase_manager import SupabaseManager, get_database_manager, get_supabase_client
+from .supabase_manager import (
+    SupabaseManager, get_database_manager, get_supabase_client, iter_batches, insert_articles_to_database
+)
 from .config import DatabaseConfig
 from .schemas import NewsSchema, StockSchema, format_datetime_for_db
 
@@ -14,5 +16,7 @@ __all__ = [
     'StockSchema',
     'get_database_manager',
     'get_supabase_client',
+    'iter_batches',
+    'insert_articles_to_database',
     'format_datetime_for_db'
 ]
@@ -9,6 +9,18 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _parse_summary_source_policy(raw: str) -> Dict[str, tuple]:
+    """"FPT_News=fireant;General_News=" -> {"FPT_News": ("fireant",), "General_News": ()}"""
+    policy = {}
+    for entry in raw.split(";"):
+        if "=" not in entry:
+            continue
+        table, sources = entry.split("=", 1)
+        policy[table.strip()] = tuple(s.strip() for s in sources.split(",") if s.strip())
+    return policy
+
+
 class DatabaseConfig:
     """Centralized database configuration"""
     
@@ -40,12 +52,55 @@ class DatabaseConfig:
     FIREANT_BASE_URL = "https://fireant.vn"
     FIREANT_STOCK_URL = "https://fireant.vn/ma-chung-khoan"
     FIREANT_ARTICLE_URL = "https://fireant.vn/bai-viet"
-    
+
+    # Bulk operations
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 100))  # Rows per multi-row upsert
+    IN_FILTER_CHUNK_SIZE = int(os.getenv("IN_FILTER_CHUNK_SIZE", 50))  # Values per in_() query (URL length limit)
+    FETCH_PAGE_SIZE = int(os.getenv("FETCH_PAGE_SIZE", 500))  # Rows per keyset page (below PostgREST max-rows)
+
+    # Connection
+    HTTP_TIMEOUT = int(os.getenv("SUPABASE_HTTP_TIMEOUT", 120))  # Seconds per PostgREST request
+    HEALTH_CHECK_TTL = int(os.getenv("HEALTH_CHECK_TTL", 600))  # Seconds a successful test_connection is reused
+    REQUEST_RETRIES = int(os.getenv("REQUEST_RETRIES", 3))  # Retries of a failed page read / bulk write before raising
+    REQUEST_RETRY_BACKOFF = float(os.getenv("REQUEST_RETRY_BACKOFF", 1.0))  # Seconds, doubled after each retry
+
+    # Table statistics
+    STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", 30))  # Seconds get_table_stats results are reused
+
+    # Summary sources: who wrote ai_summary ("model" = our summarizer, others = crawled upstream)
+    SUMMARY_SOURCE_MODEL = "model"
+    UPSTREAM_SUMMARY_SOURCES = ("fireant",)
+    MIN_UPSTREAM_SUMMARY_LENGTH = int(os.getenv("MIN_UPSTREAM_SUMMARY_LENGTH", 50))  # Shorter upstream summaries are dropped
+    # Upstream sources each table accepts as final; tables not listed accept all of them.
+    # Format: "FPT_News=fireant;General_News=" (empty list = always regenerate with the model)
+    SUMMARY_SOURCE_POLICY = _parse_summary_source_policy(os.getenv("SUMMARY_SOURCE_POLICY", ""))
+
+    # Near-duplicate detection at insert (SimHash over word shingles)
+    NEAR_DUP_MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", 6))  # Max differing bits of 64 (<= 7 for banded lookup)
+    NEAR_DUP_SHINGLE_SIZE = int(os.getenv("NEAR_DUP_SHINGLE_SIZE", 3))  # Words per shingle
+    NEAR_DUP_MIN_WORDS = int(os.getenv("NEAR_DUP_MIN_WORDS", 50))  # Shorter articles are never marked as duplicates
+    NEAR_DUP_SNAPSHOT_DIR = os.getenv(
+        "NEAR_DUP_SNAPSHOT_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "near_duplicates")
+    )
+
+    # Crawler link index snapshot ("" disables the on-disk snapshot)
+    LINK_INDEX_SNAPSHOT_DIR = os.getenv(
+        "LINK_INDEX_SNAPSHOT_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "link_index")
+    )
+
     @classmethod
     def get_all_news_tables(cls) -> list:
         """Get list of all news table names"""
         return list(cls.NEWS_TABLES.values())
     
+    @classmethod
+    def rejected_summary_sources(cls, table_name: str) -> list:
+        """Upstream summary sources that table does not accept (their rows get re-summarized)"""
+        accepted = cls.SUMMARY_SOURCE_POLICY.get(table_name, cls.UPSTREAM_SUMMARY_SOURCES)
+        return [source for source in cls.UPSTREAM_SUMMARY_SOURCES if source not in accepted]
+    
     @classmethod
     def get_all_stock_tables(cls) -> list:
         """Get list of all stock table names"""
@@ -0,0 +1,126 @@
+"""
+Link Index
+In-process link-existence index per news table for crawler dedup
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+class LinkIndex:
+    """
+    Set of known article links per table
+
+    Warmed once per table with a keyset-paged ``select id, link``. When a snapshot
+    directory is configured, the index is saved on close and reloaded on the next
+    run, so only rows with id greater than the snapshot's max id are fetched.
+    """
+
+    def __init__(self, db_manager, snapshot_dir: Optional[str] = None):
+        self.db_manager = db_manager
+        self.snapshot_dir = snapshot_dir
+        self._links: Dict[str, set] = {}
+        self._max_id: Dict[str, int] = {}
+        # Shared manager is used by concurrent crawlers
+        self._lock = threading.RLock()
+        # Crawlers running in parallel may save at the same time (same .tmp file)
+        self._save_lock = threading.Lock()
+
+    def is_warm(self, table_name: str) -> bool:
+        """True once the table has been loaded"""
+        return table_name in self._links
+
+    def warm(self, table_name: str) -> int:
+        """
+        Load all links of a table (snapshot + delta since snapshot)
+
+        Returns:
+            int: Number of links known for the table
+        """
+        with self._lock:
+            return self._warm(table_name)
+
+    def _warm(self, table_name: str) -> int:
+        if self.is_warm(table_name):
+            return len(self._links[table_name])
+
+        links, max_id = self._load_snapshot(table_name)
+        snapshot_size = len(links)
+
+        def newer_than_snapshot(query):
+            return query.gt("id", max_id) if max_id else query
+
+        for row in self.db_manager.iter_rows(table_name, "id, link", newer_than_snapshot, desc=False):
+            if row.get("link"):
+                links.add(row["link"])
+            max_id = max(max_id, row["id"])
+
+        self._links[table_name] = links
+        self._max_id[table_name] = max_id
+
+        logger.info(f"🔎 Link index for {table_name}: {len(links)} links "
+                    f"({snapshot_size} from snapshot, {len(links) - snapshot_size} fetched)")
+        return len(links)
+
+    def contains(self, table_name: str, link: str) -> bool:
+        """Check if link is known (table must be warmed)"""
+        return link in self._links.get(table_name, ())
+
+    def add(self, table_name: str, links: Iterable[str]):
+        """
+        Record newly inserted links
+
+        max_id is left untouched so rows inserted concurrently by other
+        processes are still picked up by the next delta warm.
+        """
+        with self._lock:
+            if not self.is_warm(table_name):
+                return
+            self._links[table_name].update(link for link in links if link)
+
+    # ============ SNAPSHOT ============
+
+    def _snapshot_path(self, table_name: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{table_name}.json")
+
+    def _load_snapshot(self, table_name: str):
+        """Return (links, max_id) from snapshot, or empty index"""
+        if not self.snapshot_dir:
+            return set(), 0
+
+        path = self._snapshot_path(table_name)
+        if not os.path.exists(path):
+            return set(), 0
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return set(data.get("links", [])), int(data.get("max_id", 0))
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable link index snapshot {path}: {e}")
+            return set(), 0
+
+    def save(self):
+        """Write snapshot for every warmed table"""
+        if not self.snapshot_dir:
+            return
+
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with self._lock:
+                snapshot = {table_name: (self._max_id.get(table_name, 0), sorted(links))
+                            for table_name, links in self._links.items()}
+            with self._save_lock:
+                for table_name, (max_id, links) in snapshot.items():
+                    path = self._snapshot_path(table_name)
+                    tmp_path = path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump({"max_id": max_id, "links": links}, f)
+                    os.replace(tmp_path, path)
+            logger.info(f"💾 Link index snapshot saved to {self.snapshot_dir}")
+        except Exception as e:
+            logger.error(f"❌ Error saving link index snapshot: {e}")
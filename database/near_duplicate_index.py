@@ -0,0 +1,214 @@
+"""
+Near-Duplicate Index
+SimHash fingerprints of article content per news table for syndicated-copy detection
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+BANDS = 8  # 8 x 8-bit bands: two fingerprints within 7 bits always share a band
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def simhash(text: str, shingle_size: int = 3) -> Optional[int]:
+    """
+    64-bit SimHash over word shingles of lowercased content
+
+    Returns:
+        Fingerprint, or None when the text has fewer words than one shingle
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < shingle_size:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for i in range(len(words) - shingle_size + 1):
+        shingle = " ".join(words[i:i + shingle_size])
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """
+    SimHash fingerprints of cluster representatives per table
+
+    A new article whose fingerprint is within ``max_distance`` bits of a known
+    representative is a near-duplicate of it (``duplicate_of`` = representative id).
+    Candidates are found through 8-bit band buckets instead of a full scan.
+
+    Warmed once per table like LinkIndex: snapshot + keyset-paged delta of
+    ``select id, content, duplicate_of`` for rows newer than the snapshot.
+    """
+
+    def __init__(self, db_manager, snapshot_dir: Optional[str] = None,
+                 max_distance: int = 6, shingle_size: int = 3, min_words: int = 50):
+        self.db_manager = db_manager
+        self.snapshot_dir = snapshot_dir
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self._fingerprints: Dict[str, Dict[int, int]] = {}  # table -> {representative id: fingerprint}
+        self._bands: Dict[str, List[Dict[int, List[int]]]] = {}  # table -> per band {band value: ids}
+        self._max_id: Dict[str, int] = {}
+        # Shared manager is used by concurrent crawlers
+        self._lock = threading.RLock()
+        # Crawlers running in parallel may save at the same time (same .tmp file)
+        self._save_lock = threading.Lock()
+
+    def is_warm(self, table_name: str) -> bool:
+        """True once the table has been loaded"""
+        return table_name in self._fingerprints
+
+    def fingerprint(self, content: str) -> Optional[int]:
+        """SimHash of the content, None when it is too short to compare reliably"""
+        if not content or len(content.split()) < self.min_words:
+            return None
+        return simhash(content, self.shingle_size)
+
+    def warm(self, table_name: str) -> int:
+        """
+        Load representative fingerprints of a table (snapshot + delta since snapshot)
+
+        Returns:
+            int: Number of representatives known for the table
+        """
+        with self._lock:
+            if self.is_warm(table_name):
+                return len(self._fingerprints[table_name])
+
+            fingerprints, max_id = self._load_snapshot(table_name)
+            snapshot_size = len(fingerprints)
+            self._fingerprints[table_name] = {}
+            self._bands[table_name] = [{} for _ in range(BANDS)]
+            for article_id, fingerprint in fingerprints.items():
+                self._index(table_name, article_id, fingerprint)
+
+            def newer_than_snapshot(query):
+                return query.gt("id", max_id) if max_id else query
+
+            try:
+                for row in self.db_manager.iter_rows(table_name, "id, content, duplicate_of",
+                                                     newer_than_snapshot, desc=False):
+                    max_id = max(max_id, row["id"])
+                    if row.get("duplicate_of"):
+                        continue
+                    fingerprint = self.fingerprint(row.get("content") or "")
+                    if fingerprint is not None:
+                        self._index(table_name, row["id"], fingerprint)
+            except Exception:
+                # Stay cold rather than match against a partial set of representatives
+                self._fingerprints.pop(table_name, None)
+                self._bands.pop(table_name, None)
+                raise
+
+            self._max_id[table_name] = max_id
+            count = len(self._fingerprints[table_name])
+            logger.info(f"🧬 Near-duplicate index for {table_name}: {count} representatives "
+                        f"({snapshot_size} from snapshot, {count - snapshot_size} fetched)")
+            return count
+
+    def find(self, table_name: str, fingerprint: Optional[int]) -> Optional[int]:
+        """Id of the closest representative within max_distance bits, or None"""
+        if fingerprint is None or not self.is_warm(table_name):
+            return None
+
+        with self._lock:
+            fingerprints = self._fingerprints[table_name]
+            candidates = set()
+            for band, buckets in enumerate(self._bands[table_name]):
+                candidates.update(buckets.get(self._band_value(fingerprint, band), ()))
+
+            best: Optional[Tuple[int, int]] = None
+            for article_id in candidates:
+                distance = hamming_distance(fingerprint, fingerprints[article_id])
+                if distance <= self.max_distance and (best is None or (distance, article_id) < best):
+                    best = (distance, article_id)
+            return best[1] if best else None
+
+    def add(self, table_name: str, article_id: int, fingerprint: Optional[int]):
+        """Record a newly inserted representative"""
+        if fingerprint is None:
+            return
+        with self._lock:
+            if self.is_warm(table_name):
+                self._index(table_name, article_id, fingerprint)
+                # Next warm from the snapshot must not fetch (and bucket) this row again
+                self._max_id[table_name] = max(self._max_id.get(table_name, 0), article_id)
+
+    def _index(self, table_name: str, article_id: int, fingerprint: int):
+        if article_id in self._fingerprints[table_name]:
+            return
+        self._fingerprints[table_name][article_id] = fingerprint
+        for band, buckets in enumerate(self._bands[table_name]):
+            buckets.setdefault(self._band_value(fingerprint, band), []).append(article_id)
+
+    @staticmethod
+    def _band_value(fingerprint: int, band: int) -> int:
+        return (fingerprint >> (band * BAND_BITS)) & BAND_MASK
+
+    # ============ SNAPSHOT ============
+
+    def _snapshot_path(self, table_name: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{table_name}.json")
+
+    def _load_snapshot(self, table_name: str):
+        """Return ({id: fingerprint}, max_id) from snapshot, or empty index"""
+        if not self.snapshot_dir:
+            return {}, 0
+
+        path = self._snapshot_path(table_name)
+        if not os.path.exists(path):
+            return {}, 0
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("shingle_size") != self.shingle_size:
+                logger.info(f"Near-duplicate snapshot {path} uses other settings, rebuilding")
+                return {}, 0
+            return {int(i): int(fp) for i, fp in data.get("fingerprints", [])}, int(data.get("max_id", 0))
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable near-duplicate snapshot {path}: {e}")
+            return {}, 0
+
+    def save(self):
+        """Write snapshot for every warmed table"""
+        if not self.snapshot_dir:
+            return
+
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with self._lock:
+                snapshot = {table_name: (self._max_id.get(table_name, 0), sorted(fingerprints.items()))
+                            for table_name, fingerprints in self._fingerprints.items()}
+            with self._save_lock:
+                for table_name, (max_id, fingerprints) in snapshot.items():
+                    path = self._snapshot_path(table_name)
+                    tmp_path = path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump({"max_id": max_id, "shingle_size": self.shingle_size,
+                                   "fingerprints": fingerprints}, f)
+                    os.replace(tmp_path, path)
+            logger.info(f"💾 Near-duplicate index snapshot saved to {self.snapshot_dir}")
+        except Exception as e:
+            logger.error(f"❌ Error saving near-duplicate index snapshot: {e}")
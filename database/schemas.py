@@ -4,7 +4,7 @@ Define table structures and data validation
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 from dataclasses import dataclass
 
 @dataclass
@@ -19,11 +19,18 @@ class NewsSchema:
     
     # Optional fields
     ai_summary: Optional[str] = None
+    summary_source: Optional[str] = None  # "model" or the upstream site that provided ai_summary
     sentiment: Optional[str] = None
     industry: Optional[str] = None
+    duplicate_of: Optional[int] = None  # id of the representative when this is a near-duplicate
     
-    def to_dict(self, include_industry: bool = False) -> Dict[str, Any]:
-        """Convert to dictionary for database insertion"""
+    def to_dict(self, include_industry: bool = False, exclude: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Convert to dictionary for database insertion
+        
+        summary_source and duplicate_of are only sent when set, so inserts keep working
+        on tables created before those columns existed (exclude drops them even when set).
+        """
         data = {
             "title": self.title,
             "content": self.content,
@@ -33,9 +40,17 @@ class NewsSchema:
             "sentiment": self.sentiment
         }
         
+        if self.ai_summary and self.summary_source is not None:
+            data["summary_source"] = self.summary_source
+        if self.duplicate_of is not None:
+            data["duplicate_of"] = self.duplicate_of
+        
         # Only include industry field for General_News table
         if include_industry:
             data["industry"] = self.industry
+        
+        for column in exclude:
+            data.pop(column, None)
             
         return data
     
@@ -48,8 +63,10 @@ class NewsSchema:
             link=data.get("link", ""),
             date=data.get("date", ""),
             ai_summary=data.get("ai_summary"),
+            summary_source=data.get("summary_source"),
             sentiment=data.get("sentiment"),
-            industry=data.get("industry")
+            industry=data.get("industry"),
+            duplicate_of=data.get("duplicate_of")
         )
     
     def validate(self) -> bool:
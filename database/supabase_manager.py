@@ -4,31 +4,84 @@ Centralized database operations for SPA VIP system
 """
 
 import sys
+import time
+import threading
 from supabase import create_client, Client
+from supabase.client import ClientOptions
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from itertools import islice
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator, Set, Tuple
 import logging
 
 from .config import DatabaseConfig
+from .link_index import LinkIndex
+from .near_duplicate_index import NearDuplicateIndex, hamming_distance
 from .schemas import NewsSchema, StockSchema, validate_article_data, validate_stock_data
 
 logger = logging.getLogger(__name__)
 
 class SupabaseManager:
     """Centralized Supabase database manager"""
-    
+
+    # Set to False once the bulk_update_columns RPC is found missing (not on other RPC errors)
+    _bulk_rpc_available = True
+    # Set to False once the news_table_stats RPC is found missing
+    _stats_rpc_available = True
+    # Process-wide (timestamp, stats) cache shared by every manager instance
+    _stats_cache = None
+    # Time of the last successful test_connection probe (process-wide)
+    _connection_verified_at = None
+    # NOT NULL columns an upsert must carry even when it only changes other columns
+    NEWS_REQUIRED_COLUMNS = ("title", "content", "date", "link")
+    # Columns added by database_setup.sql section 6; older databases lack them
+    OPTIONAL_NEWS_COLUMNS = ("summary_source", "duplicate_of")
+    # (table, column) -> column exists, probed once per process by has_column()
+    _column_cache = {}
+
+    # Shared instance returned by SupabaseManager.shared()
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
     def __init__(self):
         """Initialize Supabase client"""
         self.config = DatabaseConfig()
         self.config.validate_config()
         
+        # The client keeps one keep-alive HTTP session for all table/rpc calls,
+        # so sharing the manager (see shared()) pools connections process-wide
         self.client = create_client(
             self.config.SUPABASE_URL, 
-            self.config.SUPABASE_KEY
+            self.config.SUPABASE_KEY,
+            options=ClientOptions(postgrest_client_timeout=self.config.HTTP_TIMEOUT)
+        )
+        
+        # Known links per news table, warmed on demand by crawlers
+        self.link_index = LinkIndex(self, self.config.LINK_INDEX_SNAPSHOT_DIR or None)
+        # SimHash fingerprints of cluster representatives, warmed together with the link index
+        self.near_dup_index = NearDuplicateIndex(
+            self,
+            self.config.NEAR_DUP_SNAPSHOT_DIR or None,
+            max_distance=self.config.NEAR_DUP_MAX_DISTANCE,
+            shingle_size=self.config.NEAR_DUP_SHINGLE_SIZE,
+            min_words=self.config.NEAR_DUP_MIN_WORDS
         )
         
         logger.info("✅ Supabase client initialized successfully")
     
+    @classmethod
+    def shared(cls) -> "SupabaseManager":
+        """
+        Process-wide manager instance, created on first use (thread-safe)
+        
+        Every module of a pipeline run reuses the same client, HTTP connection
+        pool, link index and health probe instead of reconnecting.
+        """
+        if cls._shared_instance is None:
+            with cls._shared_lock:
+                if cls._shared_instance is None:
+                    cls._shared_instance = cls()
+        return cls._shared_instance
+    
     def get_client(self) -> Client:
         """Get Supabase client instance"""
         return self.client
@@ -56,9 +109,9 @@ class SupabaseManager:
                 logger.warning(f"Invalid article data: {article_data.get('title', '')[:50]}...")
                 return False
             
-            # Check for duplicates
+            # Check for duplicates (in-memory when the link index is warm)
             link = article_data.get("link", "")
-            if link and self.article_exists(table_name, link):
+            if link and self.is_known_link(table_name, link):
                 logger.info(f"⏩ Article already exists: {article_data.get('title', '')[:50]}...")
                 return False
             
@@ -68,24 +121,277 @@ class SupabaseManager:
                 logger.warning(f"Article validation failed: {article.title[:50]}...")
                 return False
             
+            # Syndicated copy of a known article -> duplicate_of its representative
+            fingerprint = self._mark_near_duplicate(table_name, article)
+            
             # Insert to database
-            is_general_news = table_name.lower() == "general_news"
             result = self.client.table(table_name).upsert(
-                article.to_dict(include_industry=is_general_news),
-                on_conflict="link"
+                self._article_rows(table_name, [article])[0],
+                on_conflict="link",
+                ignore_duplicates=True  # Never overwrite a row inserted since the index was warmed
             ).execute()
             
             if result.data:
+                self.link_index.add(table_name, [article.link])
+                if article.duplicate_of is None:
+                    self.near_dup_index.add(table_name, result.data[0].get("id"), fingerprint)
+                self.invalidate_stats_cache()
                 logger.info(f"✅ Inserted article: {article.title[:50]}...")
                 return True
             else:
-                logger.error(f"❌ Failed to insert article: {article.title[:50]}...")
+                logger.info(f"⏩ Article not inserted (already exists): {article.title[:50]}...")
                 return False
                 
         except Exception as e:
             logger.error(f"❌ Database error inserting article: {e}")
             return False
     
+    def insert_articles_bulk(self, table_name: str, articles: List[Dict[str, Any]]) -> int:
+        """
+        Insert a whole crawl result list with one dedup query per chunk of links
+        and chunked multi-row upserts
+
+        Args:
+            table_name: Target table name
+            articles: List of article data dictionaries
+
+        Returns:
+            int: Number of articles inserted
+        """
+        inserted, _ = self.insert_articles_bulk_with_links(table_name, articles)
+        return inserted
+
+    def insert_articles_bulk_with_links(self, table_name: str,
+                                        articles: List[Dict[str, Any]]) -> Tuple[int, Set[str]]:
+        """
+        Same as insert_articles_bulk, also reporting which links need no retry
+
+        Returns:
+            tuple: (number of articles inserted, links inserted, already in the table or
+            rejected by validation - those would be rejected again on every run).
+            Links of chunks whose upsert failed are not included, so crawlers only advance
+            their watermark past articles that are stored or can never be stored.
+        """
+        if not articles:
+            return 0, set()
+
+        # Validate whole batch and drop duplicate links inside the batch
+        valid_articles = {}
+        rejected_links = set()
+        for article_data in articles:
+            if not validate_article_data(article_data):
+                logger.warning(f"Invalid article data: {article_data.get('title', '')[:50]}...")
+                if article_data.get("link"):
+                    rejected_links.add(article_data["link"])
+                continue
+
+            article = NewsSchema.from_crawler_data(article_data)
+            if not article.validate():
+                logger.warning(f"Article validation failed: {article.title[:50]}...")
+                rejected_links.add(article.link)
+                continue
+
+            valid_articles.setdefault(article.link, article)
+        rejected_links -= valid_articles.keys()
+
+        if not valid_articles:
+            logger.info(f"⏩ No valid articles to insert into {table_name}")
+            return 0, rejected_links
+
+        # Check for duplicates already in database
+        if self.link_index.is_warm(table_name):
+            existing_links = {link for link in valid_articles if self.link_index.contains(table_name, link)}
+        else:
+            existing_links = self.get_existing_links(table_name, list(valid_articles.keys()))
+        new_articles = [a for link, a in valid_articles.items() if link not in existing_links]
+
+        skipped = len(valid_articles) - len(new_articles)
+        if skipped:
+            logger.info(f"⏩ {skipped} articles already exist in {table_name}")
+
+        if not new_articles:
+            return 0, existing_links | rejected_links
+
+        # Near-duplicates: against known representatives first, then against earlier
+        # articles of this batch (those are inserted in a second pass, once their
+        # representative has an id)
+        fingerprints = [self._mark_near_duplicate(table_name, a) for a in new_articles]
+        first_pass, second_pass = [], []  # indices / (index, index of its representative)
+        for i, article in enumerate(new_articles):
+            batch_rep = None
+            if article.duplicate_of is None and fingerprints[i] is not None:
+                batch_rep = next((j for j in first_pass
+                                  if new_articles[j].duplicate_of is None and fingerprints[j] is not None
+                                  and hamming_distance(fingerprints[i], fingerprints[j]) <= self.near_dup_index.max_distance),
+                                 None)
+            if batch_rep is None:
+                first_pass.append(i)
+            else:
+                second_pass.append((i, batch_rep))
+
+        rows, stored_links = self._upsert_articles(table_name, [new_articles[i] for i in first_pass])
+        ids_by_link = {row.get("link"): row.get("id") for row in rows}
+        for i in first_pass:
+            if new_articles[i].duplicate_of is None and new_articles[i].link in ids_by_link:
+                self.near_dup_index.add(table_name, ids_by_link[new_articles[i].link], fingerprints[i])
+
+        if second_pass:
+            for i, j in second_pass:
+                new_articles[i].duplicate_of = ids_by_link.get(new_articles[j].link)
+            second_rows, second_links = self._upsert_articles(table_name, [new_articles[i] for i, _ in second_pass])
+            rows += second_rows
+            stored_links |= second_links
+
+        duplicates = sum(1 for a in new_articles if a.duplicate_of is not None)
+        if duplicates:
+            logger.info(f"🧬 {duplicates} near-duplicate articles marked with duplicate_of in {table_name}")
+        logger.info(f"✅ Inserted {len(rows)}/{len(new_articles)} new articles into {table_name}")
+        return len(rows), existing_links | stored_links | rejected_links
+
+    def _upsert_articles(self, table_name: str, articles: List[NewsSchema]) -> Tuple[List[Dict], Set[str]]:
+        """
+        Chunked multi-row upsert
+
+        Returns:
+            tuple: (inserted rows, links of every chunk that was written - rows skipped
+            by ignore_duplicates already exist, so they count as stored)
+        """
+        chunk_size = self.config.BULK_CHUNK_SIZE
+        inserted_rows = []
+        stored_links = set()
+
+        for start in range(0, len(articles), chunk_size):
+            chunk = articles[start:start + chunk_size]
+            try:
+                result = self.client.table(table_name).upsert(
+                    self._article_rows(table_name, chunk),
+                    on_conflict="link",
+                    ignore_duplicates=True  # Never overwrite rows inserted since the dedup query
+                ).execute()
+
+                stored_links.update(a.link for a in chunk)
+                if result.data:
+                    inserted_rows.extend(result.data)
+                    self.link_index.add(table_name, [row.get("link") for row in result.data])
+                    self.invalidate_stats_cache()
+                else:
+                    logger.info(f"⏩ {len(chunk)} articles already exist in {table_name}")
+
+            except Exception as e:
+                logger.error(f"❌ Database error inserting {len(chunk)} articles into {table_name}: {e}")
+
+        return inserted_rows, stored_links
+
+    def _article_rows(self, table_name: str, articles: List[NewsSchema]) -> List[Dict]:
+        """
+        Insert payload for articles: optional columns the table lacks are left out and
+        every row carries the same keys (PostgREST multi-row inserts need uniform rows)
+        """
+        is_general_news = table_name.lower() == "general_news"
+        missing = [c for c in self.OPTIONAL_NEWS_COLUMNS if not self.has_column(table_name, c)]
+        rows = [a.to_dict(include_industry=is_general_news, exclude=missing) for a in articles]
+        
+        columns = {column for row in rows for column in row}
+        for row in rows:
+            for column in columns - row.keys():
+                row[column] = None
+        return rows
+
+    def has_column(self, table_name: str, column: str) -> bool:
+        """
+        Check once per process whether a table has an optional column (OPTIONAL_NEWS_COLUMNS)
+        
+        Databases set up before database_setup.sql section 6 lack summary_source and
+        duplicate_of: writes and filters then leave those columns out instead of failing.
+        """
+        key = (table_name, column)
+        if key not in SupabaseManager._column_cache:
+            try:
+                self.client.table(table_name).select(column).limit(1).execute()
+                SupabaseManager._column_cache[key] = True
+            except Exception as e:
+                if not is_missing_column_error(e):
+                    logger.warning(f"⚠️ Could not check column {table_name}.{column}, assuming it exists: {e}")
+                    return True
+                logger.warning(f"⚠️ Column {table_name}.{column} does not exist - run database_setup.sql "
+                               f"(section 6) to enable it; continuing without it")
+                SupabaseManager._column_cache[key] = False
+        return SupabaseManager._column_cache[key]
+
+    def exclude_duplicates(self, query, table_name: str):
+        """Filter out near-duplicate rows (no-op when the table has no duplicate_of column)"""
+        if self.has_column(table_name, "duplicate_of"):
+            return query.is_("duplicate_of", "null")
+        return query
+
+    def _mark_near_duplicate(self, table_name: str, article: NewsSchema) -> Optional[int]:
+        """
+        Set article.duplicate_of when a known representative is a near-duplicate
+        (only once the table's index is warm)
+
+        Returns:
+            Content fingerprint (None if not computed)
+        """
+        if not self.near_dup_index.is_warm(table_name):
+            return None
+
+        fingerprint = self.near_dup_index.fingerprint(article.content)
+        article.duplicate_of = self.near_dup_index.find(table_name, fingerprint)
+        if article.duplicate_of is not None:
+            logger.info(f"🧬 Near-duplicate of #{article.duplicate_of}: {article.title[:50]}...")
+        return fingerprint
+
+    def get_existing_links(self, table_name: str, links: List[str]) -> set:
+        """Return the subset of links already stored in table (one in_ query per chunk)"""
+        existing = set()
+        chunk_size = self.config.IN_FILTER_CHUNK_SIZE
+
+        for start in range(0, len(links), chunk_size):
+            chunk = links[start:start + chunk_size]
+            try:
+                result = self.client.table(table_name)\
+                    .select("link")\
+                    .in_("link", chunk)\
+                    .execute()
+                existing.update(row["link"] for row in result.data)
+            except Exception as e:
+                logger.error(f"Error checking article existence: {e}")
+
+        return existing
+
+    def warm_link_index(self, table_name: str) -> int:
+        """Load known links and near-duplicate fingerprints of a table once (call at crawler start)"""
+        try:
+            # Without a duplicate_of column near-duplicates cannot be marked: leave the index cold
+            if self.has_column(table_name, "duplicate_of"):
+                self.near_dup_index.warm(table_name)
+        except Exception as e:
+            logger.error(f"Error warming near-duplicate index for {table_name}: {e}")
+        
+        try:
+            return self.link_index.warm(table_name)
+        except Exception as e:
+            logger.error(f"Error warming link index for {table_name}: {e}")
+            return 0
+    
+    def is_known_link(self, table_name: str, link: str) -> bool:
+        """Check link against the warm index, or the database if the table is not warmed"""
+        if self.link_index.is_warm(table_name):
+            return self.link_index.contains(table_name, link)
+        return self.article_exists(table_name, link)
+    
+    def filter_new_links(self, table_name: str, links: List[str]) -> List[str]:
+        """Drop links already stored (keeps order) so crawlers can skip their detail pages"""
+        if self.link_index.is_warm(table_name):
+            new_links = [link for link in links if not self.link_index.contains(table_name, link)]
+        else:
+            existing = self.get_existing_links(table_name, links)
+            new_links = [link for link in links if link not in existing]
+        
+        if len(new_links) < len(links):
+            logger.info(f"⏩ Skipping {len(links) - len(new_links)}/{len(links)} known links for {table_name}")
+        return new_links
+    
     def article_exists(self, table_name: str, link: str) -> bool:
         """Check if article already exists"""
         try:
@@ -116,10 +422,7 @@ class SupabaseManager:
             for table in tables_to_query:
                 logger.info(f"Querying table: {table}")
                 
-                query = self.client.table(table)\
-                    .select("id, title, content")\
-                    .or_("ai_summary.is.null,ai_summary.eq.")\
-                    .neq("content", "")\
+                query = self._unsummarized_filter(table)(self.client.table(table).select("id, title, content"))\
                     .order("id", desc=True)\
                     .limit(limit)
                 
@@ -142,12 +445,16 @@ class SupabaseManager:
     def update_article_summary(self, article_id: str, summary: str, table_name: str) -> bool:
         """Update article with AI summary"""
         try:
+            values = {"ai_summary": summary}
+            if self.has_column(table_name, "summary_source"):
+                values["summary_source"] = self.config.SUMMARY_SOURCE_MODEL
             response = self.client.table(table_name)\
-                .update({"ai_summary": summary})\
+                .update(values)\
                 .eq("id", article_id)\
                 .execute()
             
             if response.data:
+                self.invalidate_stats_cache()
                 logger.info(f"✅ Updated summary for article {article_id} in {table_name}")
                 return True
             else:
@@ -167,6 +474,7 @@ class SupabaseManager:
                 .execute()
             
             if response.data:
+                self.invalidate_stats_cache()
                 logger.info(f"✅ Updated industry for article {article_id} in {table_name}: {industry}")
                 return True
             else:
@@ -177,6 +485,176 @@ class SupabaseManager:
             logger.error(f"❌ Error updating industry for article {article_id}: {e}")
             return False
     
+    def bulk_update_column(self, table_name: str, key_column: str, values: Dict[Any, Any],
+                           value_column: str) -> Dict[Any, bool]:
+        """
+        Update one column for many rows with chunked requests instead of one UPDATE per row
+
+        Args:
+            table_name: Target table name
+            key_column: Column identifying rows (e.g. "id" or "link")
+            values: Mapping key -> new value
+            value_column: Column to update (e.g. "ai_summary", "industry", "sentiment")
+
+        Returns:
+            Dict[key, bool]: Per-row success
+        """
+        return self.bulk_update_columns(
+            table_name, key_column, {key: {value_column: value} for key, value in values.items()}
+        )
+
+    def bulk_update_columns(self, table_name: str, key_column: str,
+                            rows: Dict[Any, Dict[str, Any]]) -> Dict[Any, bool]:
+        """
+        Update several columns for many rows; all columns of a row change in the same statement
+
+        Uses the bulk_update_columns RPC (crawl/database_setup.sql) when available, otherwise
+        falls back to one UPDATE ... IN (...) per distinct set of values in each chunk, or to
+        a read + one upsert per chunk when values are mostly unique (e.g. summaries).
+
+        Args:
+            table_name: Target table name
+            key_column: Column identifying rows (e.g. "id" or "link")
+            rows: Mapping key -> {column: new value}
+
+        Returns:
+            Dict[key, bool]: Per-row success
+        """
+        results = {key: False for key in rows}
+        if not rows:
+            return results
+
+        keys = list(rows.keys())
+        chunk_size = self.config.BULK_CHUNK_SIZE
+        columns = sorted({column for values in rows.values() for column in values})
+
+        for start in range(0, len(keys), chunk_size):
+            chunk = {key: rows[key] for key in keys[start:start + chunk_size]}
+
+            # The RPC sets every listed column, so rows are sent grouped by their column set
+            chunk_by_columns = {}
+            for key, values in chunk.items():
+                chunk_by_columns.setdefault(tuple(sorted(values)), {})[key] = values
+
+            for value_columns, group in chunk_by_columns.items():
+                updated_keys = None
+                if self._bulk_rpc_available:
+                    updated_keys = self._bulk_update_rpc(table_name, key_column, list(value_columns), group)
+                if updated_keys is None:
+                    updated_keys = self._bulk_update_grouped(table_name, key_column, group)
+
+                for key in group:
+                    results[key] = str(key) in updated_keys
+
+        success_count = sum(results.values())
+        if success_count:
+            self.invalidate_stats_cache()
+        logger.info(f"✅ Updated {', '.join(columns)} for {success_count}/{len(rows)} rows in {table_name}")
+        return results
+
+    def _bulk_update_rpc(self, table_name: str, key_column: str, value_columns: List[str],
+                         chunk: Dict[Any, Dict[str, Any]]) -> Optional[set]:
+        """
+        Single-statement update through RPC
+
+        Returns:
+            Updated keys, or None when this chunk must use the fallback. Only a missing
+            function disables the RPC for the process; timeouts/5xx are retried first
+            and then fall back for this chunk only.
+        """
+        def call_rpc():
+            return self.client.rpc("bulk_update_columns", {
+                "p_table": table_name,
+                "p_key_column": key_column,
+                "p_value_columns": value_columns,
+                "p_rows": [{"key": str(key), "values": values} for key, values in chunk.items()]
+            }).execute()
+
+        try:
+            response = self._execute_with_retry(
+                call_rpc, f"calling bulk_update_columns on {table_name}",
+                should_retry=lambda e: not is_missing_function_error(e)
+            )
+            return {str(key) for key in (response.data or [])}
+        except Exception as e:
+            if is_missing_function_error(e):
+                logger.warning(f"⚠️ bulk_update_columns RPC not installed, using fallback updates: {e}")
+                SupabaseManager._bulk_rpc_available = False
+            else:
+                logger.warning(f"⚠️ bulk_update_columns RPC failed for {len(chunk)} rows, using fallback updates")
+            return None
+
+    def _bulk_update_grouped(self, table_name: str, key_column: str,
+                             chunk: Dict[Any, Dict[str, Any]]) -> set:
+        """
+        One UPDATE per distinct set of values (cheap for labels like industry/sentiment)
+
+        When that would take more requests than reading the chunk and writing it back
+        in one upsert (unique values such as summaries), the upsert is used instead.
+        """
+        keys_by_values = {}
+        for key, values in chunk.items():
+            keys_by_values.setdefault(tuple(sorted(values.items())), []).append(key)
+
+        in_chunk_size = self.config.IN_FILTER_CHUNK_SIZE
+        grouped_requests = sum(-(-len(keys) // in_chunk_size) for keys in keys_by_values.values())
+        upsert_requests = -(-len(chunk) // in_chunk_size) + 1
+        if grouped_requests > upsert_requests:
+            return self._bulk_update_upsert(table_name, key_column, chunk)
+
+        updated_keys = set()
+
+        for values, keys in keys_by_values.items():
+            for start in range(0, len(keys), in_chunk_size):
+                try:
+                    response = self.client.table(table_name)\
+                        .update(dict(values))\
+                        .in_(key_column, keys[start:start + in_chunk_size])\
+                        .execute()
+                    updated_keys.update(str(row[key_column]) for row in (response.data or []))
+                except Exception as e:
+                    logger.error(f"❌ Error updating {', '.join(dict(values))} in {table_name}: {e}")
+
+        return updated_keys
+
+    def _bulk_update_upsert(self, table_name: str, key_column: str,
+                            chunk: Dict[Any, Dict[str, Any]]) -> set:
+        """
+        Read the chunk's rows and write them back with the new values in one upsert on link
+
+        The upsert must carry the NOT NULL columns (the insert half of ON CONFLICT is
+        checked too); id is GENERATED ALWAYS, so link is the conflict target.
+        """
+        keys = list(chunk.keys())
+        columns = ", ".join(dict.fromkeys(("id",) + self.NEWS_REQUIRED_COLUMNS))
+        in_chunk_size = self.config.IN_FILTER_CHUNK_SIZE
+
+        try:
+            current_rows = []
+            for start in range(0, len(keys), in_chunk_size):
+                result = self.client.table(table_name)\
+                    .select(columns)\
+                    .in_(key_column, keys[start:start + in_chunk_size])\
+                    .execute()
+                current_rows.extend(result.data or [])
+
+            values_by_key = {str(key): values for key, values in chunk.items()}
+            payload = [
+                {**{column: row[column] for column in self.NEWS_REQUIRED_COLUMNS}, **values_by_key[str(row[key_column])]}
+                for row in current_rows if str(row[key_column]) in values_by_key
+            ]
+            if not payload:
+                return set()
+
+            response = self.client.table(table_name)\
+                .upsert(payload, on_conflict="link")\
+                .execute()
+            updated_links = {row.get("link") for row in (response.data or [])}
+            return {str(row[key_column]) for row in current_rows if row["link"] in updated_links}
+        except Exception as e:
+            logger.error(f"❌ Error upserting {len(chunk)} rows in {table_name}: {e}")
+            return set()
+
     def fetch_unclassified_articles(self, table_name: str = None, limit: int = 100) -> List[Dict]:
         """
         Fetch articles with summaries but without industry classification (General_News only)
@@ -224,6 +702,147 @@ class SupabaseManager:
             logger.error(f"Error fetching unclassified articles: {e}")
             return []
     
+    # ============ STREAMING FETCHERS ============
+
+    def iter_rows(self, table_name: str, columns: str,
+                  apply_filters: Optional[Callable] = None,
+                  page_size: int = None, key_column: str = "id",
+                  desc: bool = True) -> Iterator[Dict]:
+        """
+        Stream rows with keyset pagination on key_column (no OFFSET, no row-cap truncation)
+
+        Args:
+            table_name: Table to read
+            columns: Columns to select (must include key_column)
+            apply_filters: Function adding filters to the query builder
+            page_size: Rows per request (defaults to FETCH_PAGE_SIZE)
+            key_column: Unique, ordered column used as cursor
+            desc: Newest first when True
+
+        Yields:
+            Rows one at a time
+
+        Raises:
+            The page error once its retries are exhausted (the stream is never silently cut short)
+        """
+        page_size = page_size or self.config.FETCH_PAGE_SIZE
+        last_key = None
+
+        def read_page():
+            query = self.client.table(table_name).select(columns)
+            if apply_filters:
+                query = apply_filters(query)
+            if last_key is not None:
+                query = query.lt(key_column, last_key) if desc else query.gt(key_column, last_key)
+            return query.order(key_column, desc=desc).limit(page_size).execute()
+
+        while True:
+            # A failed page is retried, then raised: never end the stream early on a transient error
+            result = self._execute_with_retry(read_page, f"streaming rows from {table_name}")
+
+            # Stop only on an empty page: a short page may just be the server row cap
+            if not result.data:
+                return
+
+            yield from result.data
+            last_key = result.data[-1][key_column]
+
+    def _execute_with_retry(self, request: Callable[[], Any], description: str,
+                            should_retry: Callable[[Exception], bool] = None) -> Any:
+        """
+        Run a PostgREST request, retrying failures with exponential backoff
+
+        Args:
+            request: Builds and executes the request
+            description: What the request does (for logs)
+            should_retry: Errors it returns False for are raised at once (default: retry all)
+
+        Raises:
+            The last error once REQUEST_RETRIES retries have failed
+        """
+        retries = self.config.REQUEST_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                return request()
+            except Exception as e:
+                if attempt == retries or (should_retry and not should_retry(e)):
+                    logger.error(f"❌ Error {description}: {e}")
+                    raise
+                delay = self.config.REQUEST_RETRY_BACKOFF * (2 ** attempt)
+                logger.warning(f"⚠️ Error {description} (attempt {attempt + 1}/{retries + 1}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def iter_unsummarized_articles(self, table_name: str = None, page_size: int = None) -> Iterator[Dict]:
+        """
+        Stream articles without AI summary, table by table, newest first
+
+        Args:
+            table_name: Specific table or None for all tables
+            page_size: Rows per request
+
+        Yields:
+            Articles with "table_name" set
+        """
+        tables_to_query = [table_name] if table_name else self.config.get_all_news_tables()
+
+        for table in tables_to_query:
+            logger.info(f"Streaming unsummarized articles from: {table}")
+
+            for article in self.iter_rows(table, "id, title, content", self._unsummarized_filter(table), page_size):
+                if article.get("content") and len(article.get("content", "").strip()) > 50:
+                    article["table_name"] = table
+                    yield article
+
+    def _unsummarized_filter(self, table_name: str):
+        """
+        Query filter for rows that still need a model summary: no summary yet, or a
+        summary from an upstream source the table's policy does not accept
+        """
+        conditions = ["ai_summary.is.null", "ai_summary.eq."]
+        rejected = self.config.rejected_summary_sources(table_name)
+        if rejected and self.has_column(table_name, "summary_source"):
+            conditions.append(f"summary_source.in.({','.join(rejected)})")
+
+        def unsummarized(query):
+            # Near-duplicates are skipped: one representative per cluster goes downstream
+            return self.exclude_duplicates(query.or_(",".join(conditions)).neq("content", ""), table_name)
+        return unsummarized
+
+    def iter_unclassified_articles(self, table_name: str = None, page_size: int = None,
+                                   include_missing_sentiment: bool = False) -> Iterator[Dict]:
+        """
+        Stream articles with summaries but without industry classification (General_News only)
+
+        Args:
+            table_name: Should be General_News or None (defaults to General_News)
+            page_size: Rows per request
+            include_missing_sentiment: Also stream rows that only lack sentiment
+
+        Yields:
+            Articles with "table_name" set
+        """
+        table = table_name or 'General_News'
+        if table != 'General_News':
+            logger.warning("⚠️ Industry classification only works on General_News table")
+            return
+
+        missing = "industry.is.null,industry.eq."
+        if include_missing_sentiment:
+            missing += ",sentiment.is.null,sentiment.eq."
+
+        def unclassified(query):
+            query = query.filter("ai_summary", "not.is", "null")\
+                .neq("ai_summary", "")\
+                .or_(missing)
+            return self.exclude_duplicates(query, table)
+
+        logger.info(f"Streaming unclassified articles from: {table}")
+
+        for article in self.iter_rows(table, "id, title, content, ai_summary, industry, sentiment", unclassified, page_size):
+            if article.get("ai_summary") and len(article.get("ai_summary", "").strip()) > 10:
+                article["table_name"] = table
+                yield article
+
     # ============ STOCK OPERATIONS ============
     
     def insert_stock_data(self, table_name: str, stock_data: Dict[str, Any]) -> bool:
@@ -259,71 +878,112 @@ class SupabaseManager:
     
     # ============ STATISTICS ============
     
-    def get_table_stats(self) -> Dict[str, Dict]:
-        """Get comprehensive statistics for all news tables"""
-        stats = {}
+    def get_table_stats(self, use_cache: bool = True) -> Dict[str, Dict]:
+        """
+        Get comprehensive statistics for all news tables
         
-        for table in self.config.get_all_news_tables():
-            try:
-                # Count total articles with valid content
-                total_result = self.client.table(table)\
-                    .select("*", count="exact")\
-                    .neq("content", "")\
-                    .execute()
-                
-                # Count articles with summaries
-                summarized_result = self.client.table(table)\
-                    .select("*", count="exact")\
-                    .filter("ai_summary", "not.is", "null")\
-                    .neq("ai_summary", "")\
-                    .neq("content", "")\
-                    .execute()
-                
-                # Count articles with industry classification (only for General_News)
-                if table == 'General_News':
-                    classified_result = self.client.table(table)\
-                        .select("*", count="exact")\
-                        .filter("industry", "not.is", "null")\
-                        .neq("industry", "")\
-                        .filter("ai_summary", "not.is", "null")\
-                        .neq("ai_summary", "")\
-                        .execute()
-                    classified_count = classified_result.count or 0
-                else:
-                    classified_count = 0  # Other tables don't have industry classification
-                
-                total_count = total_result.count or 0
-                summarized_count = summarized_result.count or 0
-                
-                stats[table] = {
-                    "total": total_count,
-                    "summarized": summarized_count,
-                    "unsummarized": max(0, total_count - summarized_count),
-                    "completion_rate": (summarized_count / total_count * 100) if total_count > 0 else 100,
-                    "classified": classified_count,
-                    "unclassified": max(0, summarized_count - classified_count) if table == 'General_News' else 0,
-                    "classification_rate": (classified_count / summarized_count * 100) if summarized_count > 0 and table == 'General_News' else 0
-                }
-                
-            except Exception as e:
-                logger.error(f"Error getting stats for {table}: {e}")
-                stats[table] = {
-                    "total": 0, 
-                    "summarized": 0, 
-                    "unsummarized": 0, 
-                    "completion_rate": 0,
-                    "classified": 0,
-                    "unclassified": 0,
-                    "classification_rate": 0
-                }
+        Counts for every table come from one news_table_stats RPC call (falls back to
+        head-only count queries) and are cached for STATS_CACHE_TTL seconds.
         
-        return stats
+        Args:
+            use_cache: False to force a fresh count
+            
+        Returns:
+            Dict[str, Dict]: Stats per table name
+        """
+        cache = SupabaseManager._stats_cache
+        if use_cache and cache and time.time() - cache[0] < self.config.STATS_CACHE_TTL:
+            return {table: dict(table_stats) for table, table_stats in cache[1].items()}
+        
+        tables = self.config.get_all_news_tables()
+        counts = self._table_counts_rpc(tables) if SupabaseManager._stats_rpc_available else None
+        if counts is None:
+            counts = {table: self._table_counts_query(table) for table in tables}
+        
+        stats = {table: self._build_table_stats(table, *counts.get(table, (0, 0, 0))) for table in tables}
+        SupabaseManager._stats_cache = (time.time(), stats)
+        return {table: dict(table_stats) for table, table_stats in stats.items()}
+    
+    def invalidate_stats_cache(self):
+        """Drop cached stats (called after writes that change counts)"""
+        SupabaseManager._stats_cache = None
+    
+    def _table_counts_rpc(self, tables: List[str]) -> Optional[Dict[str, tuple]]:
+        """
+        (total, summarized, classified) per table in one call, None if the RPC is not usable
+
+        Only a missing function disables the RPC for the process; other errors
+        (timeouts, 5xx) fall back to count queries for this call only.
+        """
+        try:
+            response = self.client.rpc("news_table_stats", {"p_tables": tables}).execute()
+            return {
+                row["news_table"]: (row["total"] or 0, row["summarized"] or 0, row["classified"] or 0)
+                for row in (response.data or [])
+            }
+        except Exception as e:
+            if is_missing_function_error(e):
+                logger.warning(f"⚠️ news_table_stats RPC not installed, using count queries: {e}")
+                SupabaseManager._stats_rpc_available = False
+            else:
+                logger.warning(f"⚠️ news_table_stats RPC failed, using count queries for this call: {e}")
+            return None
+    
+    def _table_counts_query(self, table: str) -> tuple:
+        """(total, summarized, classified) with head-only count queries (no rows transferred)"""
+        try:
+            # Count total articles with valid content (near-duplicates are never processed)
+            total_query = self.client.table(table)\
+                .select("id", count="exact", head=True)\
+                .neq("content", "")
+            total_result = self.exclude_duplicates(total_query, table).execute()
+            
+            # Count articles with summaries (same rows as total, so pending never goes negative)
+            summarized_query = self.client.table(table)\
+                .select("id", count="exact", head=True)\
+                .filter("ai_summary", "not.is", "null")\
+                .neq("ai_summary", "")\
+                .neq("content", "")
+            summarized_result = self.exclude_duplicates(summarized_query, table).execute()
+            
+            # Count articles with industry classification (only for General_News)
+            if table == 'General_News':
+                classified_query = self.client.table(table)\
+                    .select("id", count="exact", head=True)\
+                    .filter("industry", "not.is", "null")\
+                    .neq("industry", "")\
+                    .filter("ai_summary", "not.is", "null")\
+                    .neq("ai_summary", "")
+                classified_result = self.exclude_duplicates(classified_query, table).execute()
+                classified_count = classified_result.count or 0
+            else:
+                classified_count = 0  # Other tables don't have industry classification
+            
+            return total_result.count or 0, summarized_result.count or 0, classified_count
+            
+        except Exception as e:
+            logger.error(f"Error getting stats for {table}: {e}")
+            return 0, 0, 0
+    
+    @staticmethod
+    def _build_table_stats(table: str, total_count: int, summarized_count: int, classified_count: int) -> Dict:
+        """Derive rates and pending counts from raw counts"""
+        is_general = table == 'General_News'
+        return {
+            "total": total_count,
+            "summarized": summarized_count,
+            "unsummarized": max(0, total_count - summarized_count),
+            "completion_rate": (summarized_count / total_count * 100) if total_count > 0 else 100,
+            "classified": classified_count,
+            "unclassified": max(0, summarized_count - classified_count) if is_general else 0,
+            "classification_rate": (classified_count / summarized_count * 100) if summarized_count > 0 and is_general else 0
+        }
     
     def get_table_count(self, table_name: str) -> int:
         """Get total count for a table"""
         try:
             result = self.client.table(table_name)\
-                .select("*", count="exact")\
+                .select("id", count="exact", head=True)\
                 .execute()
             return result.count or 0
         except Exception as e:
@@ -332,8 +992,21 @@ class SupabaseManager:
     
     # ============ UTILITY METHODS ============
     
-    def test_connection(self) -> bool:
-        """Test database connection"""
+    def test_connection(self, force: bool = False) -> bool:
+        """
+        Test database connection
+        
+        A successful probe is reused for HEALTH_CHECK_TTL seconds so repeated
+        checks during one pipeline run do not query every table again.
+        
+        Args:
+            force: True to probe even if a recent probe succeeded
+        """
+        verified_at = SupabaseManager._connection_verified_at
+        if not force and verified_at and time.time() - verified_at < self.config.HEALTH_CHECK_TTL:
+            logger.debug("✅ Database connection verified recently, skipping probe")
+            return True
+        
         try:
             # Try to query a small sample from each news table
             for table in self.config.get_all_news_tables():
@@ -344,6 +1017,7 @@ class SupabaseManager:
                 logger.info(f"✅ Connection test passed for {table}")
             
             logger.info("✅ All database connections working properly")
+            SupabaseManager._connection_verified_at = time.time()
             return True
             
         except Exception as e:
@@ -352,19 +1026,76 @@ class SupabaseManager:
     
     def close_connection(self):
         """Close database connections (placeholder for compatibility)"""
+        self.link_index.save()
+        self.near_dup_index.save()
         logger.info("🔒 Supabase connections are managed automatically")
     
     def close_connections(self):
         """Close database connections (alias for backward compatibility)"""
         self.close_connection()
 
+# ============ HELPERS ============
+
+def is_missing_function_error(error: Exception) -> bool:
+    """PostgREST/Postgres error for an RPC function that is not installed (PGRST202, 42883)"""
+    message = str(error)
+    return "PGRST202" in message or "42883" in message or "Could not find the function" in message
+
+def is_missing_column_error(error: Exception) -> bool:
+    """PostgREST/Postgres error for a column that does not exist (42703, PGRST204)"""
+    message = str(error)
+    return "42703" in message or "PGRST204" in message or (
+        "column" in message and ("does not exist" in message or "Could not find" in message)
+    )
+
+def iter_batches(rows: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    """Group a row stream into lists of batch_size (last batch may be shorter)"""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def insert_articles_to_database(db_manager: SupabaseManager, table_name: str, articles: List[Dict],
+                                date_parser_func: Optional[Callable[[str], Optional[str]]] = None,
+                                return_links: bool = False):
+    """
+    Insert a crawler's whole result list through the bulk path, normalizing dates first
+    
+    Args:
+        db_manager: Database manager
+        table_name: Target table name
+        articles: Crawled article dictionaries (date is rewritten in place)
+        date_parser_func: Source-specific raw date -> database date string
+        return_links: Also return the links that need no retry - stored, or rejected by
+            validation (for crawl watermarks)
+        
+    Returns:
+        int: Number of articles inserted, or (inserted, done links) with return_links
+    """
+    if date_parser_func:
+        for article_data in articles:
+            if not article_data.get("date"):
+                continue
+            try:
+                parsed_date = date_parser_func(article_data["date"])
+                if parsed_date:
+                    article_data["date"] = parsed_date
+            except Exception:
+                pass
+    
+    if return_links:
+        return db_manager.insert_articles_bulk_with_links(table_name, articles)
+    return db_manager.insert_articles_bulk(table_name, articles)
+
 # ============ FACTORY FUNCTIONS ============
 
 def get_database_manager() -> SupabaseManager:
-    """Factory function to create database manager"""
-    return SupabaseManager()
+    """Factory function to get the shared database manager"""
+    return SupabaseManager.shared()
 
 def get_supabase_client() -> Client:
     """Factory function to get Supabase client"""
-    manager = SupabaseManager()
+    manager = SupabaseManager.shared()
     return manager.get_client()
@@ -153,7 +153,7 @@ def test_database_connection():
     try:
         from database.supabase_manager import SupabaseManager
         
-        db_manager = SupabaseManager()
+        db_manager = SupabaseManager.shared()
         
         # Test connection
         test_query = """
@@ -21,6 +21,7 @@ class Config:
     
     # Model paths - Updated to use model_AI centralized structure
     MODEL_INDUSTRY_PATH = os.path.join(parent_dir, 'model_AI', 'industry_model', 'PhoBERT_summary_industry.bin')
+    MODEL_SENTIMENT_PATH = os.path.join(parent_dir, 'model_AI', 'sentiment_model', 'Phobert_hyper_parameters', 'PhoBERT_summary_sentiment_optuna.bin')
     
     # Table configuration - Industry classification only works on General_News
     NEWS_TABLES = ['General_News']  # Only process general news for industry classification
@@ -31,6 +32,7 @@ class Config:
     DATETIME_COLUMN = 'date'
     SUMMARY_COLUMN = 'ai_summary'
     INDUSTRY_COLUMN = 'industry'
+    SENTIMENT_COLUMN = 'sentiment'
     
     # Industry classification labels (matching trained model - 5 classes)
     INDUSTRY_LABELS = [
@@ -41,6 +43,9 @@ class Config:
         'Other'         # Khác
     ]
     
+    # Sentiment labels (same order as sentiment/predict_sentiment_db.py id2label)
+    SENTIMENT_LABELS = ['Positive', 'Negative', 'Neutral']
+    
     # Processing configuration
     BATCH_SIZE = 50
     PROCESSING_INTERVAL = 60  # seconds
\ No newline at end of file
@@ -53,3 +53,46 @@ class PhoBERTClassifier:
         except Exception as e:
             logging.error(f"Prediction error: {str(e)}")
             return "Unknown", [0]*len(self.labels)
+
+    def predict_batch(self, texts, batch_size=32):
+        """
+        Classify many texts with one forward pass per micro-batch
+
+        Texts are tokenized once and sorted by token count (Vietnamese word segments
+        make character length a poor proxy), so each micro-batch is padded only to
+        its own longest text (dynamic padding).
+
+        Returns:
+            List of (label, probability vector) in input order
+        """
+        if not texts:
+            return []
+        try:
+            all_ids = self.tokenizer(list(texts), truncation=True, max_length=256)["input_ids"]
+        except Exception as e:
+            logging.error(f"Batch tokenization error: {str(e)}")
+            return [("Unknown", [0]*len(self.labels)) for _ in texts]
+
+        results = [None] * len(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(all_ids[i]))
+
+        for start in range(0, len(order), batch_size):
+            micro_batch = order[start:start + batch_size]
+            try:
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [all_ids[i] for i in micro_batch]},
+                    padding=True,
+                    return_tensors="pt"
+                )
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                with torch.inference_mode():
+                    outputs = self.model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+                    probs = torch.softmax(outputs, dim=1).cpu().numpy()
+                for i, row_probs in zip(micro_batch, probs):
+                    results[i] = (self.labels[int(row_probs.argmax())], row_probs)
+            except Exception as e:
+                logging.error(f"Batch prediction error: {str(e)}")
+                for i in micro_batch:
+                    results[i] = ("Unknown", [0]*len(self.labels))
+
+        return results
@@ -0,0 +1,121 @@
+import torch
+import torch.nn as nn
+import logging
+from transformers import AutoConfig, AutoModel, AutoTokenizer
+import os
+
+PHOBERT_BASE = "vinai/phobert-base"
+# Buffers some transformers versions register but older checkpoints do not save
+IGNORED_MISSING_KEYS = {"embeddings.position_ids", "embeddings.token_type_ids"}
+
+class PhoBERTMultiHead:
+    """
+    Several PhoBERT classification heads (e.g. sentiment + industry) behind one tokenizer
+
+    Each checkpoint is a fine-tuned ``bert`` encoder plus an ``fc`` head. Heads whose
+    encoder weights are identical share one encoder, so a batch is encoded once for
+    all of them. Heads fine-tuned separately keep their own encoder (sharing it would
+    change their predictions) but still share tokenization and batch scheduling.
+    """
+
+    def __init__(self, heads):
+        """
+        Args:
+            heads: Dict head name -> (model_path, labels)
+        """
+        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.labels = {name: labels for name, (_, labels) in heads.items()}
+        self.tokenizer = AutoTokenizer.from_pretrained(PHOBERT_BASE)
+        encoder_config = AutoConfig.from_pretrained(PHOBERT_BASE)
+
+        # [(encoder, {head name: fc})]
+        self.groups = []
+        for name, (model_path, labels) in heads.items():
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(f"Model file not found at: {model_path}")
+            state = torch.load(model_path, map_location="cpu")
+            encoder_state = {k[len("bert."):]: v for k, v in state.items() if k.startswith("bert.")}
+
+            fc = nn.Linear(encoder_config.hidden_size, len(labels))
+            fc.load_state_dict({"weight": state["fc.weight"], "bias": state["fc.bias"]})
+            fc.to(self.device).eval()
+
+            group = next((g for g in self.groups if self._same_weights(g[0], encoder_state)), None)
+            if group:
+                group[1][name] = fc
+                logging.info(f"Head '{name}' shares an already loaded encoder")
+                continue
+
+            # Weights come from the checkpoint, no need to load pretrained ones first
+            encoder = AutoModel.from_config(encoder_config)
+            # A missing/renamed key would silently keep random weights -> fail loudly instead
+            incompatible = encoder.load_state_dict(encoder_state, strict=False)
+            missing = [k for k in incompatible.missing_keys if k not in IGNORED_MISSING_KEYS]
+            if missing or incompatible.unexpected_keys:
+                raise RuntimeError(
+                    f"Encoder weights in {model_path} do not match {PHOBERT_BASE}: "
+                    f"missing {missing[:5]} ({len(missing)}), "
+                    f"unexpected {incompatible.unexpected_keys[:5]} ({len(incompatible.unexpected_keys)})"
+                )
+            encoder.to(self.device).eval()
+            self.groups.append((encoder, {name: fc}))
+            logging.info(f"Head '{name}' loaded with its own encoder from {model_path}")
+
+        logging.info(f"Multi-head model ready: {len(heads)} heads on {len(self.groups)} encoder(s)")
+
+    @staticmethod
+    def _same_weights(encoder, encoder_state):
+        loaded = encoder.state_dict()
+        return all(
+            k not in loaded or torch.equal(loaded[k], v.to(loaded[k].device))
+            for k, v in encoder_state.items()
+        )
+
+    def predict_batch(self, texts, batch_size=32):
+        """
+        Run every head on many texts, one tokenizer call and one pass per encoder per micro-batch
+
+        Micro-batches are formed by token count, like PhoBERTClassifier.predict_batch.
+
+        Returns:
+            List of {head name: (label, probability vector)} in input order
+        """
+        if not texts:
+            return []
+        try:
+            all_ids = self.tokenizer(list(texts), truncation=True, max_length=256)["input_ids"]
+        except Exception as e:
+            logging.error(f"Multi-head tokenization error: {str(e)}")
+            return [{name: ("Unknown", [0]*len(labels)) for name, labels in self.labels.items()} for _ in texts]
+
+        results = [None] * len(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(all_ids[i]))
+
+        for start in range(0, len(order), batch_size):
+            micro_batch = order[start:start + batch_size]
+            predictions = {i: {} for i in micro_batch}
+            try:
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [all_ids[i] for i in micro_batch]},
+                    padding=True,
+                    return_tensors="pt"
+                )
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                with torch.inference_mode():
+                    for encoder, fcs in self.groups:
+                        _, pooled_output = encoder(input_ids=inputs["input_ids"],
+                                                   attention_mask=inputs["attention_mask"],
+                                                   return_dict=False)
+                        for name, fc in fcs.items():
+                            probs = torch.softmax(fc(pooled_output), dim=1).cpu().numpy()
+                            for i, row_probs in zip(micro_batch, probs):
+                                predictions[i][name] = (self.labels[name][int(row_probs.argmax())], row_probs)
+            except Exception as e:
+                logging.error(f"Multi-head prediction error: {str(e)}")
+                for i in micro_batch:
+                    predictions[i] = {name: ("Unknown", [0]*len(labels)) for name, labels in self.labels.items()}
+
+            for i in micro_batch:
+                results[i] = predictions[i]
+
+        return results
@@ -3,8 +3,10 @@ import time
 from typing import Dict, Any, List, Optional
 
 from industry.models.phobert_classifier import PhoBERTClassifier
+from industry.models.phobert_multi_head import PhoBERTMultiHead
 from industry.utils.database import PostgresConnector
 from industry.config import Config
+from database import iter_batches
 
 class IndustryClassificationPipeline:
     """
@@ -12,16 +14,30 @@ class IndustryClassificationPipeline:
     Classifies news articles into industry categories using PhoBERT
     """
     
-    def __init__(self):
-        """Initialize the industry classification pipeline"""
+    def __init__(self, with_sentiment: bool = False):
+        """
+        Initialize the industry classification pipeline
+        
+        Args:
+            with_sentiment: Also label missing sentiment in the same run
+                (industry + sentiment heads behind one tokenizer, written in one update;
+                the encoder is only shared when both checkpoints have identical encoder weights)
+        """
         try:
             logging.info("🏭 Initializing Industry Classification Pipeline...")
+            self.with_sentiment = with_sentiment
             
             # Initialize industry classifier
-            self.industry_classifier = PhoBERTClassifier(
-                Config.MODEL_INDUSTRY_PATH,
-                Config.INDUSTRY_LABELS
-            )
+            if with_sentiment:
+                self.industry_classifier = PhoBERTMultiHead({
+                    "industry": (Config.MODEL_INDUSTRY_PATH, Config.INDUSTRY_LABELS),
+                    "sentiment": (Config.MODEL_SENTIMENT_PATH, Config.SENTIMENT_LABELS)
+                })
+            else:
+                self.industry_classifier = PhoBERTClassifier(
+                    Config.MODEL_INDUSTRY_PATH,
+                    Config.INDUSTRY_LABELS
+                )
             
             # Initialize database connector
             self.db = PostgresConnector()
@@ -55,53 +71,94 @@ class IndustryClassificationPipeline:
                 logging.info("📭 No unprocessed articles found for industry classification")
                 return 0
             
-            processed_count = 0
+            return self.classify_articles(articles, batch_size)
             
+        except Exception as e:
+            logging.error(f"❌ Batch processing failed: {str(e)}")
+            return 0
+
+    def classify_articles(self, articles: List[Dict[str, Any]], batch_size: int = None) -> int:
+        """
+        Classify a list of fetched articles and write industries back
+        
+        Args:
+            articles: Articles with id, ai_summary and table_name
+            batch_size: Texts per model forward pass (default: all articles at once)
+            
+        Returns:
+            int: Number of articles successfully processed
+        """
+        try:
+            # Only use ai_summary for industry classification
+            classifiable = []
             for article in articles:
+                summary = article.get(Config.SUMMARY_COLUMN, '')
+                if not summary or len(summary.strip()) < 10:
+                    logging.warning(f"⚠️ No ai_summary available for classification in article {article.get('id')}")
+                    continue
+                classifiable.append(article)
+            
+            # Classify all articles in micro-batches first, then write back in bulk per table
+            predictions = self.industry_classifier.predict_batch(
+                [article[Config.SUMMARY_COLUMN] for article in classifiable],
+                batch_size=batch_size or len(classifiable) or 1
+            )
+            
+            sentiments = [None] * len(classifiable)
+            if self.with_sentiment:
+                sentiments = [heads["sentiment"][0] for heads in predictions]
+                predictions = [heads["industry"] for heads in predictions]
+            
+            # One row per article: industry and sentiment are written in the same statement
+            pending_rows = {}
+            confidences = {}
+            
+            for article, (industry, confidence_scores), sentiment in zip(classifiable, predictions, sentiments):
                 try:
-                    # Get article content for classification
-                    summary = article.get(Config.SUMMARY_COLUMN, '')
-                    
-                    # Only use ai_summary for industry classification
-                    text_to_classify = summary
-                    
-                    if not text_to_classify or len(text_to_classify.strip()) < 10:
-                        logging.warning(f"⚠️ No ai_summary available for classification in article {article.get('id')}")
-                        continue
-                    
-                    # Classify industry
-                    industry, confidence_scores = self.industry_classifier.predict(text_to_classify)
-                    
-                    # Handle confidence scores safely
-                    try:
-                        if confidence_scores is not None and len(confidence_scores) > 0:
-                            max_confidence = float(max(confidence_scores))
-                        else:
+                    row = {}
+                    if not article.get(Config.INDUSTRY_COLUMN):  # Else streamed only for its missing sentiment
+                        # Handle confidence scores safely
+                        try:
+                            if confidence_scores is not None and len(confidence_scores) > 0:
+                                max_confidence = float(max(confidence_scores))
+                            else:
+                                max_confidence = 0.0
+                        except (ValueError, TypeError):
                             max_confidence = 0.0
-                    except (ValueError, TypeError):
-                        max_confidence = 0.0
-                    
-                    # Update article with industry classification
-                    updates = {
-                        Config.INDUSTRY_COLUMN: industry
-                    }
+                        
+                        row[Config.INDUSTRY_COLUMN] = industry
+                        confidences[article['id']] = max_confidence
                     
-                    success = self.db.update_row(
-                        article['id'], 
-                        updates, 
-                        article['table_name']
-                    )
+                    if sentiment and sentiment != "Unknown" and not article.get(Config.SENTIMENT_COLUMN):
+                        row[Config.SENTIMENT_COLUMN] = sentiment
                     
-                    if success:
-                        processed_count += 1
-                        logging.info(f"✅ Classified article {article['id']}: {industry} (confidence: {max_confidence:.3f})")
-                    else:
-                        logging.error(f"❌ Failed to update article {article['id']}")
+                    if row:
+                        pending_rows.setdefault(article['table_name'], {})[article['id']] = row
                         
                 except Exception as e:
                     logging.error(f"❌ Error processing article {article.get('id', 'unknown')}: {str(e)}")
                     continue
             
+            # Update articles with industry classification (and sentiment from the same pass)
+            processed_count = 0
+            for table, rows in pending_rows.items():
+                results = self.db.update_columns(rows, table)
+                
+                sentiment_count = 0
+                for article_id, success in results.items():
+                    row = rows[article_id]
+                    if not success:
+                        logging.error(f"❌ Failed to update article {article_id}")
+                        continue
+                    if Config.SENTIMENT_COLUMN in row:
+                        sentiment_count += 1
+                    if Config.INDUSTRY_COLUMN in row:
+                        processed_count += 1
+                        logging.info(f"✅ Classified article {article_id}: {row[Config.INDUSTRY_COLUMN]} (confidence: {confidences[article_id]:.3f})")
+                
+                if self.with_sentiment:
+                    logging.info(f"💬 Updated sentiment for {sentiment_count} articles in {table}")
+            
             logging.info(f"📊 Successfully processed {processed_count}/{len(articles)} articles")
             return processed_count
             
@@ -165,45 +222,38 @@ class IndustryClassificationPipeline:
         general_news_stats = stats.get('General_News', {})
         total_pending = general_news_stats.get('pending', 0)
         
-        if total_pending == 0:
+        # Shared pass also labels rows that only lack sentiment (None = count failed, stream anyway)
+        sentiment_pending = self.db.count_missing_sentiment() if self.with_sentiment else 0
+        
+        if total_pending == 0 and sentiment_pending == 0:
             logging.info("✅ No pending articles found for industry classification")
             return {'General_News': 0}
         
+        if sentiment_pending:
+            logging.info(f"💬 {sentiment_pending} articles without sentiment (labelled in the same pass)")
+        total_pending = max(total_pending, sentiment_pending or 0)
         total_batches = (total_pending + batch_size - 1) // batch_size  # Ceiling division
         logging.info(f"📊 Found {total_pending} pending articles")
         logging.info(f"🎯 Will process in {total_batches} batches of {batch_size} articles each")
         
         results = {'General_News': 0}
-        batch_number = 1
+        batch_number = 0
         
-        while True:
+        # Keyset stream over pending rows: each row is fetched once, even if its update fails
+        rows = self.db.iter_unprocessed_rows('General_News', include_missing_sentiment=self.with_sentiment)
+        for articles in iter_batches(rows, batch_size):
+            batch_number += 1
             logging.info(f"\n🔄 Processing Batch {batch_number}/{total_batches}")
             logging.info("-" * 50)
             
-            # Process one batch
-            processed = self.process_specific_table('General_News', batch_size)
-            
-            if processed == 0:
-                logging.info("✅ No more articles to process. All pending classifications completed!")
-                break
-            
-            results['General_News'] += processed
-            batch_number += 1
-            
-            # Brief pause between batches to avoid overwhelming the system
-            if processed == batch_size:  # Full batch processed
-                logging.info(f"⏸️ Brief pause before next batch...")
-                time.sleep(2)
-            
-            # Safety check to prevent infinite loops
-            if batch_number > total_batches + 5:  # Allow some buffer
-                logging.warning("⚠️ Maximum batch limit reached. Stopping to prevent infinite loop.")
-                break
+            results['General_News'] += self.classify_articles(articles, batch_size)
+        
+        logging.info("✅ No more articles to process. All pending classifications completed!")
         
         total_processed = results['General_News']
         logging.info(f"\n🎉 BATCH PROCESSING COMPLETED!")
         logging.info(f"📊 Total articles processed: {total_processed}")
-        logging.info(f"🎯 Batches completed: {batch_number - 1}")
+        logging.info(f"🎯 Batches completed: {batch_number}")
         
         return results
 
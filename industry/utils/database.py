@@ -18,7 +18,7 @@ class PostgresConnector:
     
     def __init__(self):
         try:
-            self.db_manager = SupabaseManager()
+            self.db_manager = SupabaseManager.shared()
             self.config = DatabaseConfig()
             
             # Test connection
@@ -56,7 +56,7 @@ class PostgresConnector:
                 
                 # Get articles with ai_summary but without industry classification
                 result = self.db_manager.client.table(table)\
-                    .select("id, title, content, ai_summary")\
+                    .select("id, title, content, ai_summary, industry, sentiment")\
                     .filter("ai_summary", "not.is", "null")\
                     .neq("ai_summary", "")\
                     .or_("industry.is.null,industry.eq.")\
@@ -79,6 +79,20 @@ class PostgresConnector:
             logging.error(f"❌ Error fetching unprocessed rows: {str(e)}")
             return []
 
+    def iter_unprocessed_rows(self, table_name=None, page_size=None, include_missing_sentiment=False):
+        """
+        Stream rows where industry classification is missing (keyset pagination by id)
+        
+        Args:
+            table_name: Specific table to process (should be General_News only)
+            page_size: Rows per request
+            include_missing_sentiment: Also stream rows that only lack sentiment
+            
+        Returns:
+            Generator of articles needing industry classification
+        """
+        return self.db_manager.iter_unclassified_articles(table_name, page_size, include_missing_sentiment)
+
     def update_row(self, article_id, updates, table_name):
         """
         Update article with industry classification
@@ -112,6 +126,49 @@ class PostgresConnector:
             logging.error(f"❌ Error updating article {article_id}: {str(e)}")
             return False
 
+    def update_rows(self, values, column, table_name):
+        """
+        Bulk update one column for many articles
+        
+        Args:
+            values: Dictionary article ID -> new value
+            column: Column to update (e.g. 'industry')
+            table_name: Table containing the articles
+            
+        Returns:
+            Dict[article_id, bool]: Per-row success
+        """
+        try:
+            if not column or not table_name:
+                raise ValueError("Invalid column or table name")
+            
+            return self.db_manager.bulk_update_column(table_name, "id", values, column)
+                
+        except Exception as e:
+            logging.error(f"❌ Error bulk updating {len(values)} articles: {str(e)}")
+            return {article_id: False for article_id in values}
+
+    def update_columns(self, rows, table_name):
+        """
+        Bulk update several columns for many articles, each row in one statement
+        
+        Args:
+            rows: Dictionary article ID -> {column: new value}
+            table_name: Table containing the articles
+            
+        Returns:
+            Dict[article_id, bool]: Per-row success
+        """
+        try:
+            if not table_name:
+                raise ValueError("Invalid table name")
+            
+            return self.db_manager.bulk_update_columns(table_name, "id", rows)
+                
+        except Exception as e:
+            logging.error(f"❌ Error bulk updating {len(rows)} articles: {str(e)}")
+            return {article_id: False for article_id in rows}
+
     def health_check(self):
         """Check database connection health"""
         try:
@@ -125,38 +182,19 @@ class PostgresConnector:
         try:
             stats = {}
             
-            # Only process General_News table
+            # Only process General_News table - counts come from the shared (cached) table stats
             table = 'General_News'
-            try:
-                # Count total articles with summaries
-                total_result = self.db_manager.client.table(table)\
-                    .select("*", count="exact")\
-                    .filter("ai_summary", "not.is", "null")\
-                    .neq("ai_summary", "")\
-                    .execute()
-                
-                # Count articles with industry classification
-                classified_result = self.db_manager.client.table(table)\
-                    .select("*", count="exact")\
-                    .filter("industry", "not.is", "null")\
-                    .neq("industry", "")\
-                    .filter("ai_summary", "not.is", "null")\
-                    .neq("ai_summary", "")\
-                    .execute()
-                
-                total_count = total_result.count or 0
-                classified_count = classified_result.count or 0
-                
-                stats[table] = {
-                    "total_with_summary": total_count,
-                    "classified": classified_count,
-                    "pending": max(0, total_count - classified_count),
-                    "completion_rate": (classified_count / total_count * 100) if total_count > 0 else 100
-                }
-                
-            except Exception as e:
-                logging.error(f"❌ Error getting stats for {table}: {str(e)}")
-                stats[table] = {"total_with_summary": 0, "classified": 0, "pending": 0, "completion_rate": 0}
+            table_stats = self.db_manager.get_table_stats().get(table, {})
+            
+            total_count = table_stats.get("summarized", 0)
+            classified_count = table_stats.get("classified", 0)
+            
+            stats[table] = {
+                "total_with_summary": total_count,
+                "classified": classified_count,
+                "pending": max(0, total_count - classified_count),
+                "completion_rate": (classified_count / total_count * 100) if total_count > 0 else 100
+            }
             
             return stats
             
@@ -164,6 +202,25 @@ class PostgresConnector:
             logging.error(f"❌ Error getting industry stats: {str(e)}")
             return {}
     
+    def count_missing_sentiment(self, table_name='General_News'):
+        """
+        Count rows with a summary but no sentiment (extra backlog of the shared sentiment pass)
+        
+        Returns:
+            int: Row count, or None if the count query failed
+        """
+        try:
+            query = self.db_manager.client.table(table_name)\
+                .select("id", count="exact", head=True)\
+                .filter("ai_summary", "not.is", "null")\
+                .neq("ai_summary", "")\
+                .or_("sentiment.is.null,sentiment.eq.")
+            result = self.db_manager.exclude_duplicates(query, table_name).execute()
+            return result.count or 0
+        except Exception as e:
+            logging.error(f"❌ Error counting rows without sentiment: {str(e)}")
+            return None
+    
     def close_connections(self):
         """Close database connections"""
         try:
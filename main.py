@@ -74,7 +74,7 @@ class SPAVIPPipeline:
     def _initialize_database(self):
         """Initialize database connection"""
         try:
-            self.db_manager = SupabaseManager()
+            self.db_manager = SupabaseManager.shared()
             
             # Test connection
             if self.db_manager.test_connection():
@@ -143,22 +143,27 @@ class SPAVIPPipeline:
             # Import main crawl function
             from crawl.main_crawl import CrawlerController, run_single_crawler
             
+            crawlers_status = {'all_crawlers': {'status': 'success'}}
+            
             # Check if single crawler option is provided
             if crawler_options and crawler_options.get('single'):
                 single_crawler = crawler_options['single']
                 logger.info(f"🎯 Running single crawler: {single_crawler}")
-                run_single_crawler(single_crawler)
+                run_single_crawler(single_crawler, full_recrawl=crawler_options.get('full_recrawl', False))
             else:
                 logger.info("🔄 Running all crawlers...")
                 # Run all crawlers
-                controller = CrawlerController()
+                crawler_options = crawler_options or {}
+                controller = CrawlerController(workers=crawler_options.get('workers'),
+                                               full_recrawl=crawler_options.get('full_recrawl', False))
                 controller.run_all_crawlers()
+                crawlers_status = dict(controller.crawlers_status)
             
             phase_time = time.time() - phase_start
             self.crawl_results = {
                 'status': 'success',
                 'duration': phase_time,
-                'crawlers_status': {'all_crawlers': {'status': 'success'}}
+                'crawlers_status': crawlers_status
             }
             
             logger.info(f"✅ Crawling phase completed in {phase_time/60:.1f} minutes")
@@ -190,7 +195,7 @@ class SPAVIPPipeline:
             from summarization.main_summarization import SummarizationPipeline
             
             # Initialize pipeline
-            pipeline = SummarizationPipeline()
+            pipeline = SummarizationPipeline(profile=(summarization_options or {}).get('profile'))
             
             if summarization_options and summarization_options.get('table'):
                 # Process specific table
@@ -212,7 +217,8 @@ class SPAVIPPipeline:
             self.summarization_results = {
                 'status': 'success',
                 'duration': phase_time,
-                'articles_processed': processed if isinstance(processed, int) else 0
+                'articles_processed': processed if isinstance(processed, int) else 0,
+                'cache': pipeline.summarizer.cache_stats() if pipeline.summarizer else None
             }
             
             logger.info(f"✅ Summarization phase completed in {phase_time/60:.1f} minutes")
@@ -455,6 +461,7 @@ class SPAVIPPipeline:
                 - tables: List of specific tables to process
                 - batch_size: Number of articles to process in one batch (default: 50)
                 - process_all: Process ALL pending articles in batches (default: False)
+                - with_sentiment: Also label missing General_News sentiment in the industry run
         """
         logger.info("\n🏭 PHASE 5: INDUSTRY CLASSIFICATION")
         logger.info("="*50)
@@ -465,13 +472,14 @@ class SPAVIPPipeline:
             # Import industry pipeline
             from industry.pipeline.classification_pipeline import IndustryClassificationPipeline
             
-            # Initialize pipeline
-            pipeline = IndustryClassificationPipeline()
-            
             # Get options
             tables = industry_options.get('tables') if industry_options else None
             batch_size = industry_options.get('batch_size', 50) if industry_options else 50
             process_all = industry_options.get('process_all', False) if industry_options else False
+            with_sentiment = industry_options.get('with_sentiment', False) if industry_options else False
+            
+            # Initialize pipeline
+            pipeline = IndustryClassificationPipeline(with_sentiment=with_sentiment)
             
             if process_all:
                 # Process ALL pending articles in batches
@@ -546,6 +554,12 @@ class SPAVIPPipeline:
             logger.info("⏸️ Waiting 10 seconds between phases...")
             time.sleep(10)
             
+            # Industry + sentiment share one model pass: label General_News first,
+            # so the sentiment phase only has the stock news tables left
+            industry_options = options.get('industry', {}) if options else {}
+            if industry_options.get('with_sentiment'):
+                self.run_industry_phase({**industry_options, 'process_all': True})
+            
             # Phase 3: Sentiment Analysis
             sentiment_options = options.get('sentiment', {}) if options else {}
             self.run_sentiment_phase(sentiment_options)
@@ -563,8 +577,8 @@ class SPAVIPPipeline:
             time.sleep(10)
             
             # Phase 5: Industry Classification
-            industry_options = options.get('industry', {}) if options else {}
-            self.run_industry_phase(industry_options)
+            if not industry_options.get('with_sentiment'):
+                self.run_industry_phase(industry_options)
             
             # Final summary
             self._print_pipeline_summary()
@@ -608,6 +622,11 @@ class SPAVIPPipeline:
             if self.summarization_results['status'] == 'success':
                 articles_processed = self.summarization_results.get('articles_processed', 0)
                 logger.info(f"   📊 Articles processed: {articles_processed}")
+                
+                cache_stats = self.summarization_results.get('cache')
+                if cache_stats:
+                    logger.info(f"   💾 Summary cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                                f"({cache_stats['hit_rate']:.1f}% hit rate)")
         
         # Sentiment results
         if self.sentiment_results:
@@ -658,6 +677,7 @@ Examples:
   python main.py                        # Run complete pipeline (DEFAULT)
   python main.py --full                 # Run complete pipeline (explicit)
   python main.py --crawl-only           # Only crawling phase
+  python main.py --crawl-only --crawl-workers 4 # Crawlers on 4 parallel workers
   python main.py --summarize-only       # Only summarization phase
   python main.py --status               # Show system status only
   python main.py --full --crawl-single fpt # Full pipeline with single crawler
@@ -684,6 +704,10 @@ Examples:
     parser.add_argument('--crawl-single', choices=['fireant_fpt', 'fireant_gas', 'fireant_imp', 'fireant_vcb', 'fireant_general', 
                        'cafef_keyword', 'cafef_general', 'chungta', 'stock_price'],
                        help='Run single crawler only')
+    parser.add_argument('--crawl-workers', type=int, metavar='N',
+                       help='Run independent crawlers (source x ticker) on N parallel workers')
+    parser.add_argument('--full-recrawl', action='store_true',
+                       help='Ignore crawl watermarks and scroll/paginate every source fully')
     
     # Summarization options
     parser.add_argument('--summ-table', choices=['General_News', 'FPT_News', 'GAS_News', 
@@ -703,6 +727,8 @@ Examples:
                        help='Use 30-day sentiment aggregation (weekend/holiday aggregation)')
     parser.add_argument('--summ-priority', action='store_true',
                        help='Process tables by priority (default)')
+    parser.add_argument('--summ-profile', choices=['quality', 'balanced', 'fast', 'fast_short'],
+                       help='Decoding profile for all tables (fast = greedy for backlog catch-up, default: quality)')
     
     # Timeseries options
     parser.add_argument('--ts-stocks', nargs='+',
@@ -714,9 +740,11 @@ Examples:
                        choices=['General_News'],
                        help='Process General_News table for industry classification (default: General_News)')
     parser.add_argument('--ind-batch-size', type=int, default=50,
-                       help='Batch size for industry classification (default: 50)')
+                       help='Articles per fetch and per model forward pass for industry classification (default: 50)')
     parser.add_argument('--ind-process-all', action='store_true',
                        help='Process ALL pending industry classifications in batches')
+    parser.add_argument('--ind-with-sentiment', action='store_true',
+                       help='Label missing General_News sentiment in the industry run (one tokenization, batch schedule and write; each fine-tuned checkpoint still runs its own encoder)')
     
     args = parser.parse_args()
     
@@ -733,6 +761,10 @@ Examples:
             crawl_options = {}
             if args.crawl_single:
                 crawl_options['single'] = args.crawl_single
+            if args.crawl_workers:
+                crawl_options['workers'] = args.crawl_workers
+            if args.full_recrawl:
+                crawl_options['full_recrawl'] = True
             pipeline.run_crawling_phase(crawl_options)
             
         elif args.summarize_only:
@@ -742,6 +774,8 @@ Examples:
                 summarization_options['table'] = args.summ_table
             elif args.summ_priority:
                 summarization_options['priority'] = True
+            if args.summ_profile:
+                summarization_options['profile'] = args.summ_profile
             pipeline.run_summarization_phase(summarization_options)
             
         elif args.sentiment_only:
@@ -775,6 +809,8 @@ Examples:
                 industry_options['batch_size'] = args.ind_batch_size
             if args.ind_process_all:
                 industry_options['process_all'] = True
+            if args.ind_with_sentiment:
+                industry_options['with_sentiment'] = True
             pipeline.run_industry_phase(industry_options)
             
         elif args.full:
@@ -784,6 +820,10 @@ Examples:
             # Crawl options
             if args.crawl_single:
                 options['crawl'] = {'single': args.crawl_single}
+            if args.crawl_workers:
+                options.setdefault('crawl', {})['workers'] = args.crawl_workers
+            if args.full_recrawl:
+                options.setdefault('crawl', {})['full_recrawl'] = True
             
             # Summarization options
             summ_opts = {}
@@ -797,6 +837,8 @@ Examples:
                 summ_opts['table'] = args.summ_table
             elif args.summ_priority:
                 summ_opts['priority'] = True
+            if args.summ_profile:
+                summ_opts['profile'] = args.summ_profile
             if summ_opts:
                 options['summarization'] = summ_opts
             
@@ -818,6 +860,8 @@ Examples:
                 ind_opts['tables'] = args.ind_tables
             if args.ind_batch_size:
                 ind_opts['batch_size'] = args.ind_batch_size
+            if args.ind_with_sentiment:
+                ind_opts['with_sentiment'] = True
             if ind_opts:
                 options['industry'] = ind_opts
                 
@@ -837,8 +881,11 @@ Examples:
             print("")
             print("🔧 ADVANCED OPTIONS:")
             print("  --crawl-single <crawler>              : Use specific crawler")
+            print("  --crawl-workers <N>                   : Run crawlers on N parallel workers")
+            print("  --full-recrawl                        : Ignore crawl watermarks (crawl everything again)")
             print("  --summ-table <table>                  : Process specific table")
             print("  --summ-priority                       : Process by priority")
+            print("  --summ-profile <profile>              : Decoding profile (quality, balanced, fast, fast_short)")
             print("  --sent-tables <table1> <table2>       : Process specific tables for sentiment")
             print("  --ts-stocks <stock1> <stock2>         : Predict specific stocks")
             print("  --ind-tables <table1> <table2>        : Classify General_News table (industry)")
@@ -850,7 +897,9 @@ Examples:
             print("  python main.py --full --summ-priority : Full pipeline with priority")
             print("  python main.py --full --recalculate-all-stock : Full pipeline with sentiment recalculation")
             print("  python main.py --crawl-only --crawl-single fpt : Only FPT crawler")
+            print("  python main.py --crawl-only --crawl-workers 4 : All crawlers, 4 at a time")
             print("  python main.py --summarize-only --summ-table FPT_News : Only FPT table")
+            print("  python main.py --summarize-only --summ-profile fast : Catch up the backlog with greedy decoding")
             print("  python main.py --sentiment-only --sent-tables FPT_News : Only FPT sentiment")
             print("  python main.py --sentiment-only --recalculate-all-stock : Recalculate all sentiment stats")
             print("  python main.py --timeseries-only --ts-stocks FPT : Only FPT prediction")
@@ -0,0 +1,81 @@
+"""
+Benchmark sentiment inference: per-row loop vs batched length-bucketed inference
+
+Usage:
+    python sentiment/benchmark_sentiment.py --table FPT_News --n 200 --batch-size 32
+"""
+
+import argparse
+import time
+import sys
+import os
+
+import torch
+
+# Add paths for centralized database import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment import predict_sentiment_db as sentiment_db
+from sentiment.predict_sentiment_db import get_database_manager, ensure_sentiment_model, predict_sentiments_batch
+
+
+def load_summaries(table_name, n):
+    """Take up to n non-empty summaries from a news table"""
+    db_manager = get_database_manager()
+    summaries = []
+    for row in db_manager.iter_rows(table_name, "id, ai_summary", lambda q: q.neq("ai_summary", "")):
+        if (row.get("ai_summary") or "").strip():
+            summaries.append(row["ai_summary"])
+        if len(summaries) >= n:
+            break
+    return summaries
+
+
+def predict_one_by_one(texts):
+    """Baseline: the previous per-row loop (one forward pass per summary)"""
+    labels = []
+    for text in texts:
+        inputs = sentiment_db.tokenizer(text, return_tensors="pt", padding=True,
+                                        truncation=True, max_length=sentiment_db.SENTIMENT_MAX_LENGTH)
+        with torch.no_grad():
+            outputs = sentiment_db.model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+        labels.append(sentiment_db.id2label[torch.argmax(outputs, dim=1).item()])
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched sentiment inference")
+    parser.add_argument("--table", default="FPT_News", help="News table to sample summaries from")
+    parser.add_argument("--n", type=int, default=200, help="Number of summaries")
+    parser.add_argument("--batch-size", type=int, default=sentiment_db.SENTIMENT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    ensure_sentiment_model()
+    texts = load_summaries(args.table, args.n)
+    if not texts:
+        print(f"⚠️ No summaries found in {args.table}")
+        return
+
+    print(f"📄 {len(texts)} summaries from {args.table} | torch threads: {torch.get_num_threads()}")
+
+    # Warm-up so one-time allocation does not count against either path
+    predict_sentiments_batch(texts[:4], args.batch_size)
+
+    start = time.time()
+    baseline = predict_one_by_one(texts)
+    baseline_time = time.time() - start
+
+    start = time.time()
+    batched = [label for label, _ in predict_sentiments_batch(texts, args.batch_size)]
+    batched_time = time.time() - start
+
+    agreement = sum(a == b for a, b in zip(baseline, batched)) / len(texts) * 100
+
+    print(f"🐢 Per-row : {baseline_time:.2f}s ({len(texts) / baseline_time:.1f} texts/s)")
+    print(f"🚀 Batched : {batched_time:.2f}s ({len(texts) / batched_time:.1f} texts/s, batch size {args.batch_size})")
+    print(f"📈 Speedup : {baseline_time / batched_time:.1f}x")
+    print(f"✅ Label agreement: {agreement:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,7 +31,7 @@ def check_15_days_history_for_stock(stock_code: str):
     
     try:
         # Initialize database
-        db_manager = SupabaseManager()
+        db_manager = SupabaseManager.shared()
         table_name = f"{stock_code}_Stock"
         
         # Query exactly like timeseries prediction does
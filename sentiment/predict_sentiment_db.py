@@ -13,7 +13,7 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
 # Import centralized database system
-from database import SupabaseManager, DatabaseConfig
+from database import SupabaseManager, DatabaseConfig, iter_batches
 
 
 # ====================== 1. Định nghĩa model ======================
@@ -51,10 +51,61 @@ def load_sentiment_model():
 # Initialize model globally (will be loaded when needed)
 model, tokenizer, id2label = None, None, None
 
+def ensure_sentiment_model():
+    """Load the global model/tokenizer on first use"""
+    global model, tokenizer, id2label
+    if model is None:
+        print("🔄 Loading sentiment analysis model...")
+        model, tokenizer, id2label = load_sentiment_model()
+        print("✅ Sentiment model loaded successfully")
+    return model, tokenizer, id2label
+
+# ====================== 2b. Batched inference ======================
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", 32))
+SENTIMENT_MAX_LENGTH = 256
+
+def predict_sentiments_batch(texts, batch_size=None, max_length=SENTIMENT_MAX_LENGTH):
+    """
+    Predict sentiment for many texts with batched inference
+    
+    Texts are tokenized once, sorted by token length and run in buckets of
+    batch_size, each padded only to its own longest text.
+    
+    Args:
+        texts: List of summaries
+        batch_size: Texts per forward pass (default SENTIMENT_BATCH_SIZE)
+        max_length: Truncation length in tokens
+    
+    Returns:
+        List of (label, {label: probability}) in input order
+    """
+    ensure_sentiment_model()
+    batch_size = batch_size or SENTIMENT_BATCH_SIZE
+    if not texts:
+        return []
+    
+    all_ids = tokenizer(list(texts), truncation=True, max_length=max_length)["input_ids"]
+    order = sorted(range(len(texts)), key=lambda i: len(all_ids[i]))
+    
+    results = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        inputs = tokenizer.pad({"input_ids": [all_ids[i] for i in bucket]}, padding=True, return_tensors="pt")
+        
+        with torch.inference_mode():
+            logits = model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+            probs = torch.softmax(logits, dim=1).tolist()
+        
+        for i, row_probs in zip(bucket, probs):
+            label_probs = {id2label[k]: p for k, p in enumerate(row_probs)}
+            results[i] = (id2label[max(range(len(row_probs)), key=row_probs.__getitem__)], label_probs)
+    
+    return results
+
 # ====================== 3. Database Manager ======================
 def get_database_manager():
     """Get centralized database manager"""
-    return SupabaseManager()
+    return SupabaseManager.shared()
 
 # ====================== 4. Hàm update DB ======================
 def update_sentiment_in_db(db_manager, table_name, link, sentiment):
@@ -75,17 +126,35 @@ def update_sentiment_in_db(db_manager, table_name, link, sentiment):
         print(f"❌ Error updating sentiment: {e}")
         return False
 
+def update_sentiments_in_db(db_manager, table_name, sentiments):
+    """Bulk update sentiment for many links - returns {link: success}"""
+    try:
+        results = db_manager.bulk_update_column(table_name, "link", sentiments, "sentiment")
+        print(f"✅ Updated sentiment for {sum(results.values())}/{len(sentiments)} links in {table_name}")
+        return results
+    except Exception as e:
+        print(f"❌ Error bulk updating sentiment: {e}")
+        return {link: False for link in sentiments}
+
 # ====================== 5. Đọc dữ liệu từ DB ======================
+def iter_data_from_db(db_manager, table_name, page_size=None):
+    """Stream rows without sentiment (keyset pagination by id, không bị cắt ở row cap của PostgREST)"""
+    def without_sentiment(query):
+        # Only get records where sentiment is NULL or empty AND ai_summary is not empty
+        # (near-duplicates are skipped so syndicated copies do not inflate daily counts)
+        query = query.neq("ai_summary", "").or_("sentiment.is.null,sentiment.eq.")
+        return db_manager.exclude_duplicates(query, table_name)
+
+    for row in db_manager.iter_rows(table_name, "id, link, ai_summary, date, sentiment", without_sentiment, page_size):
+        if not row.get("sentiment"):
+            yield row
+
 def get_data_from_db(db_manager, table_name):
     """Get data using centralized database manager - only rows without sentiment"""
     try:
-        # Only get records where sentiment is NULL or empty AND ai_summary is not empty
-        response = db_manager.client.table(table_name).select("link, ai_summary, date, sentiment").neq("ai_summary", "").or_("sentiment.is.null,sentiment.eq.").execute()
+        df = pd.DataFrame(list(iter_data_from_db(db_manager, table_name)))
         
-        if response.data:
-            df = pd.DataFrame(response.data)
-            # Filter out records that already have sentiment
-            df = df[(df['sentiment'].isna()) | (df['sentiment'] == '') | (df['sentiment'].isnull())]
+        if not df.empty:
             print(f"📄 Loaded {len(df)} rows from {table_name} (only records without sentiment)")
             return df
         else:
@@ -96,70 +165,62 @@ def get_data_from_db(db_manager, table_name):
         return pd.DataFrame()
 
 # ====================== 6. Dự đoán và cập nhật DB ======================
-def predict_and_update_sentiment(db_manager, table_name):
-    """Predict sentiment and update database using centralized system"""
-    global model, tokenizer, id2label
-    
-    # Load model if not already loaded
-    if model is None:
-        print("🔄 Loading sentiment analysis model...")
-        model, tokenizer, id2label = load_sentiment_model()
-        print("✅ Sentiment model loaded successfully")
-    
-    # Get data from database
-    df = get_data_from_db(db_manager, table_name)
-    if df.empty:
-        print(f"⚠️ No articles to process in {table_name}")
-        return set()
+def predict_and_update_sentiment(db_manager, table_name, page_size=None, batch_size=None):
+    """Predict sentiment and update database using centralized system (streaming, batched inference)"""
+    ensure_sentiment_model()
 
     updated_dates = set()
     count = 0
-    start_time = None
+    total_rows = 0
+    inference_time = 0.0
+    update_time = 0.0
     successful_updates = 0
 
-    print(f"🚀 Starting sentiment analysis for {len(df)} articles in {table_name}...")
+    print(f"🚀 Starting sentiment analysis for {table_name}...")
 
-    for i, row in tqdm(df.iterrows(), total=len(df), desc=f"Processing {table_name}"):
-        text = row["ai_summary"] if pd.notna(row["ai_summary"]) else ""
-        if not text.strip():
+    # Stream rows from database, predict and write results back once per chunk
+    rows = iter_data_from_db(db_manager, table_name, page_size)
+    for chunk in iter_batches(tqdm(rows, desc=f"Processing {table_name}"), db_manager.config.BULK_CHUNK_SIZE):
+        total_rows += len(chunk)
+        chunk = [row for row in chunk if (row.get("ai_summary") or "").strip()]
+        if not chunk:
             continue
 
-        if count == 0:
-            start_time = time.time()
-
-        # Tokenize and predict
-        inputs = tokenizer(
-            text,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=256
-        )
-
-        with torch.no_grad():
-            outputs = model(
-                input_ids=inputs["input_ids"],
-                attention_mask=inputs["attention_mask"]
-            )
-            predicted_class = torch.argmax(outputs, dim=1).item()
-
-        sentiment = id2label[predicted_class]
-        
-        # Update database
-        if update_sentiment_in_db(db_manager, table_name, row["link"], sentiment):
-            successful_updates += 1
-            
-            # Track updated dates
-            if "date" in row and pd.notna(row["date"]):
-                updated_dates.add(str(row["date"]))
+        # Chỉ đo thời gian suy luận và cập nhật, không tính thời gian đọc DB
+        start = time.time()
+        predictions = predict_sentiments_batch([row["ai_summary"] for row in chunk], batch_size)
+        inference_time += time.time() - start
+
+        sentiments = {}
+        link_dates = {}
+        for row, (sentiment, _) in zip(chunk, predictions):
+            sentiments[row["link"]] = sentiment
+            if row.get("date"):
+                link_dates[row["link"]] = str(row["date"])
+
+        count += len(chunk)
+
+        # Update database (bulk)
+        start = time.time()
+        results = update_sentiments_in_db(db_manager, table_name, sentiments)
+        update_time += time.time() - start
+        for link, success in results.items():
+            if success:
+                successful_updates += 1
+                
+                # Track updated dates
+                if link in link_dates:
+                    updated_dates.add(link_dates[link])
 
-        count += 1
-        if count == 10:
-            elapsed = time.time() - start_time
-            print(f"📊 Performance: {elapsed:.2f}s for 10 articles ({elapsed/10:.3f}s/article)")
+    if total_rows == 0:
+        print(f"⚠️ No articles to process in {table_name}")
+        return set()
 
+    if count:
+        print(f"📊 Performance: inference {inference_time:.2f}s ({count / max(inference_time, 1e-9):.1f} texts/s) "
+              f"| DB update {update_time:.2f}s for {count} articles")
     print(f"🎉 Sentiment analysis completed for {table_name}!")
-    print(f"📈 Successfully updated: {successful_updates}/{len(df)} articles")
+    print(f"📈 Successfully updated: {successful_updates}/{total_rows} articles")
     return updated_dates
 
 # ====================== 7. Sentiment Statistics Functions ======================
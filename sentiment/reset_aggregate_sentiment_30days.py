@@ -38,7 +38,7 @@ def reset_and_aggregate_sentiment_30days(stock_code: str):
     
     try:
         # Initialize database
-        db_manager = SupabaseManager()
+        db_manager = SupabaseManager.shared()
         news_table = f"{stock_code}_News"
         stock_table = f"{stock_code}_Stock"
         
@@ -20,7 +20,7 @@ def test_30day_sentiment():
     print("🧪 Testing 30-day sentiment aggregation logic")
     
     # Initialize database
-    db_manager = SupabaseManager()
+    db_manager = SupabaseManager.shared()
     
     # Test for FPT (since it has recent sentiment data)
     stock_code = "FPT"
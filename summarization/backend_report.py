@@ -0,0 +1,118 @@
+"""
+Accuracy-vs-speed report for summarizer backends
+
+Summarizes a fixed sample with every backend, scores each against the fp32
+(torch) outputs with ROUGE-1 / ROUGE-L F1 and writes Config.BACKEND_REPORT_PATH.
+NewsSummarizer only uses a non-torch backend if this report approves it.
+
+Usage (from project root):
+    python summarization/backend_report.py --table FPT_News --n 20
+    python summarization/backend_report.py --backends torch int8
+"""
+import argparse
+import json
+import time
+import sys
+import os
+from datetime import datetime
+
+# Same import layout as main.py
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'summarization'))
+
+from models.summarizer import NewsSummarizer, Config
+from models.backends import BACKENDS
+from benchmark_summarization import load_corpus
+
+
+def _f1(overlap, candidate_len, reference_len):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate_len, overlap / reference_len
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_1(candidate, reference):
+    """Unigram-overlap F1 on whitespace tokens (works for Vietnamese, unlike ASCII-only tokenizers)"""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    ref_counts = {}
+    for token in ref:
+        ref_counts[token] = ref_counts.get(token, 0) + 1
+    overlap = 0
+    for token in cand:
+        if ref_counts.get(token, 0) > 0:
+            ref_counts[token] -= 1
+            overlap += 1
+    return _f1(overlap, len(cand), len(ref))
+
+
+def rouge_l(candidate, reference):
+    """Longest-common-subsequence F1 on whitespace tokens"""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    previous = [0] * (len(ref) + 1)
+    for c in cand:
+        current = [0]
+        for j, r in enumerate(ref):
+            current.append(previous[j] + 1 if c == r else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(cand), len(ref))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ROUGE vs. fp32 and speed for each summarizer backend")
+    parser.add_argument("--table", default="FPT_News", help="Table to take the sample from")
+    parser.add_argument("--corpus", help="JSON file with a list of article texts")
+    parser.add_argument("--n", type=int, default=20, help="Sample size")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    texts = load_corpus(args)
+    if not texts:
+        print("⚠️ Empty sample")
+        return
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    outputs, results = {}, {}
+
+    for backend in backends:
+        try:
+            summarizer = NewsSummarizer(backend=backend, gated=False, use_cache=False)
+        except Exception as e:
+            print(f"❌ {backend}: {e}")
+            if backend == "torch":
+                return  # No fp32 reference to score against
+            continue
+
+        start = time.time()
+        outputs[backend] = summarizer.summarize_batch(texts)
+        seconds = (time.time() - start) / len(texts)
+
+        references = outputs["torch"]
+        r1 = sum(rouge_1(c, r) for c, r in zip(outputs[backend], references)) / len(texts)
+        rl = sum(rouge_l(c, r) for c, r in zip(outputs[backend], references)) / len(texts)
+        results[backend] = {
+            "seconds_per_article": round(seconds, 3),
+            "speedup": round(results["torch"]["seconds_per_article"] / seconds, 2) if "torch" in results else 1.0,
+            "rouge1": round(r1, 4),
+            "rougeL": round(rl, 4),
+            "approved": rl >= Config.MIN_ROUGE_L
+        }
+        print(f"{backend:<6}: {seconds:.2f}s/article | ROUGE-1 {r1:.3f} | ROUGE-L {rl:.3f} | "
+              f"{'✅ approved' if results[backend]['approved'] else '❌ not approved'}")
+        del summarizer
+
+    report = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "reference": "torch",
+        "sample_size": len(texts),
+        "min_rouge_l": Config.MIN_ROUGE_L,
+        "backends": results
+    }
+    with open(Config.BACKEND_REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved to {Config.BACKEND_REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
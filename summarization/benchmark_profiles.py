@@ -0,0 +1,85 @@
+"""
+Decoding profile benchmark: latency and generated tokens/s per profile
+
+Each profile summarizes the same fixed corpus twice: one article at a time
+(latency) and as one batch (throughput in generated tokens per second).
+
+Usage (from project root):
+    python summarization/benchmark_profiles.py --table FPT_News --n 20
+    python summarization/benchmark_profiles.py --profiles quality fast --output profile_report.json
+"""
+import argparse
+import json
+import time
+import sys
+import os
+from datetime import datetime
+
+# Same import layout as main.py
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'summarization'))
+
+from models.summarizer import NewsSummarizer, Config
+from benchmark_summarization import load_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and tokens/s for each decoding profile")
+    parser.add_argument("--table", default="FPT_News", help="Table to take the corpus from")
+    parser.add_argument("--corpus", help="JSON file with a list of article texts")
+    parser.add_argument("--n", type=int, default=20, help="Number of articles")
+    parser.add_argument("--profiles", nargs="+", default=list(Config.DECODING_PROFILES),
+                        choices=list(Config.DECODING_PROFILES))
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    texts = load_corpus(args)
+    if not texts:
+        print("⚠️ Empty corpus")
+        return
+
+    summarizer = NewsSummarizer(use_cache=False)
+    print(f"📄 {len(texts)} articles | device {Config.DEVICE} | backend {summarizer.backend}")
+
+    results = {}
+    for profile in args.profiles:
+        latencies = []
+        for text in texts:
+            start = time.time()
+            summarizer.summarize(text, profile=profile)
+            latencies.append(time.time() - start)
+        latencies.sort()
+
+        start = time.time()
+        summaries = summarizer.summarize_batch(texts, profile=profile)
+        elapsed = time.time() - start
+        generated_tokens = sum(len(ids) for ids in summarizer.tokenizer(summaries)["input_ids"])
+
+        results[profile] = {
+            "mean_latency_s": round(sum(latencies) / len(latencies), 3),
+            "p95_latency_s": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+            "batch_tokens_per_s": round(generated_tokens / elapsed, 1),
+            "batch_articles_per_min": round(len(texts) / elapsed * 60, 1),
+            "avg_summary_tokens": round(generated_tokens / len(texts), 1)
+        }
+        r = results[profile]
+        print(f"{profile:<10}: latency {r['mean_latency_s']:.2f}s (p95 {r['p95_latency_s']:.2f}s) | "
+              f"{r['batch_tokens_per_s']:.1f} tokens/s | {r['batch_articles_per_min']:.1f} articles/minute | "
+              f"{r['avg_summary_tokens']:.0f} tokens/summary")
+
+    if args.output:
+        report = {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "device": Config.DEVICE,
+            "backend": summarizer.backend,
+            "sample_size": len(texts),
+            "profiles": results
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
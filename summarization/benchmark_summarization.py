@@ -0,0 +1,74 @@
+"""
+Throughput benchmark: sequential vs. batched summarization (articles/minute)
+
+The corpus is fixed: the first N articles (lowest ids) with content from a table,
+or a JSON file with a list of texts.
+
+Usage (from project root):
+    python summarization/benchmark_summarization.py --table FPT_News --n 20
+    python summarization/benchmark_summarization.py --corpus corpus.json
+"""
+import argparse
+import json
+import time
+import sys
+import os
+
+# Same import layout as main.py
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'summarization'))
+
+from database import get_database_manager
+from models.summarizer import NewsSummarizer, Config
+
+
+def load_corpus(args):
+    """Fixed corpus from a JSON file or the oldest articles of a table"""
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            return json.load(f)[:args.n]
+
+    texts = []
+    db_manager = get_database_manager()
+    rows = db_manager.iter_rows(args.table, "id, content", lambda q: q.neq("content", ""), desc=False)
+    for row in rows:
+        texts.append(row["content"])
+        if len(texts) >= args.n:
+            break
+    return texts
+
+
+def run(label, summarize, texts):
+    start = time.time()
+    summarize(texts)
+    elapsed = time.time() - start
+    rate = len(texts) / elapsed * 60
+    print(f"{label:<11}: {elapsed:.1f}s | {rate:.1f} articles/minute")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs. batched summarization")
+    parser.add_argument("--table", default="FPT_News", help="Table to take the corpus from")
+    parser.add_argument("--corpus", help="JSON file with a list of article texts")
+    parser.add_argument("--n", type=int, default=20, help="Number of articles")
+    args = parser.parse_args()
+
+    texts = load_corpus(args)
+    if not texts:
+        print("⚠️ Empty corpus")
+        return
+
+    summarizer = NewsSummarizer(use_cache=False)
+    print(f"📄 {len(texts)} articles | device {Config.DEVICE} | "
+          f"threads {Config.CPU_THREADS} | CPU micro-batch {Config.CPU_MICRO_BATCH}")
+
+    sequential = run("Sequential", lambda batch: [summarizer.summarize(t) for t in batch], texts)
+    batched = run("Batched", summarizer.summarize_batch, texts)
+
+    print(f"📈 Speedup: {batched / sequential:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ from utils.logger import logger
 
 def cleanup_unprocessable_articles():
     """Mark articles with insufficient content as unprocessable"""
-    db = SupabaseManager()
+    db = SupabaseManager.shared()
     config = DatabaseConfig()
     
     # Define minimum content length
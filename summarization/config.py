@@ -34,6 +34,17 @@ except ImportError:
 
 load_dotenv()
 
+
+def _parse_table_profiles(raw: str) -> Dict[str, str]:
+    """"General_News=fast;FPT_News=quality" -> {"General_News": "fast", "FPT_News": "quality"}"""
+    profiles = {}
+    for entry in raw.split(";"):
+        if "=" in entry:
+            table, profile = entry.split("=", 1)
+            profiles[table.strip()] = profile.strip()
+    return profiles
+
+
 class Config:
     """Enhanced configuration with additional parameters"""
     
@@ -48,10 +59,46 @@ class Config:
     # Model paths - hardcode path for now 
     MODEL_PATH = r"model_AI/summarization_model/model_vit5"
     
+    # Inference backend: torch (fp32, default) | int8 (dynamic quantization) | onnx (ONNX Runtime)
+    SUMMARIZER_BACKEND = os.getenv("SUMMARIZER_BACKEND", "torch")
+    ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR", MODEL_PATH + "_onnx")  # Cached export next to model_vit5
+    BACKEND_REPORT_PATH = os.getenv("BACKEND_REPORT_PATH", r"model_AI/summarization_model/backend_report.json")
+    MIN_ROUGE_L = float(os.getenv("MIN_ROUGE_L", 0.9))  # vs. fp32 outputs, required for non-torch backends
+    
     # Text processing
     MAX_INPUT_LENGTH = int(os.getenv("MAX_INPUT_LENGTH", 1024))
     MAX_TARGET_LENGTH = int(os.getenv("MAX_TARGET_LENGTH", 256))
     
+    # Decoding profiles (see DECODING_PROFILES): default for the run, optional per-table overrides
+    # e.g. SUMMARY_TABLE_PROFILES="General_News=fast;FPT_News=quality"
+    SUMMARY_PROFILE = os.getenv("SUMMARY_PROFILE", "quality")
+    SUMMARY_TABLE_PROFILES = _parse_table_profiles(os.getenv("SUMMARY_TABLE_PROFILES", ""))
+    
+    # Length-bucketed batching: a batch is padded only to its longest article,
+    # packed so that articles x padded length stays under the token budget
+    TOKEN_BUDGET = int(os.getenv("TOKEN_BUDGET", BATCH_SIZE * MAX_INPUT_LENGTH))
+    MAX_BUCKET_SIZE = int(os.getenv("MAX_BUCKET_SIZE", BATCH_SIZE * 4))  # Caps decoder/beam memory for short articles
+    
+    # Chunked (map-reduce) mode for long articles: split on paragraphs/sentences into chunks of at most
+    # CHUNK_MAX_TOKENS, summarize all chunks as one batch, optionally summarize the joined chunk summaries
+    CHUNKED_SUMMARIZATION = os.getenv("CHUNKED_SUMMARIZATION", "false").lower() == "true"
+    CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", 512))
+    CHUNK_REDUCE = os.getenv("CHUNK_REDUCE", "true").lower() == "true"  # false = concatenate chunk summaries
+    
+    # Content-hash summary cache (SQLite, LRU) - "" disables it
+    SUMMARY_CACHE_PATH = os.getenv(
+        "SUMMARY_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "summary_cache.sqlite")
+    )
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 50000))
+    
+    # Pipelined executor: max batches waiting between fetch -> summarize -> write stages
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 2))
+    
+    # CPU generation
+    CPU_THREADS = int(os.getenv("CPU_THREADS", os.cpu_count() or 1))  # torch intra-op threads
+    CPU_MICRO_BATCH = int(os.getenv("CPU_MICRO_BATCH", 4))  # Articles per generate() call on CPU
+    
     # Performance
     MAX_ARTICLES_PER_RUN = int(os.getenv("MAX_ARTICLES_PER_RUN", 0))  # 0 = unlimited
 
@@ -62,15 +109,44 @@ class Config:
     # News tables
     NEWS_TABLES = TABLE_NAMES  # TABLE_NAMES đã là list
         
+    # Decoding profiles: overrides on top of the shared generation settings
+    # quality    - beam search as before (4 beams on CUDA, 2 on CPU) for fresh news
+    # balanced   - 2 beams everywhere
+    # fast       - greedy decoding with KV cache for backlog catch-up
+    # fast_short - greedy, summaries capped at 128 tokens
+    DECODING_PROFILES = {
+        "quality": {
+            "num_beams": 4 if DEVICE == "cuda" else 2,
+            "no_repeat_ngram_size": 3 if DEVICE == "cuda" else 2,
+            "length_penalty": 1.0,
+            "early_stopping": True
+        },
+        "balanced": {
+            "num_beams": 2,
+            "no_repeat_ngram_size": 3 if DEVICE == "cuda" else 2,
+            "length_penalty": 1.0,
+            "early_stopping": True
+        },
+        "fast": {"num_beams": 1, "do_sample": False},
+        "fast_short": {"num_beams": 1, "do_sample": False, "max_length": 128}
+    }
+    
     @staticmethod
-    def get_generation_config() -> Dict[str, Any]:
+    def profile_for_table(table_name: str, run_profile: str = None) -> str:
+        """Profile chosen for the run wins, then the table override, then SUMMARY_PROFILE"""
+        return run_profile or Config.SUMMARY_TABLE_PROFILES.get(table_name) or Config.SUMMARY_PROFILE
+    
+    @staticmethod
+    def get_generation_config(profile: str = None) -> Dict[str, Any]:
+        profile = profile or Config.SUMMARY_PROFILE
+        if profile not in Config.DECODING_PROFILES:
+            raise ValueError(f"Unknown decoding profile: {profile} (choose from {list(Config.DECODING_PROFILES)})")
+        
         config = {
             "max_length": Config.MAX_TARGET_LENGTH,
             "min_length": 30,
             "repetition_penalty": 1.2,
-            "length_penalty": 1.0,
-            "early_stopping": True,
-            "no_repeat_ngram_size": 3 if Config.DEVICE == "cuda" else 2,
-            "num_beams": 4 if Config.DEVICE == "cuda" else 2
+            "use_cache": True
         }
+        config.update(Config.DECODING_PROFILES[profile])
         return config
\ No newline at end of file
@@ -7,20 +7,42 @@ from tqdm import tqdm
 
 # Import centralized database system
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import SupabaseManager, DatabaseConfig
+from database import SupabaseManager, DatabaseConfig, iter_batches
 
 # Wrapper class for backward compatibility
 class SupabaseHandler:
     def __init__(self):
-        self.db_manager = SupabaseManager()
+        self.db_manager = SupabaseManager.shared()
         self.config = DatabaseConfig()
     
     def fetch_unsummarized_articles(self, limit=100, table_name=None):
         return self.db_manager.fetch_unsummarized_articles(table_name, limit)
     
+    def iter_unsummarized_articles(self, table_name=None, page_size=None):
+        return self.db_manager.iter_unsummarized_articles(table_name, page_size)
+    
     def update_summary(self, article_id, summary, table_name):
         return self.db_manager.update_article_summary(article_id, summary, table_name)
     
+    def update_summaries(self, articles, summaries):
+        """Bulk write-back, grouped by table. Returns number of rows updated"""
+        by_table = {}
+        for article, summary in zip(articles, summaries):
+            if summary:
+                by_table.setdefault(article["table_name"], {})[article["id"]] = summary
+        
+        updated = 0
+        for table_name, values in by_table.items():
+            # Tag as model output so the summary-source policy never re-queues these rows
+            # (same statement as the summary: a row never keeps one without the other)
+            rows = {key: {"ai_summary": summary} for key, summary in values.items()}
+            if self.db_manager.has_column(table_name, "summary_source"):
+                for row in rows.values():
+                    row["summary_source"] = self.config.SUMMARY_SOURCE_MODEL
+            results = self.db_manager.bulk_update_columns(table_name, "id", rows)
+            updated += sum(results.values())
+        return updated
+    
     def get_table_stats(self):
         return self.db_manager.get_table_stats()
 
@@ -36,6 +58,7 @@ Config = config_module.Config
 
 from utils.logger import logger
 from utils.helpers import measure_performance
+from utils.pipelined_executor import PipelinedExecutor
 
 # Import table names from centralized config
 TABLE_NAMES = DatabaseConfig().get_all_news_tables()
@@ -43,8 +66,14 @@ TABLE_NAMES = DatabaseConfig().get_all_news_tables()
 class SummarizationPipeline:
     """Enhanced pipeline for batch processing news from crawl database"""
     
-    def __init__(self):
+    def __init__(self, profile: str = None):
+        """
+        Args:
+            profile: Decoding profile for every table in this run
+                (default: Config.SUMMARY_TABLE_PROFILES per table, then Config.SUMMARY_PROFILE)
+        """
         self.db = SupabaseHandler()
+        self.profile = profile
         self.summarizer = None  # Lazy loading để tiết kiệm memory
         self.start_time = None
         self.processed_count = 0
@@ -59,7 +88,7 @@ class SummarizationPipeline:
         """Lazy load model để tiết kiệm memory"""
         if self.summarizer is None:
             logger.info("Loading AI model...")
-            self.summarizer = NewsSummarizer()
+            self.summarizer = NewsSummarizer(profile=self.profile)
             logger.info("Model loaded and ready")
     
     def log_table_stats(self):
@@ -119,27 +148,12 @@ class SummarizationPipeline:
     def process_batch(self, batch_size: int = 20, table_name: str = None) -> int:
         """Process a batch of articles with improved logging"""
         total_success = 0
-        while True:
-            articles = self.db.fetch_unsummarized_articles(limit=batch_size, table_name=table_name)
-            if not articles:
-                if total_success == 0:
-                    logger.info(f"No articles to process in {table_name or 'all tables'}")
-                break
-            
+        batches = iter_batches(self.db.iter_unsummarized_articles(table_name), batch_size)
+        for articles in batches:
             logger.info(f"Processing {len(articles)} articles from {table_name or 'multiple tables'}")
-            contents = [article["content"] for article in articles]
-            
             try:
-                summaries = self.summarizer.summarize_batch(contents)
-                success_count = 0
-                
-                for article, summary in zip(articles, summaries):
-                    if summary and self.db.update_summary(
-                        article["id"], 
-                        summary, 
-                        article["table_name"]
-                    ):
-                        success_count += 1
+                summaries = self._summarize(articles)
+                success_count = self.db.update_summaries(articles, summaries)
                         
                 logger.info(f"Successfully processed {success_count}/{len(articles)} articles")
                 total_success += success_count
@@ -147,13 +161,16 @@ class SummarizationPipeline:
             except Exception as e:
                 logger.error(f"Batch processing failed: {str(e)}")
                 break
+        
+        if total_success == 0:
+            logger.info(f"No articles processed in {table_name or 'all tables'}")
                 
         return total_success
 
     def process_all_articles(self):
         """Process ALL unsummarized articles until completion"""
         total_processed = 0
-        batch_size = Config.BATCH_SIZE
+        batch_size = Config.MAX_BUCKET_SIZE  # Window the summarizer packs into length buckets
         
         # Get list of news tables
         news_tables = Config.NEWS_TABLES
@@ -161,29 +178,12 @@ class SummarizationPipeline:
         logger.info(f"Processing articles from tables: {news_tables}")
         
         with tqdm(desc="Processing ALL articles") as pbar:
-            while True:
-                articles = self.db.fetch_unsummarized_articles(limit=batch_size)
-                if not articles:
-                    break
-                    
-                contents = [article["content"] for article in articles]
-                summaries = self.summarizer.summarize_batch(contents)
-                
-                batch_processed = 0
-                for article, summary in zip(articles, summaries):
-                    if summary and self.db.update_summary(
-                        article["id"], 
-                        summary, 
-                        article["table_name"]
-                    ):
-                        batch_processed += 1
-                
-                total_processed += batch_processed
+            def on_written(articles, batch_processed, infer_seconds):
                 pbar.update(batch_processed)
-                pbar.set_postfix({"Processed": total_processed})
-                
-                if Config.DEVICE == "cpu":
-                    time.sleep(1)
+                pbar.set_postfix({"Processed": pbar.n})
+            
+            # Fetch, summarize and write back overlap in three stages
+            total_processed = self._run_pipelined(self.db.iter_unsummarized_articles(), batch_size, on_written)
         
         logger.info(f"FINISHED! Total articles processed: {total_processed}")
         return total_processed
@@ -204,7 +204,7 @@ class SummarizationPipeline:
             return 0
         
         total_processed = 0
-        batch_size = Config.BATCH_SIZE
+        batch_size = Config.MAX_BUCKET_SIZE  # Window the summarizer packs into length buckets
         batch_count = 0
         
         logger.info(f"Configuration: Batch size {batch_size} | Device: {Config.DEVICE}")
@@ -217,61 +217,28 @@ class SummarizationPipeline:
         with tqdm(total=total_to_process, desc=f"Processing {table_name}", 
                  bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]") as pbar:
             
-            while True:
-                articles = self.db.fetch_unsummarized_articles(limit=batch_size, table_name=table_name)
-                if not articles:
-                    logger.info(f"✅ No more articles to process in {table_name}")
-                    break
-                
+            def on_written(articles, batch_processed, infer_seconds):
+                nonlocal batch_count
                 batch_count += 1
-                batch_start = time.time()
-                
-                # Clear và informative batch logging
-                logger.info(f"\n� BATCH {batch_count} | Processing {len(articles)} articles...")
+                pbar.update(batch_processed)
                 
-                contents = [article["content"] for article in articles]
+                # Batch completion (runs in the writer thread)
+                avg_time = infer_seconds / len(articles)
+                logger.info(f"BATCH {batch_count} COMPLETE: {batch_processed}/{len(articles)} articles | {infer_seconds:.1f}s | {avg_time:.1f}s/article")
                 
-                try:
-                    # AI processing
-                    logger.info("AI summarizing...")
-                    summaries = self.summarizer.summarize_batch(contents)
-                    
-                    # Database updates
-                    logger.info("Saving to database...")
-                    batch_processed = 0
-                    for article, summary in zip(articles, summaries):
-                        if summary and self.db.update_summary(
-                            article["id"], 
-                            summary, 
-                            article["table_name"]
-                        ):
-                            batch_processed += 1
-                    
-                    # Update counters
-                    total_processed += batch_processed
-                    pbar.update(batch_processed)
-                    
-                    # Batch completion
-                    batch_time = time.time() - batch_start
-                    avg_time = batch_time / len(articles)
-                    
-                    logger.info(f"BATCH {batch_count} COMPLETE: {batch_processed}/{len(articles)} articles | {batch_time:.1f}s | {avg_time:.1f}s/article")
-                    
-                    # Progress summary
-                    completion_rate = (total_processed / total_to_process) * 100
-                    remaining = total_to_process - total_processed
-                    estimated_remaining_time = remaining * avg_time / 60
-                    
-                    logger.info(f"PROGRESS: {total_processed}/{total_to_process} ({completion_rate:.1f}%) | ETA: {estimated_remaining_time:.1f}min")
-                    logger.info("-" * 60)
-                    
-                    if Config.DEVICE == "cpu":
-                        time.sleep(1)  # Brief pause cho CPU
+                # Progress summary
+                completion_rate = (pbar.n / total_to_process) * 100
+                remaining = max(0, total_to_process - pbar.n)
+                estimated_remaining_time = remaining * avg_time / 60
                 
-                except Exception as e:
-                    logger.error(f"BATCH {batch_count} ERROR: {str(e)}")
-                    logger.info("Continuing to next batch...")
-                    continue
+                logger.info(f"PROGRESS: {pbar.n}/{total_to_process} ({completion_rate:.1f}%) | ETA: {estimated_remaining_time:.1f}min")
+                logger.info("-" * 60)
+            
+            # Keyset stream: failed batches are not re-fetched, memory stays constant.
+            # Fetch, summarize and write back overlap in three stages
+            total_processed = self._run_pipelined(self.db.iter_unsummarized_articles(table_name), batch_size, on_written)
+            
+            logger.info(f"✅ No more articles to process in {table_name}")
         
         # Final summary
         total_time = time.time() - start_time
@@ -289,6 +256,31 @@ class SummarizationPipeline:
         
         return total_processed
 
+    def _run_pipelined(self, articles, batch_size: int, on_written=None) -> int:
+        """Prefetch thread -> summarization -> writer thread, returns articles written"""
+        executor = PipelinedExecutor(
+            iter_batches(articles, batch_size),
+            infer=self._summarize,
+            write=self.db.update_summaries,
+            queue_size=Config.PIPELINE_QUEUE_SIZE,
+            on_written=on_written
+        )
+        return executor.run()
+
+    def _summarize(self, articles: List[Dict]) -> List[str]:
+        """Summarize a batch (results in input order), one summarize_batch call per decoding profile"""
+        indices_by_profile = {}
+        for i, article in enumerate(articles):
+            profile = Config.profile_for_table(article["table_name"], self.profile)
+            indices_by_profile.setdefault(profile, []).append(i)
+        
+        summaries = [None] * len(articles)
+        for profile, indices in indices_by_profile.items():
+            generated = self.summarizer.summarize_batch([articles[i]["content"] for i in indices], profile=profile)
+            for i, summary in zip(indices, generated):
+                summaries[i] = summary
+        return summaries
+
     def process_all_tables_by_priority(self):
         """Process all tables theo thứ tự priority với enhanced tracking"""
         try:
@@ -386,11 +378,13 @@ def main_summarization():
     parser.add_argument('--stats', '-s', action='store_true', help='Show database statistics only')
     parser.add_argument('--priority', '-p', action='store_true', help='Process all tables by priority (RECOMMENDED)')
     parser.add_argument('--all', '-a', action='store_true', help='Process all tables sequentially')
+    parser.add_argument('--profile', choices=list(Config.DECODING_PROFILES),
+                       help='Decoding profile for all tables (fast = greedy for backlog catch-up)')
     
     args = parser.parse_args()
     
     # Initialize pipeline
-    pipeline = SummarizationPipeline()
+    pipeline = SummarizationPipeline(profile=args.profile)
     
     try:
         if args.stats:
@@ -0,0 +1,82 @@
+"""
+Inference backends for NewsSummarizer
+
+- torch: PyTorch fp32 (default)
+- int8:  PyTorch with dynamic int8 quantization of Linear layers (CPU)
+- onnx:  ONNX Runtime encoder / decoder-with-past, exported once and cached
+         next to the model directory (needs `optimum[onnxruntime]`)
+
+A non-default backend is only used when the accuracy report written by
+summarization/backend_report.py approves it (ROUGE-L vs. fp32 >= MIN_ROUGE_L).
+"""
+import json
+import torch
+from pathlib import Path
+from transformers import T5ForConditionalGeneration
+
+from utils.logger import logger
+
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def load_model(backend: str, model_path: Path, device: torch.device, onnx_dir: Path):
+    """Load a seq2seq model exposing .generate() for the given backend"""
+    if backend == "torch":
+        return _load_torch(model_path, device)
+    if backend == "int8":
+        return _load_int8(model_path)
+    if backend == "onnx":
+        return _load_onnx(model_path, onnx_dir)
+    raise ValueError(f"Unknown summarizer backend: {backend} (choose from {BACKENDS})")
+
+
+def _load_torch(model_path: Path, device: torch.device):
+    model = T5ForConditionalGeneration.from_pretrained(
+        str(model_path),
+        local_files_only=True
+    ).to(device)
+    model.eval()
+    return model
+
+
+def _load_int8(model_path: Path):
+    """Dynamic quantization only runs on CPU"""
+    model = _load_torch(model_path, torch.device("cpu"))
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_path: Path, onnx_dir: Path):
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError("ONNX backend requires: pip install optimum[onnxruntime]") from e
+
+    if (onnx_dir / "config.json").exists():
+        logger.info(f"Loading cached ONNX export from {onnx_dir}")
+        return ORTModelForSeq2SeqLM.from_pretrained(str(onnx_dir), use_cache=True)
+
+    logger.info(f"Exporting model to ONNX (one-time) into {onnx_dir}...")
+    model = ORTModelForSeq2SeqLM.from_pretrained(str(model_path), export=True, use_cache=True)
+    model.save_pretrained(str(onnx_dir))
+    return model
+
+
+def is_backend_approved(backend: str, report_path: Path, min_rouge_l: float) -> bool:
+    """Check the accuracy report: fp32 is always allowed, others need ROUGE-L >= min_rouge_l"""
+    if backend == "torch":
+        return True
+
+    try:
+        with open(report_path, "r", encoding="utf-8") as f:
+            result = json.load(f)["backends"].get(backend)
+    except (OSError, ValueError, KeyError):
+        logger.warning(f"No backend report at {report_path} - run summarization/backend_report.py")
+        return False
+
+    if not result:
+        logger.warning(f"Backend '{backend}' is missing from {report_path}")
+        return False
+    if result["rougeL"] < min_rouge_l:
+        logger.warning(f"Backend '{backend}' ROUGE-L {result['rougeL']:.3f} < {min_rouge_l} (not approved)")
+        return False
+    return True
@@ -2,7 +2,7 @@ import torch
 import sys
 import os
 import importlib.util
-from transformers import T5ForConditionalGeneration, T5Tokenizer
+from transformers import T5Tokenizer
 from pathlib import Path
 
 # Import Config bằng cách explicit để tránh conflict
@@ -16,17 +16,54 @@ Config = config_module.Config
 # Import logger với absolute import
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.logger import logger
-from typing import List
+from .backends import load_model, is_backend_approved
+from utils.summary_cache import SummaryCache
+from utils.chunking import split_chunks
+from typing import Any, Dict, List
 from tqdm import tqdm
 
 class NewsSummarizer:
     """Optimized summarizer with batch processing"""
     
-    def __init__(self):
-        self.device = torch.device(Config.DEVICE)
+    def __init__(self, backend: str = None, gated: bool = True, use_cache: bool = True,
+                 chunked: bool = None, profile: str = None):
+        """
+        Args:
+            backend: torch | int8 | onnx (default Config.SUMMARIZER_BACKEND)
+            gated: Fall back to torch unless the backend report approves the backend
+            use_cache: Serve repeated content from the summary cache (off for benchmarks)
+            chunked: Map-reduce long articles over paragraph/sentence chunks (default Config.CHUNKED_SUMMARIZATION)
+            profile: Default decoding profile (default Config.SUMMARY_PROFILE)
+        """
+        self.profile = profile or Config.SUMMARY_PROFILE
+        Config.get_generation_config(self.profile)  # Fail fast on unknown profiles
+        self.backend = backend or Config.SUMMARIZER_BACKEND
+        self.chunked = Config.CHUNKED_SUMMARIZATION if chunked is None else chunked
+        if gated and not is_backend_approved(self.backend, Path(Config.BACKEND_REPORT_PATH), Config.MIN_ROUGE_L):
+            logger.warning(f"Backend '{self.backend}' not approved for production, using torch fp32")
+            self.backend = "torch"
+        
+        # Quantized and ONNX Runtime backends run on CPU
+        self.device = torch.device(Config.DEVICE if self.backend == "torch" else "cpu")
+        if self.device.type == "cpu":
+            torch.set_num_threads(Config.CPU_THREADS)
+            logger.info(f"CPU mode: {Config.CPU_THREADS} threads, micro-batch {Config.CPU_MICRO_BATCH}")
         self._validate_model_path()
         self._load_model()
+        self.cache = None
         self._warmup_model()
+        
+        # Opened after warmup so the warmup text is not cached
+        if use_cache and Config.SUMMARY_CACHE_PATH:
+            self.cache = SummaryCache(Config.SUMMARY_CACHE_PATH, Config.SUMMARY_CACHE_MAX_ENTRIES,
+                                      namespace=self._cache_namespace(self.profile))
+    
+    def _cache_namespace(self, profile: str) -> str:
+        """Settings that change the summary text, so they never share cache entries"""
+        namespace = f"{self.backend}|{profile}"
+        if self.chunked:
+            namespace += f"|chunked2:{Config.CHUNK_MAX_TOKENS}:{'reduce' if Config.CHUNK_REDUCE else 'concat'}"
+        return namespace
     
     def _validate_model_path(self):
         """Verify model files exist"""
@@ -38,33 +75,6 @@ class NewsSummarizer:
         if missing:
             raise FileNotFoundError(f"Missing model files: {missing}")
 
-    def summarize_batch(self, texts: List[str]) -> List[str]:
-        """Optimized batch processing with fallback"""
-        if not texts:
-            return []
-            
-        try:
-            inputs = self.tokenizer(
-                ["summarize: " + t for t in texts],
-                max_length=Config.MAX_INPUT_LENGTH,
-                truncation=True,
-                padding="max_length",
-                return_tensors="pt"
-            ).to(self.device)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    **Config.get_generation_config()
-                )
-            
-            return [self.tokenizer.decode(o, skip_special_tokens=True).strip() 
-                   for o in outputs]
-            
-        except Exception as e:
-            logger.warning(f"Batch failed: {str(e)}")
-            return [self.summarize(text) for text in texts]
-
     def _load_model(self):
         """Safely load tokenizer and model"""
         try:
@@ -75,13 +85,8 @@ class NewsSummarizer:
                 local_files_only=True
             )
             
-            logger.info("Loading model weights...")
-            self.model = T5ForConditionalGeneration.from_pretrained(
-                str(self.model_path),
-                local_files_only=True
-            ).to(self.device)
-            
-            self.model.eval()
+            logger.info(f"Loading model weights ({self.backend} backend)...")
+            self.model = load_model(self.backend, self.model_path, self.device, Path(Config.ONNX_EXPORT_DIR))
             logger.info(f"Model loaded on {self.device}")
             
         except Exception as e:
@@ -99,26 +104,128 @@ class NewsSummarizer:
         except Exception as e:
             logger.warning(f"Warmup failed (non-critical): {str(e)}")
 
-    def summarize(self, text: str) -> str:
-        """Generate summary for single article with error handling"""
+    def summarize(self, text: str, profile: str = None) -> str:
+        """Generate summary for single article (served from the content-hash cache when possible)"""
         if not text.strip():
             raise ValueError("Input text cannot be empty")
-            
+        
+        profile = profile or self.profile
+        namespace = self._cache_namespace(profile)
+        cached = self.cache.get(text, namespace) if self.cache else None
+        if cached is not None:
+            return cached
+        
+        generation_config = Config.get_generation_config(profile)
+        if self.chunked:
+            summary = self._generate_chunked([text], generation_config)[0]
+        else:
+            summary = self._generate_one(text, generation_config)
+        if self.cache:
+            self.cache.put(text, summary, namespace)
+        return summary
+
+    def summarize_batch(self, texts: List[str], profile: str = None) -> List[str]:
+        """
+        Batch processing with content-hash cache (results in input order)
+        
+        Only cache misses are generated, and duplicates inside the batch once.
+        
+        Args:
+            texts: Article contents
+            profile: Decoding profile (default: the summarizer's profile)
+        """
+        if not texts:
+            return []
+        profile = profile or self.profile
+        generation_config = Config.get_generation_config(profile)
+        if not self.cache:
+            return self._generate_texts(texts, generation_config)
+        
+        namespace = self._cache_namespace(profile)
+        summaries = [None] * len(texts)
+        pending = {}  # content hash -> indices of texts to generate
+        for i, text in enumerate(texts):
+            cached = self.cache.get(text, namespace)
+            if cached is not None:
+                summaries[i] = cached
+            else:
+                pending.setdefault(self.cache.key(text, namespace), []).append(i)
+        
+        if pending:
+            first_indices = [indices[0] for indices in pending.values()]
+            generated = self._generate_texts([texts[i] for i in first_indices], generation_config)
+            for indices, summary in zip(pending.values(), generated):
+                self.cache.put(texts[indices[0]], summary, namespace)
+                for i in indices:
+                    summaries[i] = summary
+        
+        return summaries
+
+    def cache_stats(self):
+        """Hit/miss counters of the summary cache (None when disabled)"""
+        return self.cache.stats() if self.cache else None
+
+    def _generate_texts(self, texts: List[str], generation_config: Dict[str, Any]) -> List[str]:
+        if self.chunked:
+            return self._generate_chunked(texts, generation_config)
+        return self._generate_batch(texts, generation_config)
+
+    def _generate_chunked(self, texts: List[str], generation_config: Dict[str, Any]) -> List[str]:
+        """
+        Map-reduce summarization (results in input order)
+        
+        Map: every chunk of every article is summarized in one length-bucketed batch.
+        Reduce: articles with several chunks get their joined chunk summaries
+        summarized again (one more batch), or just concatenated when CHUNK_REDUCE is off.
+        Articles that fit in one chunk are summarized exactly as in normal mode.
+        """
+        chunks, owners = [], []
+        for i, text in enumerate(texts):
+            for chunk in self._split_chunks(text):
+                chunks.append(chunk)
+                owners.append(i)
+        
+        parts = [[] for _ in texts]
+        for i, summary in zip(owners, self._generate_batch(chunks, generation_config)):
+            parts[i].append(summary)
+        
+        summaries = [p[0] if len(p) == 1 else " ".join(p) for p in parts]
+        multi_chunk = [i for i, p in enumerate(parts) if len(p) > 1]
+        if multi_chunk:
+            logger.info(f"Chunked {len(multi_chunk)}/{len(texts)} long articles into "
+                        f"{sum(len(parts[i]) for i in multi_chunk)} chunks")
+            if Config.CHUNK_REDUCE:
+                reduced = self._generate_batch(["\n".join(parts[i]) for i in multi_chunk], generation_config)
+                for i, summary in zip(multi_chunk, reduced):
+                    summaries[i] = summary
+        return summaries
+
+    def _split_chunks(self, text: str) -> List[str]:
+        """Split an article into chunks of at most CHUNK_MAX_TOKENS (see utils.chunking.split_chunks)"""
+        return split_chunks(
+            text,
+            encode=lambda texts: self.tokenizer(texts, add_special_tokens=False)["input_ids"],
+            decode=lambda ids: self.tokenizer.decode(ids, skip_special_tokens=True),
+            max_tokens=Config.CHUNK_MAX_TOKENS
+        )
+
+    def _generate_one(self, text: str, generation_config: Dict[str, Any]) -> str:
+        """Generate summary for single article with error handling"""
         try:
             input_text = "summarize: " + text.strip()
             
+            # Single article: no padding needed
             inputs = self.tokenizer(
                 input_text,
                 return_tensors="pt",
                 max_length=Config.MAX_INPUT_LENGTH,
-                truncation=True,
-                padding="max_length"
+                truncation=True
             ).to(self.device)
             
             with torch.no_grad():
                 outputs = self.model.generate(
                     **inputs,
-                    **Config.get_generation_config()
+                    **generation_config
                 )
             
             return self._clean_output(outputs[0])
@@ -131,37 +238,76 @@ class NewsSummarizer:
             logger.error(f"Error: {str(e)}")
             raise RuntimeError("Summarization failed") from e
 
-    def summarize_batch(self, texts: List[str]) -> List[str]:
-        """Batch processing with automatic fallback"""
-        if not texts:
-            return []
-            
-        # Automatic fallback to sequential on CPU or small batches
-        if Config.DEVICE == "cpu" or len(texts) <= 2:
-            return [self.summarize(text) for text in texts]
-            
-        try:
-            input_texts = ["summarize: " + t.strip() for t in texts]
-            
-            inputs = self.tokenizer(
-                input_texts,
-                return_tensors="pt",
-                max_length=Config.MAX_INPUT_LENGTH,
-                truncation=True,
-                padding="max_length"
-            ).to(self.device)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    **Config.get_generation_config()
-                )
-            
-            return [self._clean_output(output) for output in outputs]
-            
-        except RuntimeError as e:
-            logger.warning(f"Batch failed (falling back to sequential): {str(e)}")
-            return [self.summarize(text) for text in texts]
+    def _generate_batch(self, texts: List[str], generation_config: Dict[str, Any]) -> List[str]:
+        """Length-bucketed batch processing with automatic fallback (results in input order)"""
+        if len(texts) == 1:
+            return [self._generate_one(texts[0], generation_config)]
+        
+        input_ids = self.tokenizer(
+            ["summarize: " + t.strip() for t in texts],
+            max_length=Config.MAX_INPUT_LENGTH,
+            truncation=True
+        )["input_ids"]
+        
+        summaries = [None] * len(texts)
+        for bucket in self._length_buckets(input_ids):
+            bucket_ids = [input_ids[i] for i in bucket]
+            try:
+                inputs = self.tokenizer.pad(
+                    {"input_ids": bucket_ids},
+                    padding="longest",
+                    return_tensors="pt"
+                ).to(self.device)
+                self._log_padding_waste(bucket_ids)
+                
+                with torch.no_grad():
+                    outputs = self.model.generate(
+                        **inputs,
+                        **generation_config
+                    )
+                
+                for i, output in zip(bucket, outputs):
+                    summaries[i] = self._clean_output(output)
+                
+            except RuntimeError as e:
+                logger.warning(f"Batch failed (falling back to sequential): {str(e)}")
+                for i in bucket:
+                    summaries[i] = self._generate_one(texts[i], generation_config)
+        
+        return summaries
+
+    def _length_buckets(self, input_ids: List[List[int]]) -> List[List[int]]:
+        """
+        Group article indices by token count
+        
+        Articles are sorted by length and packed while
+        (articles in bucket) x (longest article) stays within TOKEN_BUDGET.
+        On CPU buckets hold at most CPU_MICRO_BATCH articles.
+        """
+        max_bucket_size = Config.CPU_MICRO_BATCH if self.device.type == "cpu" else Config.MAX_BUCKET_SIZE
+        order = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+        buckets, current = [], []
+        
+        for i in order:
+            # Sorted ascending: the new article is the longest in the bucket
+            padded_tokens = (len(current) + 1) * len(input_ids[i])
+            if current and (padded_tokens > Config.TOKEN_BUDGET or len(current) >= max_bucket_size):
+                buckets.append(current)
+                current = []
+            current.append(i)
+        
+        if current:
+            buckets.append(current)
+        return buckets
+
+    def _log_padding_waste(self, bucket_ids: List[List[int]]):
+        """Log share of padded tokens in a batch vs. padding to MAX_INPUT_LENGTH"""
+        real_tokens = sum(len(ids) for ids in bucket_ids)
+        padded_len = max(len(ids) for ids in bucket_ids)
+        waste = 1 - real_tokens / (len(bucket_ids) * padded_len)
+        max_length_waste = 1 - real_tokens / (len(bucket_ids) * Config.MAX_INPUT_LENGTH)
+        logger.info(f"Batch of {len(bucket_ids)} padded to {padded_len} tokens | "
+                    f"padding waste {waste:.1%} (was {max_length_waste:.1%} with max_length padding)")
 
     def _clean_output(self, output_tensor: torch.Tensor) -> str:
         """Clean and format model output"""
@@ -5,16 +5,16 @@ import sys
 import os
 from datetime import datetime
 
-# Add crawl path
-crawl_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crawl')
-if crawl_path not in sys.path:
-    sys.path.insert(0, crawl_path)
+# Import centralized database system
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-from database.supabase_handler import SupabaseHandler
+from database import SupabaseManager
 
 def generate_report():
     """Generate comprehensive pipeline report"""
-    db = SupabaseHandler()
+    db = SupabaseManager.shared()
     
     print("=" * 80)
     print("🗞️  VIETNAMESE NEWS SUMMARIZATION PIPELINE REPORT")
@@ -0,0 +1,71 @@
+import re
+from typing import Callable, List
+
+# Sentence boundary: whitespace after . ! ? or … (Vietnamese news uses the same punctuation)
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_chunks(text: str, encode: Callable[[List[str]], List[List[int]]],
+                 decode: Callable[[List[int]], str], max_tokens: int) -> List[str]:
+    """
+    Split an article into chunks of at most max_tokens for map-reduce summarization
+
+    Paragraphs (newline separated) are packed together first. A paragraph longer
+    than the limit - including a whole article stored as one paragraph, like CafeF
+    content - is split into sentences, and a sentence still longer than the limit
+    into token windows.
+
+    Args:
+        text: Article content
+        encode: Batch tokenizer without special tokens (texts -> token ids)
+        decode: Token ids -> text (used for token windows only)
+        max_tokens: Chunk size limit in tokens
+
+    Returns:
+        List[str]: [text] when it already fits, otherwise the chunks in reading order
+    """
+    paragraphs = [p.strip() for p in text.split("\n") if p.strip()]
+    if not paragraphs:
+        return [text]
+
+    lengths = [len(ids) for ids in encode(paragraphs)]
+    if sum(lengths) <= max_tokens:
+        return [text]
+
+    pieces = []
+    for paragraph, length in zip(paragraphs, lengths):
+        if length <= max_tokens:
+            pieces.append((paragraph, length))
+        else:
+            pieces.extend(_split_paragraph(paragraph, encode, decode, max_tokens))
+    return [chunk for chunk, _ in _pack(pieces, max_tokens, "\n")]
+
+
+def _split_paragraph(paragraph: str, encode: Callable[[List[str]], List[List[int]]],
+                     decode: Callable[[List[int]], str], max_tokens: int) -> List[tuple]:
+    """Sentences of an over-long paragraph packed into (text, tokens) pieces within the limit"""
+    sentences = [s for s in SENTENCE_BOUNDARY.split(paragraph) if s.strip()]
+    pieces = []
+    for sentence, ids in zip(sentences, encode(sentences)):
+        if len(ids) <= max_tokens:
+            pieces.append((sentence, len(ids)))
+            continue
+        # No usable sentence boundary: fixed token windows
+        for start in range(0, len(ids), max_tokens):
+            window = ids[start:start + max_tokens]
+            pieces.append((decode(window), len(window)))
+    return _pack(pieces, max_tokens, " ")
+
+
+def _pack(pieces: List[tuple], max_tokens: int, separator: str) -> List[tuple]:
+    """Greedily join consecutive (text, tokens) pieces while the sum stays within max_tokens"""
+    chunks, current, current_len = [], [], 0
+    for piece, length in pieces:
+        if current and current_len + length > max_tokens:
+            chunks.append((separator.join(current), current_len))
+            current, current_len = [], 0
+        current.append(piece)
+        current_len += length
+    if current:
+        chunks.append((separator.join(current), current_len))
+    return chunks
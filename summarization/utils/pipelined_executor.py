@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .logger import logger
+
+_DONE = object()
+
+
+class PipelinedExecutor:
+    """
+    Overlap DB I/O with inference: prefetch thread -> inference loop -> writer thread
+
+    Batches flow through bounded queues, so the prefetcher never runs more than
+    `queue_size` batches ahead and the writer never lags more than `queue_size`
+    results behind (backpressure). Per-stage busy time is logged at the end.
+    """
+
+    def __init__(self, batches: Iterable[List[Dict]],
+                 infer: Callable[[List[Dict]], Any],
+                 write: Callable[[List[Dict], Any], int],
+                 queue_size: int = 2,
+                 on_written: Optional[Callable[[List[Dict], int, float], None]] = None):
+        """
+        Args:
+            batches: Lazy source of article batches (fetched in the prefetch thread)
+            infer: batch -> result (runs in the calling thread)
+            write: (batch, result) -> rows written (runs in the writer thread)
+            queue_size: Max batches waiting between two stages
+            on_written: Callback (batch, written, inference seconds) after each write
+        """
+        self.batches = batches
+        self.infer = infer
+        self.write = write
+        self.on_written = on_written
+        self.fetched = queue.Queue(maxsize=queue_size)
+        self.inferred = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+        self.busy = {"fetch": 0.0, "infer": 0.0, "write": 0.0}
+        self.written = 0
+        self.fetch_error: Optional[BaseException] = None
+
+    def run(self) -> int:
+        """
+        Run until the source is exhausted. Returns number of rows written
+
+        Raises:
+            The source's error once the batches already fetched are written, so a
+            failed fetch is never mistaken for the end of the backlog
+        """
+        start = time.time()
+        prefetcher = threading.Thread(target=self._prefetch, name="summ-prefetch", daemon=True)
+        writer = threading.Thread(target=self._drain, name="summ-writer", daemon=True)
+        prefetcher.start()
+        writer.start()
+
+        try:
+            while True:
+                batch = self._get(self.fetched)
+                if batch is _DONE:
+                    break
+
+                batch_start = time.time()
+                try:
+                    result = self.infer(batch)
+                except Exception as e:
+                    logger.error(f"Inference failed for batch of {len(batch)}: {str(e)}")
+                    continue
+                finally:
+                    self.busy["infer"] += time.time() - batch_start
+
+                self._put(self.inferred, (batch, result, time.time() - batch_start))
+        finally:
+            # Clean shutdown: stop the prefetcher, let the writer flush what it already has
+            self.stop.set()
+            self.inferred.put(_DONE)
+            writer.join()
+            prefetcher.join(timeout=5)
+
+        self._log_utilization(time.time() - start)
+        if self.fetch_error is not None:
+            raise self.fetch_error
+        return self.written
+
+    # ============ STAGES ============
+
+    def _prefetch(self):
+        try:
+            iterator = iter(self.batches)
+            while not self.stop.is_set():
+                fetch_start = time.time()
+                batch = next(iterator, _DONE)
+                self.busy["fetch"] += time.time() - fetch_start
+                if not self._put(self.fetched, batch) or batch is _DONE:
+                    return
+        except Exception as e:
+            logger.error(f"Prefetch failed: {str(e)}")
+            self.fetch_error = e
+            self._put(self.fetched, _DONE)
+
+    def _drain(self):
+        while True:
+            item = self.inferred.get()
+            if item is _DONE:
+                return
+
+            batch, result, infer_seconds = item
+            write_start = time.time()
+            try:
+                written = self.write(batch, result)
+            except Exception as e:
+                logger.error(f"Write failed for batch of {len(batch)}: {str(e)}")
+                written = 0
+            self.busy["write"] += time.time() - write_start
+            self.written += written
+
+            if self.on_written:
+                try:
+                    self.on_written(batch, written, infer_seconds)
+                except Exception as e:
+                    logger.warning(f"Progress callback failed: {str(e)}")
+
+    # ============ HELPERS ============
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up once shutdown starts"""
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while True:
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                if self.stop.is_set():
+                    return _DONE
+
+    def _log_utilization(self, wall_time: float):
+        if wall_time <= 0:
+            return
+        logger.info("STAGE UTILIZATION: " + " | ".join(
+            f"{stage} {seconds / wall_time:.0%}" for stage, seconds in self.busy.items()
+        ) + f" (wall {wall_time:.1f}s)")
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from .logger import logger
+
+
+class SummaryCache:
+    """
+    Persistent summary cache keyed by a hash of the normalized article content
+
+    Backed by a local SQLite file. When it grows past max_entries, the least
+    recently used summaries are evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 50000, namespace: str = ""):
+        """
+        Args:
+            path: SQLite file (parent directory is created)
+            max_entries: Size bound before LRU eviction
+            namespace: Mixed into the key so different backends/profiles never share entries
+                (get/put/key accept a per-call namespace that overrides it)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "content_hash TEXT PRIMARY KEY, summary TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def key(self, content: str, namespace: Optional[str] = None) -> str:
+        """Hash of lowercased, whitespace-collapsed content"""
+        normalized = re.sub(r"\s+", " ", content).strip().lower()
+        namespace = self.namespace if namespace is None else namespace
+        return hashlib.sha256(f"{namespace}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, content: str, namespace: Optional[str] = None) -> Optional[str]:
+        content_hash = self.key(content, namespace)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE summaries SET last_used = ? WHERE content_hash = ?", (time.time(), content_hash)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, content: str, summary: str, namespace: Optional[str] = None):
+        if not summary:
+            return
+        content_hash = self.key(content, namespace)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO summaries (content_hash, summary, last_used) VALUES (?, ?, ?)",
+                (content_hash, summary, time.time())
+            )
+            if cursor.rowcount:
+                self._count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE summaries SET summary = ?, last_used = ? WHERE content_hash = ?",
+                    (summary, time.time(), content_hash)
+                )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used rows beyond max_entries"""
+        if self._count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM summaries WHERE content_hash IN "
+                "(SELECT content_hash FROM summaries ORDER BY last_used ASC LIMIT ?)",
+                (self._count - self.max_entries,)
+            )
+            self._count = self.max_entries
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups * 100) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        logger.info(f"Summary cache: {self.hits} hits / {self.misses} misses")
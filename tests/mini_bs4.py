@@ -0,0 +1,67 @@
+"""
+Minimal stand-in for bs4.BeautifulSoup (installed as `bs4` by conftest when bs4 is missing)
+
+Supports what the crawler parse helpers under test use: select("tag") / select("tag.class"),
+find("tag") and get_text(strip=True).
+"""
+
+from html.parser import HTMLParser
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+
+
+class Tag:
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.children = []
+
+    def descendants(self):
+        for child in self.children:
+            if isinstance(child, Tag):
+                yield child
+                yield from child.descendants()
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def find(self, name):
+        return next((tag for tag in self.descendants() if tag.name == name), None)
+
+    def select(self, selector):
+        name, _, css_class = selector.partition(".")
+        return [tag for tag in self.descendants()
+                if tag.name == name and (not css_class or css_class in (tag.get("class") or "").split())]
+
+    def get_text(self, strip=False):
+        return "".join(child.get_text(strip) if isinstance(child, Tag) else (child.strip() if strip else child)
+                       for child in self.children)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self, root):
+        super().__init__()
+        self.stack = [root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Tag(tag, attrs)
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].name == tag:
+                del self.stack[depth:]
+                break
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def BeautifulSoup(markup, features=None):
+    root = Tag("[document]", {})
+    builder = _TreeBuilder(root)
+    builder.feed(markup)
+    builder.close()
+    return root
@@ -0,0 +1,148 @@
+from types import SimpleNamespace
+
+from database.supabase_manager import SupabaseManager
+
+
+class StubQuery:
+    """Records one PostgREST call chain and answers execute() from the stub client"""
+
+    def __init__(self, client, table_name):
+        self.client = client
+        self.call = {"table": table_name}
+
+    def select(self, columns):
+        self.call["select"] = columns
+        return self
+
+    def update(self, values):
+        self.call["update"] = values
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.call["upsert"] = rows
+        self.call["on_conflict"] = on_conflict
+        return self
+
+    def in_(self, column, values):
+        self.call["in"] = (column, list(values))
+        return self
+
+    def execute(self):
+        self.client.calls.append(self.call)
+        return SimpleNamespace(data=self.client.answer(self.call))
+
+
+class StubClient:
+    def __init__(self, rows, rpc_error=None):
+        self.rows = {row["id"]: dict(row) for row in rows}
+        self.rpc_error = rpc_error
+        self.calls = []
+
+    def table(self, table_name):
+        return StubQuery(self, table_name)
+
+    def rpc(self, name, params):
+        client = self
+
+        class Call:
+            def execute(self):
+                client.calls.append({"rpc": name, "params": params})
+                if client.rpc_error:
+                    raise client.rpc_error
+                return SimpleNamespace(data=[row["key"] for row in params["p_rows"]])
+
+        return Call()
+
+    def answer(self, call):
+        if "update" in call:
+            column, keys = call["in"]
+            matched = [row for row in self.rows.values() if row[column] in keys]
+            for row in matched:
+                row.update(call["update"])
+            return matched
+        if "upsert" in call:
+            by_link = {row["link"]: row for row in self.rows.values()}
+            for new_row in call["upsert"]:
+                by_link[new_row["link"]].update(new_row)
+            return call["upsert"]
+        column, keys = call["in"]
+        return [row for row in self.rows.values() if row[column] in keys]
+
+
+def article(article_id):
+    return {"id": article_id, "title": f"t{article_id}", "content": f"c{article_id}",
+            "date": "2025-08-02", "link": f"https://cafef.vn/{article_id}.chn"}
+
+
+def make_manager(monkeypatch, client):
+    monkeypatch.setattr(SupabaseManager, "_bulk_rpc_available", True)
+    monkeypatch.setattr(SupabaseManager, "_stats_cache", None)
+    manager = SupabaseManager.__new__(SupabaseManager)
+    manager.client = client
+    manager.config = SimpleNamespace(BULK_CHUNK_SIZE=500, IN_FILTER_CHUNK_SIZE=100,
+                                     REQUEST_RETRIES=1, REQUEST_RETRY_BACKOFF=0)
+    return manager
+
+
+def test_rpc_updates_all_rows_in_one_call(monkeypatch):
+    client = StubClient([article(1), article(2)])
+    manager = make_manager(monkeypatch, client)
+
+    results = manager.bulk_update_column("FPT_News", "id", {1: "Công nghệ", 2: "Ngân hàng"}, "industry")
+
+    assert results == {1: True, 2: True}
+    assert len(client.calls) == 1
+    params = client.calls[0]["params"]
+    assert params["p_value_columns"] == ["industry"]
+    assert params["p_rows"] == [{"key": "1", "values": {"industry": "Công nghệ"}},
+                                {"key": "2", "values": {"industry": "Ngân hàng"}}]
+
+
+def test_missing_rpc_disables_it_and_groups_updates_by_value(monkeypatch):
+    client = StubClient([article(1), article(2), article(3)],
+                        rpc_error=Exception("PGRST202: Could not find the function"))
+    manager = make_manager(monkeypatch, client)
+
+    results = manager.bulk_update_column("FPT_News", "id", {1: "A", 2: "A", 3: "B"}, "industry")
+
+    assert results == {1: True, 2: True, 3: True}
+    assert SupabaseManager._bulk_rpc_available is False
+    updates = [call for call in client.calls if "update" in call]
+    assert [(call["update"], call["in"]) for call in updates] == [
+        ({"industry": "A"}, ("id", [1, 2])), ({"industry": "B"}, ("id", [3]))
+    ]
+    assert client.rows[3]["industry"] == "B"
+
+    client.calls.clear()
+    manager.bulk_update_column("FPT_News", "id", {1: "C"}, "industry")
+    assert not any("rpc" in call for call in client.calls)
+
+
+def test_other_rpc_errors_retry_then_fall_back_without_disabling(monkeypatch):
+    client = StubClient([article(1)], rpc_error=Exception("502 Bad Gateway"))
+    manager = make_manager(monkeypatch, client)
+
+    results = manager.bulk_update_column("FPT_News", "id", {1: "A"}, "industry")
+
+    assert results == {1: True}
+    assert sum(1 for call in client.calls if "rpc" in call) == 2  # REQUEST_RETRIES=1
+    assert SupabaseManager._bulk_rpc_available is True
+
+
+def test_unique_values_fall_back_to_one_upsert(monkeypatch):
+    rows = [article(i) for i in range(1, 6)]
+    client = StubClient(rows, rpc_error=Exception("PGRST202"))
+    manager = make_manager(monkeypatch, client)
+    manager.config.IN_FILTER_CHUNK_SIZE = 2
+
+    summaries = {i: {"ai_summary": f"tóm tắt {i}", "summary_source": "model"} for i in range(1, 6)}
+    results = manager.bulk_update_columns("FPT_News", "id", summaries)
+
+    assert results == {i: True for i in range(1, 6)}
+    upserts = [call for call in client.calls if "upsert" in call]
+    assert len(upserts) == 1
+    assert upserts[0]["on_conflict"] == "link"
+    assert not any("update" in call for call in client.calls)
+    assert client.rows[4]["ai_summary"] == "tóm tắt 4"
+    assert client.rows[4]["summary_source"] == "model"
+    assert client.rows[4]["title"] == "t4"
@@ -0,0 +1,49 @@
+from utils.chunking import split_chunks
+
+
+def encode(texts):
+    """One token per word"""
+    return [text.split() for text in texts]
+
+
+def decode(ids):
+    return " ".join(ids)
+
+
+def words(chunks):
+    return " ".join(chunks).split()
+
+
+def test_short_text_is_one_chunk():
+    text = "Một đoạn ngắn.\nĐoạn thứ hai."
+    assert split_chunks(text, encode, decode, max_tokens=20) == [text]
+
+
+def test_paragraphs_are_packed_within_limit():
+    paragraphs = [" ".join(f"p{i}w{j}" for j in range(4)) for i in range(5)]
+    chunks = split_chunks("\n".join(paragraphs), encode, decode, max_tokens=8)
+
+    assert chunks == ["\n".join(paragraphs[0:2]), "\n".join(paragraphs[2:4]), paragraphs[4]]
+
+
+def test_single_paragraph_is_split_on_sentences():
+    # CafeF stores the whole article as one paragraph
+    sentences = [f"Câu {i} có năm từ." for i in range(6)]
+    chunks = split_chunks(" ".join(sentences), encode, decode, max_tokens=10)
+
+    assert len(chunks) == 3
+    assert all(len(chunk.split()) <= 10 for chunk in chunks)
+    assert chunks[0] == " ".join(sentences[0:2])
+    assert words(chunks) == " ".join(sentences).split()
+
+
+def test_sentence_longer_than_limit_uses_token_windows():
+    text = " ".join(f"w{i}" for i in range(25))
+    chunks = split_chunks(text, encode, decode, max_tokens=10)
+
+    assert [len(chunk.split()) for chunk in chunks] == [10, 10, 5]
+    assert words(chunks) == text.split()
+
+
+def test_empty_text():
+    assert split_chunks("  \n ", encode, decode, max_tokens=10) == ["  \n "]
@@ -0,0 +1,68 @@
+from industry.pipeline.classification_pipeline import IndustryClassificationPipeline
+
+
+class StubClassifier:
+    def __init__(self, predictions):
+        self.predictions = predictions
+
+    def predict_batch(self, texts, batch_size=None):
+        return self.predictions[:len(texts)]
+
+
+class StubDB:
+    def __init__(self):
+        self.calls = []
+
+    def update_columns(self, rows, table_name):
+        self.calls.append((table_name, rows))
+        return {article_id: True for article_id in rows}
+
+
+def make_pipeline(predictions, with_sentiment):
+    pipeline = IndustryClassificationPipeline.__new__(IndustryClassificationPipeline)
+    pipeline.with_sentiment = with_sentiment
+    pipeline.industry_classifier = StubClassifier(predictions)
+    pipeline.db = StubDB()
+    return pipeline
+
+
+def article(article_id, **columns):
+    return {"id": article_id, "table_name": "General_News",
+            "ai_summary": f"Tóm tắt bài viết số {article_id}", **columns}
+
+
+def test_industry_and_sentiment_written_in_one_update():
+    pipeline = make_pipeline([
+        {"industry": ("Công nghệ", [0.9]), "sentiment": ("Positive", [0.8])},
+        {"industry": ("Ngân hàng", [0.7]), "sentiment": ("Negative", [0.6])},
+        {"industry": ("Bất động sản", [0.5]), "sentiment": ("Unknown", [])},
+    ], with_sentiment=True)
+
+    processed = pipeline.classify_articles([
+        article(1),
+        article(2, industry="Ngân hàng"),  # Streamed only for its missing sentiment
+        article(3),
+    ])
+
+    assert processed == 2
+    assert pipeline.db.calls == [("General_News", {
+        1: {"industry": "Công nghệ", "sentiment": "Positive"},
+        2: {"sentiment": "Negative"},
+        3: {"industry": "Bất động sản"},
+    })]
+
+
+def test_existing_sentiment_is_kept():
+    pipeline = make_pipeline([{"industry": ("Công nghệ", [0.9]), "sentiment": ("Negative", [0.8])}],
+                             with_sentiment=True)
+
+    pipeline.classify_articles([article(1, sentiment="Positive")])
+
+    assert pipeline.db.calls == [("General_News", {1: {"industry": "Công nghệ"}})]
+
+
+def test_industry_only():
+    pipeline = make_pipeline([("Công nghệ", [0.9])], with_sentiment=False)
+
+    assert pipeline.classify_articles([article(1), {"id": 2, "table_name": "General_News"}]) == 1
+    assert pipeline.db.calls == [("General_News", {1: {"industry": "Công nghệ"}})]
@@ -0,0 +1,120 @@
+import json
+from types import SimpleNamespace
+
+from crawl.crawl_state import CrawlStateStore, newest_stored_date, stored_tail
+from database.link_index import LinkIndex
+from database.near_duplicate_index import NearDuplicateIndex
+from database.supabase_manager import SupabaseManager
+
+
+def make_store(tmp_path, **kwargs):
+    return CrawlStateStore(path=str(tmp_path / "crawl_state.json"), **kwargs)
+
+
+def test_reached_is_false_before_first_crawl(tmp_path):
+    store = make_store(tmp_path)
+    assert not store.reached("fireant", "FPT", ["a", "b"])
+
+
+def test_update_then_reached(tmp_path):
+    store = make_store(tmp_path)
+    store.update("fireant", "FPT", ["a", "b", "c"], "2025-08-02")
+
+    assert store.reached("fireant", "FPT", ["x", "b"])
+    assert not store.reached("fireant", "FPT", ["x", "y"])
+    assert not store.reached("fireant", "GAS", ["a"])
+    assert store.get("fireant", "FPT")["newest_date"] == "2025-08-02"
+
+
+def test_update_persists_and_caps_links(tmp_path):
+    store = make_store(tmp_path, max_links=3)
+    store.update("cafef", "FPT", ["c", "d"])
+    store.update("cafef", "FPT", ["a", "b"])
+
+    with open(tmp_path / "crawl_state.json", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["cafef|FPT"]["links"] == ["a", "b", "c"]
+    assert make_store(tmp_path).reached("cafef", "FPT", ["c"])
+
+
+def test_update_keeps_previous_date_when_none(tmp_path):
+    store = make_store(tmp_path)
+    store.update("chungta", "kinh-te", ["a"], "2025-08-01")
+    store.update("chungta", "kinh-te", ["b"])
+    assert store.get("chungta", "kinh-te")["newest_date"] == "2025-08-01"
+
+
+def test_full_recrawl_ignores_watermark(tmp_path):
+    make_store(tmp_path).update("fireant", "FPT", ["a"])
+    assert not make_store(tmp_path, full_recrawl=True).reached("fireant", "FPT", ["a"])
+
+
+def test_update_with_stored_skips_links_before_a_failure(tmp_path):
+    store = make_store(tmp_path)
+    # "b" failed to insert: only the run after it may become the watermark
+    store.update("fireant", "FPT", ["a", "b", "c", "d"], stored={"a", "c", "d"})
+
+    assert not store.reached("fireant", "FPT", ["a"])
+    assert not store.reached("fireant", "FPT", ["b"])
+    assert store.reached("fireant", "FPT", ["c"])
+
+
+def test_update_with_nothing_stored_leaves_state(tmp_path):
+    store = make_store(tmp_path)
+    store.update("fireant", "FPT", ["a", "b"], stored={"a"})
+    assert store.get("fireant", "FPT") == {}
+
+
+class StubClient:
+    """Accepts every upsert (has_column probes succeed too)"""
+
+    def table(self, table_name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=getattr(self, "rows", []))
+
+
+def test_article_rejected_by_validation_does_not_pin_watermark(tmp_path, monkeypatch):
+    monkeypatch.setattr(SupabaseManager, "_column_cache", {})
+    manager = SupabaseManager.__new__(SupabaseManager)
+    manager.client = StubClient()
+    manager.config = SimpleNamespace(BULK_CHUNK_SIZE=500)
+    manager.link_index = LinkIndex(manager)
+    manager.link_index._links["FPT_News"] = set()
+    manager.near_dup_index = NearDuplicateIndex(manager)
+
+    listing = ["https://fireant.vn/a", "https://fireant.vn/b", "https://fireant.vn/c"]
+    articles = [{"title": f"Tin {link[-1]}", "link": link, "date": "2025-08-02",
+                 "content": "Nội dung đầy đủ của bài viết, đủ dài để qua bước kiểm tra dữ liệu."}
+                for link in listing]
+    articles[2]["content"] = "Quá ngắn"  # Rejected on every run
+
+    _, stored = manager.insert_articles_bulk_with_links("FPT_News", articles)
+    store = make_store(tmp_path)
+    store.update("fireant", "FPT", listing, stored=stored)
+
+    assert stored == set(listing)
+    assert store.reached("fireant", "FPT", ["https://fireant.vn/c"])
+
+
+def test_stored_tail():
+    assert stored_tail(["a", "b", "c"], {"a", "b", "c"}) == ["a", "b", "c"]
+    assert stored_tail(["a", "b", "c"], {"a", "c"}) == ["c"]
+    assert stored_tail(["a", "b", "c"], {"a", "b"}) == []
+
+
+def test_newest_stored_date():
+    articles = [{"link": "a", "date": "2025-08-03"}, {"link": "b", "date": "2025-08-02"}]
+    assert newest_stored_date(articles, {"b"}) == "2025-08-02"
+    assert newest_stored_date(articles, set()) is None
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+
+import pytest
+
+from database.link_index import LinkIndex
+from database.near_duplicate_index import NearDuplicateIndex
+from database.supabase_manager import SupabaseManager
+
+
+class StubQuery:
+    def __init__(self, client, table_name):
+        self.client = client
+        self.call = {"table": table_name}
+
+    def select(self, columns):
+        self.call["select"] = columns
+        return self
+
+    def limit(self, count):
+        return self
+
+    def in_(self, column, values):
+        self.call["in"] = (column, list(values))
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        self.call["upsert"] = rows
+        return self
+
+    def execute(self):
+        self.client.calls.append(self.call)
+        if "upsert" in self.call:
+            if self.client.fail_upserts:
+                self.client.fail_upserts -= 1
+                raise ConnectionError("timeout")
+            new_rows = [row for row in self.call["upsert"] if row["link"] not in self.client.links]
+            self.client.links.update(row["link"] for row in new_rows)
+            return SimpleNamespace(data=[{"id": i, **row} for i, row in enumerate(new_rows, 1)])
+        if "in" in self.call:
+            return SimpleNamespace(data=[{"link": link} for link in self.call["in"][1]
+                                         if link in self.client.links])
+        return SimpleNamespace(data=[])
+
+
+class StubClient:
+    def __init__(self, links=(), fail_upserts=0):
+        self.links = set(links)
+        self.fail_upserts = fail_upserts
+        self.calls = []
+
+    def table(self, table_name):
+        return StubQuery(self, table_name)
+
+
+def article(n, content=None):
+    return {"title": f"Tin {n}", "link": f"https://fireant.vn/bai-viet/{n}", "date": "2025-08-02",
+            "content": content or f"Nội dung bài viết số {n} đủ dài để vượt qua bước kiểm tra dữ liệu."}
+
+
+@pytest.fixture
+def make_manager(monkeypatch):
+    monkeypatch.setattr(SupabaseManager, "_column_cache", {})
+    monkeypatch.setattr(SupabaseManager, "_stats_cache", None)
+
+    def make(client, chunk_size=500):
+        manager = SupabaseManager.__new__(SupabaseManager)
+        manager.client = client
+        manager.config = SimpleNamespace(BULK_CHUNK_SIZE=chunk_size, IN_FILTER_CHUNK_SIZE=100)
+        manager.link_index = LinkIndex(manager)
+        manager.near_dup_index = NearDuplicateIndex(manager)
+        return manager
+
+    return make
+
+
+def test_one_dedup_query_and_chunked_upserts(make_manager):
+    client = StubClient(links=[article(1)["link"]])
+    manager = make_manager(client, chunk_size=2)
+
+    inserted, stored = manager.insert_articles_bulk_with_links(
+        "FPT_News", [article(n) for n in range(1, 6)] + [article(2)])
+
+    assert inserted == 4
+    assert stored == {article(n)["link"] for n in range(1, 6)}
+    assert len([call for call in client.calls if "in" in call]) == 1
+    upserts = [call["upsert"] for call in client.calls if "upsert" in call]
+    assert [[row["link"] for row in rows] for rows in upserts] == [
+        [article(2)["link"], article(3)["link"]], [article(4)["link"], article(5)["link"]]
+    ]
+
+
+def test_invalid_articles_are_dropped_before_writing(make_manager):
+    client = StubClient()
+    manager = make_manager(client)
+
+    inserted, done = manager.insert_articles_bulk_with_links(
+        "FPT_News", [article(1), article(2, content="quá ngắn"), {"title": "Không có link"}])
+
+    assert inserted == 1
+    assert client.links == {article(1)["link"]}
+    # Rejected links need no retry: reported with the stored ones
+    assert done == {article(1)["link"], article(2)["link"]}
+
+
+def test_failed_chunk_is_not_reported_as_stored(make_manager):
+    client = StubClient(fail_upserts=1)
+    manager = make_manager(client, chunk_size=1)
+
+    inserted, stored = manager.insert_articles_bulk_with_links("FPT_News", [article(1), article(2)])
+
+    assert inserted == 1
+    assert stored == {article(2)["link"]}
+
+
+def test_warm_link_index_skips_the_dedup_query(make_manager):
+    client = StubClient()
+    manager = make_manager(client)
+    manager.link_index._links["FPT_News"] = {article(1)["link"]}
+
+    inserted = manager.insert_articles_bulk("FPT_News", [article(1), article(2)])
+
+    assert inserted == 1
+    assert not any("in" in call for call in client.calls)
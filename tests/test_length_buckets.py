@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+
+from summarization.models import summarizer
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setattr(summarizer.Config, "TOKEN_BUDGET", 100)
+    monkeypatch.setattr(summarizer.Config, "MAX_BUCKET_SIZE", 8)
+    monkeypatch.setattr(summarizer.Config, "CPU_MICRO_BATCH", 2)
+    return summarizer.Config
+
+
+def length_buckets(lengths, device="cuda"):
+    model = SimpleNamespace(device=SimpleNamespace(type=device))
+    return summarizer.NewsSummarizer._length_buckets(model, [[0] * n for n in lengths])
+
+
+def test_buckets_sorted_by_length_within_token_budget(config):
+    lengths = [40, 10, 30, 20, 10]
+    buckets = length_buckets(lengths)
+
+    assert sorted(i for bucket in buckets for i in bucket) == list(range(len(lengths)))
+    flat = [lengths[i] for bucket in buckets for i in bucket]
+    assert flat == sorted(flat)
+    for bucket in buckets:
+        assert len(bucket) * max(lengths[i] for i in bucket) <= config.TOKEN_BUDGET
+
+
+def test_article_over_budget_gets_own_bucket(config):
+    assert length_buckets([10, 150, 10]) == [[0, 2], [1]]
+
+
+def test_cpu_buckets_capped_by_micro_batch(config):
+    buckets = length_buckets([5] * 5, device="cpu")
+    assert [len(bucket) for bucket in buckets] == [2, 2, 1]
+
+
+def test_gpu_buckets_capped_by_max_bucket_size(config):
+    buckets = length_buckets([1] * 20)
+    assert [len(bucket) for bucket in buckets] == [8, 8, 4]
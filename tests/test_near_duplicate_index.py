@@ -0,0 +1,93 @@
+import pytest
+
+from database.near_duplicate_index import NearDuplicateIndex, hamming_distance, simhash
+
+ARTICLE = (
+    "Công ty Cổ phần FPT vừa công bố kết quả kinh doanh quý hai với doanh thu đạt hơn "
+    "mười lăm nghìn tỷ đồng, tăng hai mươi phần trăm so với cùng kỳ năm trước. Lợi nhuận "
+    "trước thuế đạt gần ba nghìn tỷ đồng nhờ mảng dịch vụ công nghệ thông tin ở thị trường "
+    "nước ngoài tiếp tục tăng trưởng mạnh, đặc biệt tại Nhật Bản và Mỹ. Ban lãnh đạo cho "
+    "biết công ty đặt mục tiêu doanh thu cả năm tăng khoảng hai mươi phần trăm."
+)
+OTHER_ARTICLE = (
+    "Ngân hàng Nhà nước điều chỉnh tỷ giá trung tâm tăng nhẹ trong phiên sáng nay trong khi "
+    "giá vàng miếng trong nước giảm mạnh theo đà giảm của thị trường thế giới. Các chuyên gia "
+    "nhận định thanh khoản hệ thống ngân hàng vẫn dồi dào và lãi suất liên ngân hàng kỳ hạn "
+    "qua đêm tiếp tục duy trì ở mức thấp trong những tuần tới theo dự báo của nhiều tổ chức."
+)
+
+
+class StubManager:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def iter_rows(self, table_name, columns, apply_filters=None, desc=True):
+        yield from self.rows
+
+
+def make_index(rows=(), **kwargs):
+    index = NearDuplicateIndex(StubManager(rows), min_words=10, **kwargs)
+    index.warm("FPT_News")
+    return index
+
+
+def test_simhash_is_stable_and_case_insensitive():
+    assert simhash(ARTICLE) == simhash(ARTICLE.upper())
+    assert simhash("quá ngắn") is None
+
+
+def test_simhash_near_copy_is_close_and_other_text_is_far():
+    syndicated = ARTICLE + " Nguồn: CafeF."
+    assert hamming_distance(simhash(ARTICLE), simhash(syndicated)) <= 6
+    assert hamming_distance(simhash(ARTICLE), simhash(OTHER_ARTICLE)) > 6
+
+
+def test_find_returns_representative_of_near_copy():
+    index = make_index([{"id": 1, "content": ARTICLE, "duplicate_of": None},
+                        {"id": 2, "content": OTHER_ARTICLE, "duplicate_of": None}])
+    copy = ARTICLE + " Nguồn: CafeF."
+
+    assert index.find("FPT_News", index.fingerprint(copy)) == 1
+    assert index.find("FPT_News", index.fingerprint(OTHER_ARTICLE)) == 2
+
+
+def test_find_ignores_duplicates_cold_tables_and_short_text():
+    index = make_index([{"id": 1, "content": ARTICLE, "duplicate_of": 7}])
+
+    assert index.find("FPT_News", index.fingerprint(ARTICLE)) is None
+    assert index.find("GAS_News", index.fingerprint(ARTICLE)) is None
+    assert index.fingerprint("quá ngắn") is None
+
+
+def test_add_registers_representative_once():
+    index = make_index()
+    fingerprint = index.fingerprint(ARTICLE)
+    index.add("FPT_News", 5, fingerprint)
+    index.add("FPT_News", 5, fingerprint)
+
+    assert index.find("FPT_News", fingerprint) == 5
+    assert all(bucket == [5] for buckets in index._bands["FPT_News"] for bucket in buckets.values())
+    assert index._max_id["FPT_News"] == 5
+
+
+def test_failed_warm_stays_cold():
+    class FailingManager(StubManager):
+        def iter_rows(self, *args, **kwargs):
+            yield {"id": 1, "content": ARTICLE, "duplicate_of": None}
+            raise ConnectionError("timeout")
+
+    index = NearDuplicateIndex(FailingManager(), min_words=10)
+    with pytest.raises(ConnectionError):
+        index.warm("FPT_News")
+    assert not index.is_warm("FPT_News")
+
+
+def test_snapshot_round_trip(tmp_path):
+    index = NearDuplicateIndex(StubManager([{"id": 3, "content": ARTICLE, "duplicate_of": None}]),
+                               snapshot_dir=str(tmp_path), min_words=10)
+    index.warm("FPT_News")
+    index.save()
+
+    reloaded = NearDuplicateIndex(StubManager(), snapshot_dir=str(tmp_path), min_words=10)
+    reloaded.warm("FPT_News")
+    assert reloaded.find("FPT_News", reloaded.fingerprint(ARTICLE)) == 3
@@ -0,0 +1,38 @@
+from crawl.crawl_stock.crawl_stock_price_history import parse_price_rows
+
+
+def price_row(date, values, row_class="simplize-table-row simplize-table-row-level-0"):
+    cells = "".join(f"<td><h6>{value}</h6></td>" for value in [date] + values)
+    return f'<tr class="{row_class}">{cells}</tr>'
+
+
+def test_parse_price_rows_reads_rendered_rows():
+    html = "<table><tbody>" + price_row(
+        "02/08/2025", ["100.5", "102", "99.8", "101.2", "+0.7", "0.70%", "1,234,500"]
+    ) + "</tbody></table>"
+
+    assert parse_price_rows(html) == [{
+        "date": "02/08/2025",
+        "open_price": "100.5",
+        "high_price": "102",
+        "low_price": "99.8",
+        "close_price": "101.2",
+        "change": "+0.7",
+        "change_pct": "0.70%",
+        "volume": "1,234,500",
+    }]
+
+
+def test_parse_price_rows_skips_unrendered_short_and_other_rows():
+    missing_cell = '<tr class="simplize-table-row-level-0"><td><h6>01/08/2025</h6></td>' + \
+        "<td></td>" * 7 + "</tr>"
+    html = "<table>" + "".join([
+        price_row("-", ["-"] * 7),
+        '<tr class="simplize-table-row-level-0"><td><h6>01/08/2025</h6></td></tr>',
+        price_row("31/07/2025", ["1"] * 7, row_class="simplize-table-row-level-1"),
+        missing_cell,
+    ]) + "</table>"
+
+    assert parse_price_rows(html) == [{"date": "01/08/2025", "open_price": "-", "high_price": "-",
+                                       "low_price": "-", "close_price": "-", "change": "-",
+                                       "change_pct": "-", "volume": "-"}]
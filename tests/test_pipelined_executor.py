@@ -0,0 +1,41 @@
+import pytest
+
+from utils.pipelined_executor import PipelinedExecutor
+
+
+def test_all_batches_are_inferred_and_written_in_order():
+    written = []
+    executor = PipelinedExecutor(
+        ([n, n + 1] for n in range(0, 10, 2)),
+        infer=lambda batch: [n * 10 for n in batch],
+        write=lambda batch, result: written.extend(result) or len(result),
+    )
+
+    assert executor.run() == 10
+    assert written == [n * 10 for n in range(10)]
+
+
+def test_failed_batch_is_skipped():
+    def infer(batch):
+        if batch == [2]:
+            raise RuntimeError("CUDA out of memory")
+        return batch
+
+    executor = PipelinedExecutor(([n] for n in range(4)), infer=infer, write=lambda batch, result: len(result))
+    assert executor.run() == 3
+
+
+def test_fetch_error_is_raised_after_fetched_batches_are_written():
+    written = []
+
+    def batches():
+        yield [1]
+        yield [2]
+        raise ConnectionError("database timeout")
+
+    executor = PipelinedExecutor(batches(), infer=lambda batch: batch,
+                                 write=lambda batch, result: written.extend(result) or len(result))
+
+    with pytest.raises(ConnectionError):
+        executor.run()
+    assert written == [1, 2]
@@ -0,0 +1,70 @@
+import itertools
+
+import pytest
+
+from utils import summary_cache
+from utils.summary_cache import SummaryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time.time() so last_used order is deterministic"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(summary_cache.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = SummaryCache(str(tmp_path / "summaries.sqlite"), max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_get_put_and_normalized_key(cache):
+    assert cache.get("Giá  cổ phiếu FPT tăng") is None
+    cache.put("Giá  cổ phiếu FPT tăng", "FPT tăng")
+
+    assert cache.get("giá cổ phiếu fpt tăng\n") == "FPT tăng"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_namespace_separates_entries(cache):
+    cache.put("bài viết", "tóm tắt torch", namespace="torch")
+    assert cache.get("bài viết", namespace="onnx") is None
+    assert cache.get("bài viết", namespace="torch") == "tóm tắt torch"
+
+
+def test_evicts_least_recently_used(cache):
+    cache.put("a", "summary a")
+    cache.put("b", "summary b")
+    assert cache.get("a") == "summary a"  # "b" is now least recently used
+
+    cache.put("c", "summary c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "summary a"
+    assert cache.get("c") == "summary c"
+
+
+def test_overwrite_does_not_grow(cache):
+    cache.put("a", "old")
+    cache.put("a", "new")
+    cache.put("b", "summary b")
+
+    assert cache.get("a") == "new"
+    assert cache.get("b") == "summary b"
+
+
+def test_size_bound_survives_reopen(tmp_path, clock):
+    path = str(tmp_path / "summaries.sqlite")
+    cache = SummaryCache(path, max_entries=2)
+    cache.put("a", "summary a")
+    cache.put("b", "summary b")
+    cache.close()
+
+    reopened = SummaryCache(path, max_entries=2)
+    reopened.put("c", "summary c")
+    assert reopened.get("a") is None
+    assert reopened.get("c") == "summary c"
+    reopened.close()
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+
+from database.supabase_manager import SupabaseManager
+
+TABLES = ["FPT_News", "General_News"]
+
+
+class StubClient:
+    """news_table_stats RPC answering from `rpc_rows` (or raising `rpc_error`); head counts return 3"""
+
+    def __init__(self, rpc_rows=None, rpc_error=None):
+        self.rpc_rows = rpc_rows or []
+        self.rpc_error = rpc_error
+        self.rpc_calls = 0
+        self.count_queries = 0
+
+    def rpc(self, name, params):
+        self.rpc_calls += 1
+        return SimpleNamespace(execute=self._rpc_execute)
+
+    def _rpc_execute(self):
+        if self.rpc_error:
+            raise self.rpc_error
+        return SimpleNamespace(data=self.rpc_rows)
+
+    def table(self, table_name):
+        return self
+
+    def __getattr__(self, name):  # select/neq/filter/is_/limit: chain
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self.count_queries += 1
+        return SimpleNamespace(count=3, data=[])
+
+
+@pytest.fixture
+def make_manager(monkeypatch):
+    monkeypatch.setattr(SupabaseManager, "_stats_rpc_available", True)
+    monkeypatch.setattr(SupabaseManager, "_stats_cache", None)
+    monkeypatch.setattr(SupabaseManager, "_column_cache", {})
+
+    def make(client):
+        manager = SupabaseManager.__new__(SupabaseManager)
+        manager.client = client
+        manager.config = SimpleNamespace(STATS_CACHE_TTL=60, get_all_news_tables=lambda: TABLES)
+        return manager
+
+    return make
+
+
+def test_counts_for_all_tables_in_one_rpc_call(make_manager):
+    client = StubClient(rpc_rows=[
+        {"news_table": "FPT_News", "total": 10, "summarized": 4, "classified": None},
+        {"news_table": "General_News", "total": 20, "summarized": 10, "classified": 5},
+    ])
+    manager = make_manager(client)
+
+    stats = manager.get_table_stats()
+
+    assert client.rpc_calls == 1 and client.count_queries == 0
+    assert stats["FPT_News"]["unsummarized"] == 6
+    assert stats["General_News"]["unclassified"] == 5
+
+    manager.get_table_stats()
+    assert client.rpc_calls == 1  # Cached
+
+
+def test_missing_rpc_is_disabled_for_the_process(make_manager):
+    client = StubClient(rpc_error=Exception("PGRST202: Could not find the function public.news_table_stats"))
+    manager = make_manager(client)
+
+    stats = manager.get_table_stats()
+
+    assert stats["FPT_News"]["total"] == 3
+    assert SupabaseManager._stats_rpc_available is False
+    manager.get_table_stats(use_cache=False)
+    assert client.rpc_calls == 1
+
+
+def test_transient_rpc_error_falls_back_for_one_call(make_manager):
+    client = StubClient(rpc_error=Exception("canceling statement due to statement timeout"))
+    manager = make_manager(client)
+
+    assert manager.get_table_stats()["General_News"]["total"] == 3
+    assert SupabaseManager._stats_rpc_available is True
+
+    client.rpc_error = None
+    client.rpc_rows = [{"news_table": "General_News", "total": 7, "summarized": 7, "classified": 7}]
+    assert manager.get_table_stats(use_cache=False)["General_News"]["total"] == 7
+    assert client.rpc_calls == 2
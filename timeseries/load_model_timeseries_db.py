@@ -42,7 +42,7 @@ class StockPredictor:
         # Prioritize centralized database if available
         if use_centralized_db and CENTRALIZED_DB_AVAILABLE:
             try:
-                self.db_manager = SupabaseManager()
+                self.db_manager = SupabaseManager.shared()
                 self.supabase = self.db_manager.client
                 self.table_name = supabase_config["table_name"]
                 print(f"✅ Using centralized database for table: {self.table_name}")
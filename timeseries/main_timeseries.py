@@ -32,7 +32,7 @@ class TimeseriesPipeline:
     
     def __init__(self):
         """Initialize the timeseries pipeline"""
-        self.db_manager = SupabaseManager()
+        self.db_manager = SupabaseManager.shared()
         self.config = DatabaseConfig()
         self.predictors = {}  # Cache for model predictors
         self.results = {}